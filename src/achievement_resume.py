@@ -1,12 +1,15 @@
 # src/services/achievement_resume.py
 import json
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 
 from pydantic import BaseModel, Field, ValidationError
 from langchain_core.prompts import PromptTemplate
 from langchain_groq import ChatGroq
 from src.config import settings
+from src.json_stream import stream_ats_json
+from src.llm_scheduler import BACKGROUND, scheduled
+from src.model_tiers import tiered_llm
 
 
 # ============================================================
@@ -405,11 +408,6 @@ Covered advanced AWS architecture patterns including microservices, serverless c
 
 ---
 
-**RAW ACHIEVEMENT DATA:**
-{raw_achievement}
-
----
-
 **YOUR TASK:**
 1. Analyze raw achievement data - identify type, all technologies, context
 2. Extract ALL technical skills from "skills_demonstrated" and "description"
@@ -429,6 +427,9 @@ Covered advanced AWS architecture patterns including microservices, serverless c
 - Do NOT repeat the JSON multiple times
 - The response should start with {{ and end with }}
 
+**RAW ACHIEVEMENT DATA:**
+{raw_achievement}
+
 **OUTPUT (VALID JSON ONLY):**
 """)
 
@@ -624,7 +625,7 @@ def format_ats_achievement_with_llm(achievement: Dict[str, Any], api_key: str) -
         temperature=0.1,
         max_tokens=2500
     )
-    chain = prompt | llm
+    chain = scheduled(prompt | tiered_llm(llm, "ats"), llm, lane=BACKGROUND, est_output_tokens=2000)
 
     # Invoke LLM
     ai_message = chain.invoke({"raw_achievement": json.dumps(achievement, indent=2)})
@@ -650,4 +651,38 @@ def format_ats_achievement_with_llm(achievement: Dict[str, Any], api_key: str) -
 
     print("SUCCESS: ATS-optimized achievement JSON generated.")
     print(f"Final output: {json.dumps(final_json, indent=2)}")
-    return final_json
\ No newline at end of file
+    return final_json
+
+
+# ============================================================
+# Streaming Variant – emits fields/bullets as they are generated
+# ============================================================
+def stream_ats_achievement_with_llm(achievement: Dict[str, Any], api_key: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming version of `format_ats_achievement_with_llm`.
+    Yields `field` and `item` events while the LLM is generating, then a
+    `complete` event with the validated ATS JSON.
+    """
+    llm = ChatGroq(
+        model=settings.GROQ_MODEL,
+        api_key=api_key,
+        temperature=0.1,
+        max_tokens=2500,
+        streaming=True
+    )
+    chain = scheduled(prompt | tiered_llm(llm, "ats"), llm, lane=BACKGROUND, est_output_tokens=2000)
+
+    def finalize(clean_json: Dict[str, Any]) -> Dict[str, Any]:
+        validated_json = validate_achievement_output(clean_json, achievement)
+        try:
+            return ATSAchievement(**validated_json).model_dump()
+        except ValidationError as e:
+            print(f"Pydantic validation error: {e}")
+            return validated_json
+
+    yield from stream_ats_json(
+        chain,
+        {"raw_achievement": json.dumps(achievement, indent=2)},
+        finalize=finalize,
+        fallback_parse=extract_clean_json,
+    )
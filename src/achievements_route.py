@@ -1,10 +1,17 @@
-from fastapi import APIRouter, HTTPException, Header
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Header, WebSocket
+from fastapi.responses import StreamingResponse
 from typing import Any, Dict, Optional
 
 import src.database as db
-from src.achievements.achievements_agent import langgraph_achievement_app as langgraph_app, ALL_FIELDS, handle_achievement_message as handle_user_message
+from src.achievements.achievements_agent import ENGINE
+from src.achievements.achievements_agent import get_random_achievement_acknowledgment
+from src.chat_stream import stream_chat_turn
+from src.ws_chat import serve_chat_socket
+from src.orchestrator import ORCHESTRATOR
+from src.message_aggregator import run_aggregated_turn, resolve_window_ms
 from src.schemas import StartChatRequest, ChatRequest
-from src.achievement_resume import format_ats_achievement_with_llm
 
 
 router = APIRouter()
@@ -21,59 +28,13 @@ async def start_chat(
         if not x_api_key:
             raise HTTPException(400, "Missing LLM API key in header (x-api-key)")
 
-        chat_id = db.create_chat_session(request.user_id)
-
-        initial_state = {
-            "chat_id": chat_id,
-            "messages": [],
-            "current_experience": {},
-            "achievement_collected": [],
-            "field_completion_status": {field: False for field in ALL_FIELDS},
-            "field_ask_count": {field: 0 for field in ALL_FIELDS},
-            "current_field": None,
-            "conversation_context": "Starting conversation",
-            "interaction_count": 0,
-            "is_first_message": True,
-        }
-
-        config = {
-            "configurable": {
-                "thread_id": chat_id,
-                "api_key": x_api_key,  # ✅ Include key in config
-            },
-            "recursion_limit": 3,
-        }
-
-        response = await langgraph_app.ainvoke(initial_state, config=config)
-
-        ai_message = (
-            response["messages"][-1].content
-            if response.get("messages")
-            else "Let's begin with your first achievement experience!"
-        )
-
-        # Calculate initial status
-        status_dict = response.get(
-            "field_completion_status",
-            {field: False for field in ALL_FIELDS},
-        )
-        completed_fields = sum(1 for v in status_dict.values() if v is True)
-        total_fields = len(ALL_FIELDS)
-        percentage = (
-            int((completed_fields / total_fields) * 100) if total_fields > 0 else 0
-        )
+        chat_id = db.create_chat_session(request.user_id, aggregation_window_ms=request.aggregation_window_ms)
+        result = await asyncio.to_thread(ORCHESTRATOR.start, chat_id, x_api_key, "achievements")
 
         return {
             "status": True,
             "message": "Chat session started successfully",
-            "data": {
-                "chat_id": chat_id,
-                "ai_response": ai_message,
-                "current_section": "achievement",
-                "is_complete": False,
-                "percentage": percentage,
-                "status": status_dict,
-            },
+            "data": result,
         }
 
     except HTTPException as he:
@@ -93,7 +54,8 @@ async def start_chat(
 async def chat(
     chat_id: str,
     request: ChatRequest,
-    x_api_key: Optional[str] = Header(None, alias="x-api-key")
+    x_api_key: Optional[str] = Header(None, alias="x-api-key"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     try:
         if not x_api_key:
@@ -107,8 +69,18 @@ async def chat(
                 "data": None,
             }
 
-        # ✅ Pass api_key to handle_user_message
-        result = handle_user_message(chat_id, request.user_message, langgraph_app, api_key=x_api_key)
+        # ✅ One turn at a time per chat; retries with the same Idempotency-Key replay the result,
+        # and chats that opted in merge rapid follow-up messages into the same turn
+        result = await run_aggregated_turn(
+            chat_id,
+            request.user_message,
+            resolve_window_ms(session),
+            idempotency_key,
+            ORCHESTRATOR.handle_message,
+            ENGINE.app,
+            api_key=x_api_key,
+            section="achievements",
+        )
 
         return {
             "status": True,
@@ -126,6 +98,47 @@ async def chat(
         }
 
 
+# ============================================================
+# ✅ CONTINUE CHAT (SSE STREAM)
+# ============================================================
+@router.post("/chat/{chat_id}/stream")
+async def chat_stream(
+    chat_id: str,
+    request: ChatRequest,
+    x_api_key: Optional[str] = Header(None, alias="x-api-key"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    if not x_api_key:
+        raise HTTPException(400, "Missing LLM API key in header (x-api-key)")
+
+    session = db.get_chat_session(chat_id)
+    if not session:
+        raise HTTPException(404, "Chat session not found")
+
+    return StreamingResponse(
+        stream_chat_turn(
+            chat_id,
+            request.user_message,
+            ENGINE.app,
+            handler=ORCHESTRATOR.handle_message,
+            acknowledge=get_random_achievement_acknowledgment,
+            api_key=x_api_key,
+            idempotency_key=idempotency_key,
+            section="achievements",
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ============================================================
+# ✅ CHAT OVER WEBSOCKET
+# ============================================================
+@router.websocket("/ws/{chat_id}")
+async def chat_socket(websocket: WebSocket, chat_id: str):
+    await serve_chat_socket(websocket, chat_id, section="achievements")
+
+
 # ============================================================
 # ✅ GET FULL CONVERSATION
 # ============================================================
@@ -184,6 +197,7 @@ async def get_ats_resume_json(chat_id: str,
         if not achievement:
             raise HTTPException(400, "No experience saved yet")
 
+        from src.achievement_resume import format_ats_achievement_with_llm
         ats_experience = format_ats_achievement_with_llm(achievement[0], api_key=x_api_key)
 
         return {
@@ -193,3 +207,32 @@ async def get_ats_resume_json(chat_id: str,
         }
     except Exception as e:
         raise HTTPException(500, str(e))
+
+
+# ============================================================
+# ✅ STREAM ATS RESUME JSON (NDJSON)
+# ============================================================
+@router.get("/resume/json/{chat_id}/stream")
+async def stream_ats_resume_json(
+    chat_id: str,
+    x_api_key: Optional[str] = Header(None, alias="x-api-key")
+):
+    if not x_api_key:
+        raise HTTPException(400, "Missing LLM API key in header (x-api-key)")
+    session = db.get_chat_session(chat_id)
+    if not session:
+        raise HTTPException(404, "Chat not found")
+
+    entries = session.get("resume_data", {}).get("achievements", [])
+    if not entries:
+        raise HTTPException(400, "No achievement saved yet")
+
+    def event_lines():
+        try:
+            from src.achievement_resume import stream_ats_achievement_with_llm
+            for event in stream_ats_achievement_with_llm(entries[0], api_key=x_api_key):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            yield json.dumps({"event": "error", "message": str(e)}) + "\n"
+
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
@@ -0,0 +1,201 @@
+# src/batch.py
+"""
+Offline batch jobs over stored chat sessions.
+
+    python -m src.batch format    --section projects --api-key gsk_... [--workers 8]
+    python -m src.batch reextract --section experiences --api-key gsk_... [--overwrite]
+
+`format` re-runs the section's ATS formatter on every saved entry and
+writes the results to `ats_data.<section>`. `reextract` re-runs entry
+extraction over the section's stored transcript and writes the entries to
+`reextracted_data.<section>` (or back to `resume_data.<section>` with
+--overwrite).
+
+Sessions are read in `_id` order with cursor batching. After each batch
+the results are written with one bulk_write and the last `_id` is saved
+under the job name, so re-running the same command resumes where it
+stopped (--restart starts over).
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+import src.database as db
+from src.config import settings
+
+# ============================================================
+# ✅ PER-SESSION WORK
+# ============================================================
+def format_session(session: Dict[str, Any], section: str, api_key: str) -> Optional[Dict[str, Any]]:
+    """`$set` fields for one session, or None when it has nothing to format."""
+    from src.sections import get_section
+
+    spec = get_section(section)
+    entries = (session.get("resume_data") or {}).get(spec["resume_key"]) or []
+    if not entries:
+        return None
+    return {f"ats_data.{spec['resume_key']}": [spec["format_ats"](entry, api_key=api_key) for entry in entries]}
+
+
+def reextract_session(session: Dict[str, Any], section: str, api_key: str, overwrite: bool = False) -> Optional[Dict[str, Any]]:
+    from src.model_tiers import build_agent
+    from src.resume_import import SectionImportResult, chunk_text, extract_entries, merge_entries
+    from src.sections import get_section
+
+    spec = get_section(section)
+    transcript = "\n".join(
+        f"{'User' if m.get('role') == 'user' else 'AI'}: {m.get('message', '')}"
+        for m in session.get("messages", [])
+        if m.get("section") == section
+    )
+    if not transcript:
+        return None
+
+    agent = build_agent(spec["get_llm"](api_key), SectionImportResult, "extraction")
+    found = []
+    for chunk in chunk_text(transcript):
+        # A failed call fails the session: an empty result must never reach resume_data
+        found.extend(extract_entries(agent, section, chunk["text"], raise_errors=True))
+    entries = merge_entries(section, found)
+    if not entries:
+        return None
+    target = "resume_data" if overwrite else "reextracted_data"
+    return {f"{target}.{spec['resume_key']}": entries}
+
+
+JOBS = {
+    "format": format_session,
+    "reextract": reextract_session,
+}
+
+
+# ============================================================
+# ✅ RUNNER
+# ============================================================
+class Throughput:
+    def __init__(self, already: Dict[str, int]):
+        self.started = time.monotonic()
+        self.counters = {"processed": 0, "updated": 0, "skipped": 0, "failed": 0, **already}
+        self.this_run = 0
+
+    def add(self, outcome: str):
+        self.counters["processed"] += 1
+        self.counters[outcome] += 1
+        self.this_run += 1
+
+    def report(self, last_id: Any):
+        elapsed = time.monotonic() - self.started
+        rate = self.this_run / elapsed if elapsed else 0.0
+        c = self.counters
+        print(
+            f"📊 {c['processed']} processed ({c['updated']} updated, {c['skipped']} skipped, {c['failed']} failed)"
+            f" | {rate:.2f} sessions/s this run | last _id {last_id}"
+        )
+
+
+def _next_batch(cursor, size: int) -> List[Dict[str, Any]]:
+    batch = []
+    for session in cursor:
+        batch.append(session)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+async def run_job(
+    job: str,
+    section: str,
+    api_key: str,
+    workers: int = 8,
+    batch_size: int = 100,
+    limit: Optional[int] = None,
+    name: Optional[str] = None,
+    restart: bool = False,
+    dry_run: bool = False,
+    **options,
+) -> Dict[str, int]:
+    """Streams sessions, runs `job` on each with at most `workers` in flight, bulk-writes per batch."""
+    from src.sections import get_section
+
+    if db.chat_collection is None:
+        db.connect_to_db()
+    if db.chat_collection is None:
+        raise ConnectionError("❌ MongoDB collection not initialized.")
+
+    name = name or f"{job}:{section}"
+    checkpoint = None if restart else db.load_batch_checkpoint(name)
+    resume_key = get_section(section)["resume_key"]
+    query: Dict[str, Any] = {"messages.section": section} if job == "reextract" else {f"resume_data.{resume_key}.0": {"$exists": True}}
+    if checkpoint and checkpoint.get("last_id") is not None:
+        query["_id"] = {"$gt": checkpoint["last_id"]}
+        print(f"↩️ Resuming {name} after _id {checkpoint['last_id']}")
+
+    stats = Throughput((checkpoint or {}).get("counters", {}))
+    cursor = db.chat_collection.find(query).sort("_id", 1).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    fn = JOBS[job]
+    gate = asyncio.Semaphore(workers)
+
+    async def process(session: Dict[str, Any]):
+        async with gate:
+            try:
+                update = await asyncio.to_thread(fn, session, section, api_key, **options)
+            except Exception as e:
+                print(f"❌ {session['_id']}: {e}")
+                stats.add("failed")
+                return None
+            stats.add("updated" if update else "skipped")
+            return UpdateOne({"_id": session["_id"]}, {"$set": update}) if update else None
+
+    while True:
+        batch = await asyncio.to_thread(_next_batch, cursor, batch_size)
+        if not batch:
+            break
+        writes = [w for w in await asyncio.gather(*(process(s) for s in batch)) if w is not None]
+        if writes and not dry_run:
+            await asyncio.to_thread(db.chat_collection.bulk_write, writes, ordered=False)
+        last_id = batch[-1]["_id"]
+        if not dry_run:
+            db.save_batch_checkpoint(name, last_id, stats.counters)
+        stats.report(last_id)
+
+    print(f"✅ {name} finished in {time.monotonic() - stats.started:.1f}s")
+    return stats.counters
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from src.sections import SECTIONS
+
+    parser = argparse.ArgumentParser(prog="python -m src.batch")
+    parser.add_argument("job", choices=list(JOBS))
+    parser.add_argument("--section", required=True, choices=list(SECTIONS))
+    parser.add_argument("--api-key", default=settings.GROQ_API_KEY)
+    parser.add_argument("--workers", type=int, default=8, help="sessions processed concurrently")
+    parser.add_argument("--batch-size", type=int, default=100, help="sessions per cursor batch / bulk write")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--name", help="checkpoint name (default: <job>:<section>)")
+    parser.add_argument("--restart", action="store_true", help="ignore the saved checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="process but write nothing")
+    parser.add_argument("--overwrite", action="store_true", help="reextract: replace resume_data")
+    args = parser.parse_args(argv)
+
+    options = {"overwrite": args.overwrite} if args.job == "reextract" else {}
+    try:
+        asyncio.run(run_job(
+            args.job, args.section, args.api_key,
+            workers=args.workers, batch_size=args.batch_size, limit=args.limit,
+            name=args.name, restart=args.restart, dry_run=args.dry_run, **options,
+        ))
+    finally:
+        db.disconnect_db()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+import src.database as db
+from src.chat_stream import stream_chat_turn
+from src.message_aggregator import run_aggregated_turn, resolve_window_ms
+from src.orchestrator import ORCHESTRATOR
+from src.schemas import UnifiedStartRequest, UnifiedChatRequest
+from src.sections import SECTIONS, get_section
+
+router = APIRouter()
+
+
+def _check_section(section: Optional[str]):
+    if section is not None and section not in SECTIONS:
+        raise HTTPException(400, f"Unknown section '{section}'. Expected one of: {', '.join(SECTIONS)}")
+
+
+# ============================================================
+# ✅ START UNIFIED CHAT (one session for every section)
+# ============================================================
+@router.post("/start")
+async def start_chat(
+    request: UnifiedStartRequest,
+    x_api_key: Optional[str] = Header(None, alias="x-api-key")
+):
+    try:
+        if not x_api_key:
+            raise HTTPException(400, "Missing LLM API key in header (x-api-key)")
+        _check_section(request.section)
+
+        chat_id = db.create_chat_session(request.user_id, aggregation_window_ms=request.aggregation_window_ms)
+        result = await asyncio.to_thread(ORCHESTRATOR.start, chat_id, x_api_key, request.section)
+
+        return {
+            "status": True,
+            "message": "Chat session started successfully",
+            "data": result,
+        }
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        return {
+            "status": False,
+            "message": f"Error starting chat: {str(e)}",
+            "data": None,
+        }
+
+
+# ============================================================
+# ✅ CONTINUE UNIFIED CHAT (routed to the active / named section)
+# ============================================================
+@router.post("/{chat_id}")
+async def chat(
+    chat_id: str,
+    request: UnifiedChatRequest,
+    x_api_key: Optional[str] = Header(None, alias="x-api-key"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    try:
+        if not x_api_key:
+            raise HTTPException(400, "Missing LLM API key in header (x-api-key)")
+        _check_section(request.section)
+
+        session = db.get_chat_session(chat_id)
+        if not session:
+            return {
+                "status": False,
+                "message": "Chat session not found",
+                "data": None,
+            }
+
+        result = await run_aggregated_turn(
+            chat_id,
+            request.user_message,
+            resolve_window_ms(session),
+            idempotency_key,
+            ORCHESTRATOR.handle_message,
+            None,
+            api_key=x_api_key,
+            section=request.section,
+        )
+
+        return {
+            "status": True,
+            "message": "Message processed successfully",
+            "data": result,
+        }
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        return {
+            "status": False,
+            "message": f"Error processing chat: {str(e)}",
+            "data": None,
+        }
+
+
+# ============================================================
+# ✅ CONTINUE UNIFIED CHAT (SSE STREAM)
+# ============================================================
+@router.post("/{chat_id}/stream")
+async def chat_stream(
+    chat_id: str,
+    request: UnifiedChatRequest,
+    x_api_key: Optional[str] = Header(None, alias="x-api-key"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    if not x_api_key:
+        raise HTTPException(400, "Missing LLM API key in header (x-api-key)")
+    _check_section(request.section)
+
+    session = db.get_chat_session(chat_id)
+    if not session:
+        raise HTTPException(404, "Chat session not found")
+
+    # The early `ack` comes from the section that will most likely take the turn
+    section = request.section or ORCHESTRATOR.current_section(chat_id) or next(iter(SECTIONS))
+    spec = get_section(section)
+
+    return StreamingResponse(
+        stream_chat_turn(
+            chat_id,
+            request.user_message,
+            spec["engine"].app,
+            handler=ORCHESTRATOR.handle_message,
+            acknowledge=spec["acknowledge"],
+            api_key=x_api_key,
+            idempotency_key=idempotency_key,
+            section=request.section,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ============================================================
+# ✅ PROGRESS ACROSS SECTIONS
+# ============================================================
+@router.get("/{chat_id}/progress")
+async def get_progress(chat_id: str):
+    try:
+        if not db.get_chat_session(chat_id):
+            return {
+                "status": False,
+                "message": "Chat session not found",
+                "data": None,
+            }
+        return {
+            "status": True,
+            "message": "Progress retrieved successfully",
+            "data": await asyncio.to_thread(ORCHESTRATOR.progress, chat_id),
+        }
+
+    except Exception as e:
+        return {
+            "status": False,
+            "message": f"Error retrieving progress: {str(e)}",
+            "data": None,
+        }
@@ -0,0 +1,150 @@
+# src/chat_stream.py
+import asyncio
+import json
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+
+from src.json_stream import IncrementalJSONParser
+from src.session_guard import chat_turn_lock, remember_response, replay_response
+
+
+# ============================================================
+# ✅ PER-TURN STREAM CONTEXT
+# ============================================================
+class TurnStream:
+    """
+    Collects events produced while a chat turn is running in a worker thread
+    and hands them to the event loop that serves the SSE response.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        self.loop = loop
+        self.queue = queue
+        self.ack_field: Optional[str] = None
+        self.ack: Optional[str] = None
+
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, (event, data))
+
+
+_current_stream: ContextVar[Optional[TurnStream]] = ContextVar("current_turn_stream", default=None)
+
+
+def current_stream() -> Optional[TurnStream]:
+    return _current_stream.get()
+
+
+def reserved_acknowledgment(field: str) -> Optional[str]:
+    """Returns the acknowledgment already sent to the client for `field`, if any."""
+    stream = current_stream()
+    if stream and stream.ack and stream.ack_field == field:
+        return stream.ack
+    return None
+
+
+# ============================================================
+# ✅ STREAMED QUESTION GENERATION
+# ============================================================
+def invoke_streaming_question(agent, messages: List[BaseMessage]):
+    """
+    Drop-in replacement for `agent.invoke(messages)` in the question agents.
+    When a turn stream is active, the tool-call arguments are parsed as they
+    arrive and the `question` text is forwarded as `token` events.
+    """
+    stream = current_stream()
+    if stream is None:
+        return agent.invoke(messages)
+
+    parser = IncrementalJSONParser(track_strings=["question"])
+    full = None
+    for chunk in agent.stream(messages):
+        full = chunk if full is None else full + chunk
+        for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+            for event in parser.feed(tool_chunk.get("args") or ""):
+                if event[0] == "delta":
+                    stream.emit("token", {"text": event[2]})
+    return full
+
+
+# ============================================================
+# ✅ SSE TURN DRIVER
+# ============================================================
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def iter_chat_turn(
+    chat_id: str,
+    user_message: str,
+    app,
+    handler: Callable[..., dict],
+    acknowledge: Callable[[str], str],
+    api_key: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
+    **handler_kwargs,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Runs one chat turn through `handler` in a worker thread and yields
+    `(event, data)` pairs: `ack` (sent before any LLM call), `token`
+    (question text as generated) and a final `done` with the same payload
+    as the POST endpoint, including `percentage` and `status`.
+    `done.ai_response` is authoritative; clients should replace the
+    streamed text with it.
+
+    The turn holds the chat's turn lock, and a repeated `idempotency_key`
+    replays the stored result as a single `done` event.
+    """
+    async with chat_turn_lock(chat_id):
+        cached = await replay_response(chat_id, idempotency_key)
+        if cached is not None:
+            yield "done", cached
+            return
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stream = TurnStream(loop, queue)
+
+        state = app.get_state({"configurable": {"thread_id": chat_id}})
+        current_field = state.values.get("current_field") if state and state.values else None
+        if current_field:
+            stream.ack_field = current_field
+            stream.ack = acknowledge(current_field)
+            yield "ack", {"text": stream.ack}
+
+        def run_turn() -> dict:
+            token = _current_stream.set(stream)
+            try:
+                return handler(chat_id, user_message, app, api_key=api_key, **handler_kwargs)
+            finally:
+                _current_stream.reset(token)
+
+        task = asyncio.ensure_future(asyncio.to_thread(run_turn))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield item
+        finally:
+            # A client that disconnects mid-turn must not release the lock
+            # while the graph is still writing the checkpoint.
+            if not task.done():
+                await asyncio.wait([task])
+
+        try:
+            result = task.result()
+        except Exception as e:
+            yield "error", {"message": str(e)}
+            return
+        await remember_response(chat_id, idempotency_key, result)
+        yield "done", result
+
+
+async def stream_chat_turn(*args, **kwargs) -> AsyncIterator[str]:
+    """SSE framing of `iter_chat_turn`."""
+    async for event, data in iter_chat_turn(*args, **kwargs):
+        yield _sse(event, data)
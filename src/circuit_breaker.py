@@ -0,0 +1,224 @@
+# src/circuit_breaker.py
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from langchain_core.runnables import Runnable
+
+from src.config import settings
+from src.turn_deadline import DeadlineExceeded, call_timeout, remaining
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The provider/model is failing; the call was not attempted."""
+
+
+# ============================================================
+# ✅ BREAKER
+# ============================================================
+class CircuitBreaker:
+    """
+    Opens after LLM_BREAKER_FAILURE_THRESHOLD consecutive failures (errors or
+    calls slower than LLM_BREAKER_SLOW_SECONDS). After the cooldown it
+    half-opens and lets a single trial call through: success closes it,
+    failure opens it again.
+    """
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def _refresh(self) -> None:
+        if self.state == OPEN and time.monotonic() - self.opened_at >= settings.LLM_BREAKER_COOLDOWN_SECONDS:
+            self.state = HALF_OPEN
+            self.trial_in_flight = False
+            print(f"🟡 Circuit half-open for {self.provider}/{self.model}")
+
+    def available(self) -> bool:
+        """Whether a call would currently be let through (does not reserve it)."""
+        with self.lock:
+            self._refresh()
+            return self.state == CLOSED or (self.state == HALF_OPEN and not self.trial_in_flight)
+
+    def before_call(self) -> None:
+        with self.lock:
+            self._refresh()
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+            self.stats["rejected"] += 1
+            raise CircuitOpenError(f"Circuit open for {self.provider}/{self.model}")
+
+    def record(self, ok: bool) -> None:
+        with self.lock:
+            if ok:
+                self.stats["successes"] += 1
+                self.failures = 0
+                if self.state != CLOSED:
+                    print(f"🟢 Circuit closed for {self.provider}/{self.model}")
+                self.state = CLOSED
+            else:
+                self.stats["failures"] += 1
+                self.failures += 1
+                if self.state == HALF_OPEN or self.failures >= settings.LLM_BREAKER_FAILURE_THRESHOLD:
+                    if self.state != OPEN:
+                        self.stats["opened"] += 1
+                        print(f"🔴 Circuit opened for {self.provider}/{self.model}")
+                    self.state = OPEN
+                    self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """A half-open trial that ended without telling us anything about the provider."""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            self._refresh()
+            return {"state": self.state, "consecutive_failures": self.failures, **self.stats}
+
+
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(model: str, provider: str = "groq") -> CircuitBreaker:
+    with _breakers_lock:
+        key = (provider, model)
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(provider, model)
+        return _breakers[key]
+
+
+def breaker_metrics() -> Dict[str, Any]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {f"{b.provider}/{b.model}": b.snapshot() for b in breakers}
+
+
+# Provider SDK errors (groq / openai clients) and their httpx transport
+# errors, matched by name so no provider package is imported here
+_OUTAGE_ERRORS = {"APIConnectionError", "APITimeoutError", "ConnectError", "TimeoutException", "NetworkError"}
+_TIMEOUT_ERRORS = {"APITimeoutError", "TimeoutException"}
+# A timeout with this little of the turn left was capped by our deadline
+# (llm_scheduler hands the provider `call_timeout()`), not the provider's
+_DEADLINE_SLACK_SECONDS = 0.5
+
+
+def _is_timeout(e: Exception) -> bool:
+    return isinstance(e, TimeoutError) or any(cls.__name__ in _TIMEOUT_ERRORS for cls in type(e).__mro__)
+
+
+def _hit_turn_deadline(e: Exception) -> bool:
+    """A provider timeout that only fired because the turn's budget ran out."""
+    if isinstance(e, DeadlineExceeded) or not _is_timeout(e):
+        return False
+    left = remaining()
+    return left is not None and left <= _DEADLINE_SLACK_SECONDS
+
+
+def _is_outage(e: Exception) -> Optional[bool]:
+    """
+    True for provider trouble (connection errors, timeouts, 5xx), False for
+    per-key/per-request problems (4xx such as 401 or 429), None for anything
+    else - our own deadline, parsing or validation errors - which says
+    nothing about the provider and must not trip the shared breaker.
+    """
+    if isinstance(e, DeadlineExceeded):
+        return None
+    status = getattr(e, "status_code", None)
+    if isinstance(status, int):
+        if status >= 500:
+            return True
+        if 400 <= status < 500:
+            return False
+        return None
+    if isinstance(e, (ConnectionError, TimeoutError)):
+        return True
+    if any(cls.__name__ in _OUTAGE_ERRORS for cls in type(e).__mro__):
+        return True
+    return None
+
+
+# ============================================================
+# ✅ GUARDED RUNNABLE
+# ============================================================
+class GuardedRunnable(Runnable):
+    """Runs one model's runnable behind its breaker; composes with `with_fallbacks`."""
+
+    def __init__(self, runnable, model: str, provider: str = "groq"):
+        self.runnable = runnable
+        self.breaker = breaker_for(model, provider)
+
+    def _finish(self, started: float, error: Optional[Exception]) -> None:
+        if error is None:
+            self.breaker.record(time.monotonic() - started <= settings.LLM_BREAKER_SLOW_SECONDS)
+            return
+        outage = _is_outage(error)
+        if outage is None:
+            self.breaker.release_trial()
+        elif outage:
+            self.breaker.record(False)
+        else:
+            # The provider answered; it is up
+            self.breaker.record(True)
+
+    def _deadline_error(self, e: Exception) -> DeadlineExceeded:
+        return DeadlineExceeded(f"Turn deadline exceeded during the LLM call ({self.breaker.model}): {e}")
+
+    @staticmethod
+    def _recap(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Re-caps the request timeout to what is left now (a fallback model runs after the first one failed)."""
+        left = call_timeout()  # raises once the turn is spent, so the provider is skipped
+        if left is None or not kwargs.get("timeout"):
+            return kwargs
+        return {**kwargs, "timeout": min(kwargs["timeout"], left)}
+
+    def invoke(self, input, config=None, **kwargs):
+        kwargs = self._recap(kwargs)
+        self.breaker.before_call()
+        started = time.monotonic()
+        try:
+            result = self.runnable.invoke(input, config, **kwargs)
+        except Exception as e:
+            if _hit_turn_deadline(e):
+                # Says nothing about the provider: free the trial slot, record nothing
+                self.breaker.release_trial()
+                raise self._deadline_error(e) from e
+            self._finish(started, e)
+            raise
+        self._finish(started, None)
+        return result
+
+    def stream(self, input, config=None, **kwargs) -> Iterator[Any]:
+        kwargs = self._recap(kwargs)
+        self.breaker.before_call()
+        started = time.monotonic()
+        error, finished = None, False
+        try:
+            yield from self.runnable.stream(input, config, **kwargs)
+            finished = True
+        except Exception as e:
+            if _hit_turn_deadline(e):
+                raise self._deadline_error(e) from e  # trial slot released below, nothing recorded
+            error = e
+            raise
+        finally:
+            if finished or error is not None:
+                self._finish(started, error)
+            else:
+                # Consumer stopped early, or the turn deadline cut the stream
+                self.breaker.release_trial()
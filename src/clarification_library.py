@@ -0,0 +1,159 @@
+# src/clarification_library.py
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import src.database as db
+from src.config import settings
+
+# Words that say "I'm confused" rather than what about
+_STOPWORDS = {
+    "a", "about", "an", "answer", "are", "by", "can", "clarify", "could", "do", "does", "dont",
+    "explain", "field", "for", "how", "i", "im", "in", "is", "it", "me", "mean", "meaning", "my",
+    "not", "of", "please", "question", "should", "sure", "that", "the", "this", "to", "understand",
+    "what", "whats", "with", "you", "your",
+}
+
+
+# ============================================================
+# ✅ LOCAL SIMILARITY INDEX
+# ============================================================
+def normalize_topic(text: str) -> str:
+    words = re.sub(r"[^\w\s]", "", (text or "").lower()).split()
+    return " ".join(w for w in words if w not in _STOPWORDS)
+
+
+def _vector(topic: str) -> Counter:
+    padded = f"  {topic} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b[gram] for gram, count in a.items())
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+
+class _Entry:
+    def __init__(self, topic: str, clarification: Dict[str, Any]):
+        self.topic = topic
+        self.vector = _vector(topic)
+        self.clarification = clarification
+
+
+# ============================================================
+# ✅ LIBRARY
+# One list of topic clusters per (section, field). Seeded from the
+# section's *_FIELD_CLARIFICATIONS, grown with LLM answers to novel topics
+# and shared across workers through MongoDB: each worker re-reads a
+# (section, field) after CLARIFICATION_CACHE_TTL_SECONDS.
+# ============================================================
+_entries: Dict[Tuple[str, str], List[_Entry]] = {}
+_loaded_at: Dict[Tuple[str, str], float] = {}
+_lock = threading.Lock()
+_stats = {"lookups": 0, "hits": 0, "misses": 0, "stored": 0}
+
+
+def _load(section: str, field: str, seed: Optional[Dict[str, Any]]) -> List[_Entry]:
+    """Snapshot of the (section, field) clusters; the MongoDB read runs outside `_lock`."""
+    key = (section, field)
+    with _lock:
+        fresh = time.monotonic() - _loaded_at.get(key, float("-inf")) < settings.CLARIFICATION_CACHE_TTL_SECONDS
+        if key in _entries and fresh:
+            return list(_entries[key])
+
+    entries = []
+    if seed:
+        # Bare confusion ("what do you mean?") and the field's own name
+        entries.append(_Entry("", seed))
+        entries.append(_Entry(normalize_topic(field.replace("_", " ")), seed))
+    for doc in db.load_clarifications(section, field):
+        entries.append(_Entry(doc["topic"], doc["clarification"]))
+
+    with _lock:
+        _entries[key] = entries
+        _loaded_at[key] = time.monotonic()
+    return list(entries)
+
+
+def find_clarification(
+    section: str,
+    field: str,
+    topic: str,
+    seed_explanation: Optional[str] = None,
+    seed_follow_up: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """Stored clarification for the closest known topic cluster, if close enough."""
+    seed = None
+    if seed_explanation:
+        seed = {"explanation": seed_explanation, "example": None, "follow_up_question": seed_follow_up}
+
+    normalized = normalize_topic(topic)
+    vector = _vector(normalized) if normalized else None
+    best, best_score = None, 0.0
+    for entry in _load(section, field, seed):
+        if not normalized or not entry.topic:
+            score = 1.0 if normalized == entry.topic else 0.0
+        else:
+            score = _cosine(vector, entry.vector)
+        if score > best_score:
+            best, best_score = entry, score
+
+    hit = best is not None and best_score >= settings.CLARIFICATION_MATCH_THRESHOLD
+    with _lock:
+        _stats["lookups"] += 1
+        _stats["hits" if hit else "misses"] += 1
+    if not hit:
+        return None
+    print(f"📚 Clarification library hit for '{normalized or field}' ~ '{best.topic or '*'}' ({best_score:.2f})")
+    return dict(best.clarification)
+
+
+def remember_clarification(
+    section: str,
+    field: str,
+    topic: str,
+    clarification: Dict[str, Any],
+    user_data: Optional[dict] = None,
+) -> None:
+    """
+    Adds an LLM clarification as a new topic cluster. Answers that quote the
+    user's own data are not shared with other users.
+    """
+    normalized = normalize_topic(topic)
+    if not normalized or _mentions_user_data(clarification, user_data):
+        return
+    with _lock:
+        entries = _entries.get((section, field))
+        if entries is not None:
+            entries.append(_Entry(normalized, clarification))
+        _stats["stored"] += 1
+    db.save_clarification(section, field, normalized, clarification)
+
+
+def _mentions_user_data(clarification: Dict[str, Any], user_data: Optional[dict]) -> bool:
+    text = " ".join(str(v) for v in clarification.values() if v).lower()
+    values: List[str] = []
+    for value in (user_data or {}).values():
+        if isinstance(value, str):
+            values.append(value)
+        elif isinstance(value, list):
+            values.extend(str(v) for v in value)
+        elif isinstance(value, dict):
+            values.extend(str(v) for v in value.values() if v)
+    return any(len(v) >= 4 and v.lower() in text for v in values)
+
+
+def clarification_library_metrics() -> Dict[str, Any]:
+    with _lock:
+        lookups = _stats["lookups"]
+        return {
+            **_stats,
+            "clusters": sum(len(v) for v in _entries.values()),
+            "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,66 @@
+# src/compact_prompts.py
+import re
+from typing import Dict, Tuple
+
+from src.config import settings
+
+# ============================================================
+# ✅ COMPACT BASE PROMPTS
+# The full bases ask the model to "think" in a <thinking> block before
+# the JSON, but every agent is bound to a forced tool call, so that text
+# (and the worked <thinking> examples) only costs input tokens.
+# ============================================================
+COMPACT_EXTRACTION_BASE = """
+You extract one field from a resume-building conversation and return it via the `FieldExtractionResult` tool.
+
+<RULES>
+1. Use ONLY the user's latest message for the value; history is context. If it does not address <FIELD_TO_EXTRACT>, return is_complete=false, confidence 0.1.
+2. Use <CURRENT_DATE> (if given) for relative dates.
+3. Skip phrases ("skip", "n/a", "I don't know", "none") -> is_complete=true, extracted_value=null, confidence=1.0.
+4. Ambiguous or related-but-wrong answers -> needs_clarification=true with a short clarification_reason.
+5. confidence: 1.0 explicit, <0.8 inferred, <0.3 vague. reasoning: one sentence.
+</RULES>
+"""
+
+COMPACT_QUESTION_BASE = """
+You are a warm, professional career coach collecting resume details one question at a time. Return the question via the `FieldQuestionGeneration` tool.
+
+<RULES>
+1. Ask only for <FIELD_TO_ASK_FOR>, in one or two sentences, briefly acknowledging the user's most recent answer in the known data.
+2. If <TIMES_ASKED> > 0 you are re-asking: rephrase more simply; on the final attempt add "if you recall".
+3. Never say "Just following up on this". follow_up_prompts: 1-2 short example answers.
+</RULES>
+"""
+
+_THINKING_BLOCK = re.compile(r"<thinking>.*?</thinking>\s*", re.DOTALL)
+
+PROMPT_VARIANTS = ("full", "compact")
+
+
+def compact_prompt(full_prompt: str, base: str, compact_base: str) -> str:
+    """Swaps the shared base for its compact form and drops worked <thinking> blocks."""
+    specific = full_prompt[len(base):] if full_prompt.startswith(base) else full_prompt
+    return compact_base + _THINKING_BLOCK.sub("", specific)
+
+
+def compact_set(prompts: Dict[str, str], base: str, compact_base: str) -> Dict[str, str]:
+    return {field: compact_prompt(p, base, compact_base) for field, p in prompts.items()}
+
+
+def select_prompt_set(
+    field_prompts: Dict[str, str],
+    extraction_base: str,
+    question_prompts: Dict[str, str],
+    question_base: str,
+    variant: str = None,
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """(extraction prompts, question prompts) for the deployment's PROMPT_VARIANT."""
+    variant = variant or settings.PROMPT_VARIANT
+    if variant not in PROMPT_VARIANTS:
+        raise ValueError(f"Unknown PROMPT_VARIANT '{variant}' (expected one of {PROMPT_VARIANTS})")
+    if variant == "full":
+        return field_prompts, question_prompts
+    return (
+        compact_set(field_prompts, extraction_base, COMPACT_EXTRACTION_BASE),
+        compact_set(question_prompts, question_base, COMPACT_QUESTION_BASE),
+    )
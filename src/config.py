@@ -1,5 +1,5 @@
 import os
-from typing import ClassVar
+from typing import ClassVar, Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
 
@@ -11,9 +11,112 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str
     GOOGLE_API_KEY: str
     GROQ_MODEL: str = "llama3-70b-8192"
+
+    # Per-role model tiers (unset = GROQ_MODEL). Each role falls back to
+    # GROQ_MODEL and then LLM_MODEL_FALLBACKS when its model errors out.
+    LLM_MODEL_INTENT: Optional[str] = None          # e.g. "llama-3.1-8b-instant"
+    LLM_MODEL_EXTRACTION: Optional[str] = None
+    LLM_MODEL_EXTRACTION_OVERRIDES: Dict[str, str] = {}   # field -> model (JSON)
+    LLM_MODEL_QUESTION: Optional[str] = None
+    LLM_MODEL_CLARIFICATION: Optional[str] = None
+    LLM_MODEL_ATS: Optional[str] = None
+    LLM_MODEL_FALLBACKS: List[str] = []
     RECURSION_LIMIT: int = 12          # ← NEW
     MAX_FIELD_RETRIES: int = 2
 
+    # Per-chat turn serialization
+    CHAT_LEASE_TTL_SECONDS: int = 120
+    CHAT_LEASE_WAIT_SECONDS: float = 30.0
+    # Merge rapid consecutive messages into one turn (0 = off; chats can opt in)
+    MESSAGE_AGGREGATION_WINDOW_MS: int = 0
+
+    # Per-turn latency budget (0 = no deadline) and degradation thresholds
+    TURN_DEADLINE_SECONDS: float = 20.0
+    TURN_DB_GRACE_SECONDS: float = 2.0
+    TURN_CLARIFICATION_RESERVE_SECONDS: float = 6.0   # below this: static clarification
+    TURN_QUESTION_RESERVE_SECONDS: float = 4.0        # below this: question bank
+
+    # LLM call scheduler (budgets are per API key)
+    LLM_RPM_LIMIT: int = 30
+    LLM_TPM_LIMIT: int = 30000
+    LLM_INITIAL_CONCURRENCY: int = 4
+    LLM_MIN_CONCURRENCY: int = 1
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_LATENCY_TARGET_SECONDS: float = 8.0
+    LLM_RATE_LIMIT_BACKOFF_SECONDS: float = 5.0
+    LLM_RATE_LIMIT_RETRIES: int = 2
+
+    # Hedged requests for intent / extraction / question calls
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_MAX_RATE: float = 0.1       # max share of calls that may be hedged
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_HEDGE_WINDOW: int = 200
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 0.5
+
+    # Intent classifier cache (short, context-independent replies only)
+    INTENT_CACHE_ENABLED: bool = True
+    INTENT_CACHE_MAX_WORDS: int = 6
+    INTENT_CACHE_MIN_CONFIDENCE: float = 0.8
+    INTENT_CACHE_MAX_ENTRIES: int = 5000
+    INTENT_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+
+    # Clarification library: topic similarity needed to reuse a stored answer
+    CLARIFICATION_MATCH_THRESHOLD: float = 0.55
+    # How long a worker trusts its copy before re-reading other workers' additions
+    CLARIFICATION_CACHE_TTL_SECONDS: int = 300
+
+    # Multi-field extraction: fill other fields answered in the same message
+    MULTI_FIELD_EXTRACTION_ENABLED: bool = True
+    MULTI_FIELD_MIN_WORDS: int = 6
+    MULTI_FIELD_MIN_CONFIDENCE: float = 0.8
+
+    # Unified chat (src/orchestrator.py): let one message fill other sections' fields
+    ORCHESTRATOR_SPILLOVER_ENABLED: bool = True
+
+    # Per-user fact store (src/fact_store.py): propose values other sections
+    # already confirmed when a section starts
+    FACT_PREFILL_ENABLED: bool = True
+    FACT_PREFILL_MAX_ITEMS: int = 15
+
+    # Bulk resume import (src/resume_import.py)
+    IMPORT_MAX_CHARS: int = 50000
+    IMPORT_CHUNK_TOKENS: int = 1500
+    IMPORT_MAX_PARALLEL: int = 8
+    IMPORT_MIN_CONFIDENCE: float = 0.7
+
+    # Input token budget per agent call (src/token_budget.py), overridable per role
+    PROMPT_TOKEN_BUDGET: int = 6000
+    PROMPT_TOKEN_BUDGETS: Dict[str, int] = {}
+
+    # Rolling conversation memory (see src/conversation_memory.py)
+    MEMORY_KEEP_MESSAGES: int = 10
+    MEMORY_FOLD_BATCH: int = 4
+    MEMORY_SUMMARY_LINE_CHARS: int = 120
+    MEMORY_SUMMARY_MAX_CHARS: int = 1500
+
+    # Bound agent sets kept per (section, API key) by the section engine
+    AGENT_CACHE_SIZE: int = 64
+
+    # Browser origins allowed by CORS and on the chat WebSocket handshake
+    CORS_ALLOW_ORIGINS: List[str] = ["http://localhost:5173", "https://resume-chatbot-frontend.onrender.com"]
+    # Browsers cannot set headers on a WebSocket: the first frame must carry the key within this time
+    WS_AUTH_TIMEOUT_SECONDS: float = 10.0
+
+    # Lifespan warm-up (src/warmup.py); /readyz answers 503 until it is done
+    WARMUP_ENABLED: bool = True
+    WARMUP_LLM_PING: bool = False        # one 1-token request with GROQ_API_KEY
+    WARMUP_RETRY_SECONDS: float = 5.0
+    MONGO_MIN_POOL_SIZE: int = 4
+
+    # "full" or "compact" extraction/question prompts (see src/compact_prompts.py)
+    PROMPT_VARIANT: str = "full"
+
+    # Circuit breaker per provider/model (open circuit = offline mode)
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_SLOW_SECONDS: float = 15.0
+    LLM_BREAKER_COOLDOWN_SECONDS: float = 30.0
+
     # Define path to `.env` (ensure it always resolves correctly)
     env_file_path: ClassVar[str] = str(Path(__file__).resolve().parent.parent / ".env")
 
@@ -0,0 +1,98 @@
+# src/conversation_memory.py
+from functools import wraps
+from typing import Any, Callable, Dict, List
+
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage
+
+from src.config import settings
+from src.prompt_compiler import set_summary
+
+# ============================================================
+# ✅ ROLLING CONVERSATION MEMORY
+# The graph state keeps only the last MEMORY_KEEP_MESSAGES messages.
+# Older ones are folded into `conversation_summary` (one short line per
+# exchange, oldest lines dropped past MEMORY_SUMMARY_MAX_CHARS) and
+# removed from the checkpoint. Folding is plain string work, no LLM call:
+# the collected field values already live in the section's data dict, so
+# the summary only has to keep the gist of what was asked and answered.
+# ============================================================
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def summary_lines(messages: List[BaseMessage]) -> List[str]:
+    """One line per AI question / user reply pair, e.g. "AI asked: ... → User: ..."."""
+    width = settings.MEMORY_SUMMARY_LINE_CHARS
+    lines, pending = [], None
+    for m in messages:
+        if isinstance(m, HumanMessage):
+            reply = f"User: {_clip(m.content, width)}"
+            lines.append(f"AI asked: {pending} → {reply}" if pending else reply)
+            pending = None
+        else:
+            if pending:
+                lines.append(f"AI: {pending}")
+            pending = _clip(m.content, width)
+    if pending:
+        lines.append(f"AI: {pending}")
+    return lines
+
+
+def fold_summary(summary: str, messages: List[BaseMessage]) -> str:
+    """`summary` extended with `messages`, trimmed from the oldest line to fit."""
+    lines = [line for line in (summary or "").split("\n") if line] + summary_lines(messages)
+    while lines and sum(len(line) + 1 for line in lines) > settings.MEMORY_SUMMARY_MAX_CHARS:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def compact_state(state: Dict[str, Any]) -> List[BaseMessage]:
+    """
+    Folds the messages older than the window into the state's summary and
+    drops them from `state["messages"]` / `state["history_lines"]`.
+    Returns the dropped messages.
+    """
+    messages = list(state.get("messages") or [])
+    keep = settings.MEMORY_KEEP_MESSAGES
+    dropped: List[BaseMessage] = []
+    if len(messages) > keep + settings.MEMORY_FOLD_BATCH:
+        cut = len(messages) - keep
+        # Keep question/answer pairs together: start the window on an AI message
+        while cut > 0 and isinstance(messages[cut], HumanMessage):
+            cut -= 1
+        dropped, messages = messages[:cut], messages[cut:]
+    if dropped:
+        state["conversation_summary"] = fold_summary(state.get("conversation_summary", ""), dropped)
+        state["messages"] = messages
+        lines = state.get("history_lines") or []
+        state["history_lines"] = lines[len(dropped):] if len(lines) >= len(dropped) else []
+        print(f"🧠 Memory: folded {len(dropped)} messages, keeping {len(messages)}")
+
+    set_summary(state.get("conversation_summary") or "")
+    return dropped
+
+
+def with_memory(node: Callable[[Dict[str, Any]], Dict[str, Any]]):
+    """
+    Wraps a graph node: compacts the state before it runs and turns the
+    dropped messages into `RemoveMessage`s in its update, so the
+    `add_messages` reducer deletes them from the checkpoint too.
+    """
+    @wraps(node)
+    def run(state: Dict[str, Any]) -> Dict[str, Any]:
+        state = dict(state)
+        dropped = compact_state(state)
+        result = node(state)
+        if dropped and isinstance(result, dict):
+            removals = [RemoveMessage(id=m.id) for m in dropped if getattr(m, "id", None)]
+            result = {
+                **result,
+                "messages": removals + list(result.get("messages") or []),
+                "conversation_summary": state["conversation_summary"],
+            }
+        return result
+
+    return run
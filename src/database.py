@@ -1,7 +1,10 @@
 # database.py
 import os
+import threading
+from datetime import datetime, timedelta, timezone
 from bson import ObjectId
 from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError
 from typing import Optional, Any, Dict
 from langgraph.checkpoint.memory import MemorySaver # Base class for checkpointer
 
@@ -16,10 +19,18 @@ except ImportError:
 
 client = None
 chat_collection = None
+lease_collection = None
+idempotency_collection = None
+intent_cache_collection = None
+clarification_collection = None
+batch_jobs_collection = None
+user_facts_collection = None
+
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
 
 
 def connect_to_db():
-    global client, chat_collection
+    global client, chat_collection, lease_collection, idempotency_collection, intent_cache_collection, clarification_collection, batch_jobs_collection, user_facts_collection
     mongo_uri = settings.MONGO_URI
     if not mongo_uri:
         # Fallback to a clear error if environment is not set
@@ -27,18 +38,41 @@ def connect_to_db():
 
     try:
         # Connect to MongoDB with a timeout
-        client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+        client = MongoClient(
+            mongo_uri,
+            serverSelectionTimeoutMS=5000,
+            minPoolSize=getattr(settings, "MONGO_MIN_POOL_SIZE", 0),
+        )
         # The ismaster command is a cheap way to verify a connection
         client.admin.command('ping')
         print("✅ INFO: Successfully connected to MongoDB.")
         # Ensure the client is connected before getting the database
         db = client.get_database("resume_chatbot_db")
         chat_collection = db.get_collection("chat_sessions")
+        lease_collection = db.get_collection("chat_leases")
+        lease_collection.create_index("expires_at", expireAfterSeconds=0)
+        idempotency_collection = db.get_collection("idempotency_keys")
+        idempotency_collection.create_index("created_at", expireAfterSeconds=IDEMPOTENCY_TTL_SECONDS)
+        intent_cache_collection = db.get_collection("intent_cache")
+        intent_cache_collection.create_index(
+            "created_at", expireAfterSeconds=getattr(settings, "INTENT_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60)
+        )
+        clarification_collection = db.get_collection("clarification_library")
+        clarification_collection.create_index([("section", 1), ("field", 1)])
+        batch_jobs_collection = db.get_collection("batch_jobs")
+        user_facts_collection = db.get_collection("user_facts")
+        chat_collection.create_index("user_id")
     except Exception as e:
         print(f"❌ ERROR: Failed to connect to MongoDB: {e}")
         # Ensure client is reset to None if connection fails
         client = None 
         chat_collection = None
+        lease_collection = None
+        idempotency_collection = None
+        intent_cache_collection = None
+        clarification_collection = None
+        batch_jobs_collection = None
+        user_facts_collection = None
 
 
 def disconnect_db():
@@ -48,7 +82,31 @@ def disconnect_db():
         print("🔌 MongoDB disconnected.")
 
 
-def create_chat_session(user_id: str, role: str = "user") -> str:
+def ping_db() -> bool:
+    if client is None:
+        return False
+    try:
+        client.admin.command('ping')
+        return True
+    except Exception as e:
+        print(f"⚠️ ERROR: MongoDB ping failed: {e}")
+        return False
+
+
+_connect_lock = threading.Lock()
+
+
+def ensure_connected() -> bool:
+    """Connects on first use (or retries after a failed connect); True once connected."""
+    if client is not None:
+        return True
+    with _connect_lock:
+        if client is None:
+            connect_to_db()
+    return client is not None
+
+
+def create_chat_session(user_id: str, role: str = "user", aggregation_window_ms: Optional[int] = None) -> str:
     if chat_collection is None:
         raise ConnectionError("❌ MongoDB collection not initialized. Call connect_to_db() first.")
 
@@ -69,6 +127,8 @@ def create_chat_session(user_id: str, role: str = "user") -> str:
         "ready_for_resume": False,
         "resume_data": resume_data
     }
+    if aggregation_window_ms is not None:
+        chat_doc["aggregation_window_ms"] = aggregation_window_ms
 
     result = chat_collection.insert_one(chat_doc)
     print(f"🟢 DEBUG: Created chat session for user_id={user_id}, chat_id={result.inserted_id}")
@@ -120,12 +180,198 @@ def append_message(chat_id: str, role: str, message: str, section: str = None):
         print(f"⚠️ ERROR: Failed to append message: {e}")
 
 
+def amend_last_message(chat_id: str, role: str, message: str):
+    """Replaces the text of the session's last `role` message (a reply extended after it was logged)."""
+    if chat_collection is None:
+        raise ConnectionError("❌ MongoDB collection not initialized.")
+
+    try:
+        messages = (get_chat_session(chat_id) or {}).get("messages", [])
+        index = next((i for i in range(len(messages) - 1, -1, -1) if messages[i].get("role") == role), None)
+        if index is None:
+            append_message(chat_id, role, message)
+            return
+        chat_collection.update_one(
+            {"_id": ObjectId(chat_id)},
+            {"$set": {f"messages.{index}.message": message}}
+        )
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to amend message: {e}")
+
+
 def get_conversation_history(chat_id: str) -> list:
     session = get_chat_session(chat_id)
     if session:
         return session.get("messages", [])
     return []
 
+# --- Chat turn leases (multi-worker serialization) ---
+
+def acquire_chat_lease(chat_id: str, owner: str, ttl_seconds: int) -> bool:
+    """
+    Takes the turn lease for a chat if it is free or expired.
+    Returns False while another worker holds a live lease.
+    """
+    if lease_collection is None:
+        # Single-process fallback: the in-process lock is all we have
+        return True
+
+    now = datetime.now(timezone.utc)
+    try:
+        lease_collection.find_one_and_update(
+            {"_id": chat_id, "$or": [{"expires_at": {"$lte": now}}, {"owner": owner}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def release_chat_lease(chat_id: str, owner: str):
+    if lease_collection is None:
+        return
+    try:
+        lease_collection.delete_one({"_id": chat_id, "owner": owner})
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to release lease for {chat_id}: {e}")
+
+
+# --- Idempotent responses ---
+
+def get_idempotent_response(chat_id: str, key: str) -> Optional[Dict[str, Any]]:
+    if idempotency_collection is None:
+        return None
+    try:
+        doc = idempotency_collection.find_one({"_id": f"{chat_id}:{key}"})
+        return doc.get("response") if doc else None
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to read idempotency key {key}: {e}")
+        return None
+
+
+def save_idempotent_response(chat_id: str, key: str, response: Dict[str, Any]):
+    if idempotency_collection is None:
+        return
+    try:
+        idempotency_collection.update_one(
+            {"_id": f"{chat_id}:{key}"},
+            {"$set": {"response": response, "created_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to store idempotency key {key}: {e}")
+
+
+def get_cached_intent(key: str) -> Optional[Dict[str, Any]]:
+    if intent_cache_collection is None:
+        return None
+    try:
+        doc = intent_cache_collection.find_one({"_id": key})
+        return doc.get("classification") if doc else None
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to read intent cache: {e}")
+        return None
+
+
+def save_cached_intent(key: str, classification: Dict[str, Any]):
+    if intent_cache_collection is None:
+        return
+    try:
+        intent_cache_collection.update_one(
+            {"_id": key},
+            {"$set": {"classification": classification, "created_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to store intent cache entry: {e}")
+
+
+def load_clarifications(section: str, field: str) -> list:
+    if clarification_collection is None:
+        return []
+    try:
+        return list(clarification_collection.find({"section": section, "field": field}, {"_id": 0}))
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to load clarifications for {section}.{field}: {e}")
+        return []
+
+
+def save_clarification(section: str, field: str, topic: str, clarification: Dict[str, Any]):
+    if clarification_collection is None:
+        return
+    try:
+        clarification_collection.update_one(
+            {"section": section, "field": field, "topic": topic},
+            {"$set": {"clarification": clarification, "created_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to store clarification for {section}.{field}: {e}")
+
+
+# --- Batch job checkpoints (python -m src.batch) ---
+
+def load_batch_checkpoint(job: str) -> Optional[Dict[str, Any]]:
+    if batch_jobs_collection is None:
+        return None
+    try:
+        return batch_jobs_collection.find_one({"_id": job})
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to load batch checkpoint {job}: {e}")
+        return None
+
+
+def save_batch_checkpoint(job: str, last_id: Any, counters: Dict[str, Any]):
+    if batch_jobs_collection is None:
+        return
+    try:
+        batch_jobs_collection.update_one(
+            {"_id": job},
+            {"$set": {"last_id": last_id, "counters": counters, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to save batch checkpoint {job}: {e}")
+
+
+# --- Per-user facts from confirmed entries (src/fact_store.py) ---
+
+def get_user_facts(user_id: str) -> Optional[Dict[str, Any]]:
+    if user_facts_collection is None:
+        return None
+    try:
+        return user_facts_collection.find_one({"_id": user_id})
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to load facts for user {user_id}: {e}")
+        return None
+
+
+def update_user_facts(user_id: str, update: Dict[str, Any]):
+    """Applies a Mongo update document (`$addToSet`, `$set`, ...) to the user's facts."""
+    if user_facts_collection is None:
+        return
+    try:
+        update.setdefault("$set", {})["updated_at"] = datetime.now(timezone.utc)
+        user_facts_collection.update_one({"_id": user_id}, update, upsert=True)
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to update facts for user {user_id}: {e}")
+
+
+def get_user_resume_data(user_id: str) -> list:
+    """`resume_data` of every chat session the user owns, oldest first."""
+    if chat_collection is None:
+        return []
+    try:
+        return [
+            s.get("resume_data") or {}
+            for s in chat_collection.find({"user_id": user_id}, {"resume_data": 1}).sort("_id", 1)
+        ]
+    except Exception as e:
+        print(f"⚠️ ERROR: Failed to load sessions for user {user_id}: {e}")
+        return []
+
+
 # --- Custom MongoDB Checkpointer for LangGraph ---
 
 class MongoDBCustomCheckpointer(MemorySaver):
@@ -1,12 +1,15 @@
 # src/services/education_resume.py
 import json
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 
 from pydantic import BaseModel, Field, ValidationError
 from langchain_core.prompts import PromptTemplate
 from langchain_groq import ChatGroq
 from src.config import settings
+from src.json_stream import stream_ats_json
+from src.llm_scheduler import BACKGROUND, scheduled
+from src.model_tiers import tiered_llm
 
 
 # ============================================================
@@ -336,11 +339,6 @@ CORE OBJECTIVE: Create education section content that:
 
 ---
 
-**RAW EDUCATION DATA:**
-{raw_education}
-
----
-
 **YOUR TASK:**
 1. Read raw data carefully - identify ALL projects, skills, achievements, coursework
 2. Create 2-5 powerful bullet points emphasizing technical projects and achievements
@@ -354,6 +352,9 @@ CORE OBJECTIVE: Create education section content that:
 10. Format GPA/CGPA properly (include if ≥3.5/4.0 or ≥8.0/10.0)
 11. Output ONLY valid JSON (no markdown, no explanations)
 
+**RAW EDUCATION DATA:**
+{raw_education}
+
 **OUTPUT (VALID JSON ONLY):**
 """)
 
@@ -484,7 +485,7 @@ def format_ats_education_with_llm(education: Dict[str, Any], api_key: str) -> Di
         temperature=0.1,
         max_tokens=2500
     )
-    chain = prompt | llm
+    chain = scheduled(prompt | tiered_llm(llm, "ats"), llm, lane=BACKGROUND, est_output_tokens=2000)
 
     # Invoke LLM
     ai_message = chain.invoke({"raw_education": json.dumps(education, indent=2)})
@@ -509,4 +510,38 @@ def format_ats_education_with_llm(education: Dict[str, Any], api_key: str) -> Di
 
     print("SUCCESS: ATS-optimized education JSON generated.")
     print(f"Final output: {json.dumps(final_json, indent=2)}")
-    return final_json
\ No newline at end of file
+    return final_json
+
+
+# ============================================================
+# Streaming Variant – emits fields/bullets as they are generated
+# ============================================================
+def stream_ats_education_with_llm(education: Dict[str, Any], api_key: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming version of `format_ats_education_with_llm`.
+    Yields `field` and `item` events while the LLM is generating, then a
+    `complete` event with the validated ATS JSON.
+    """
+    llm = ChatGroq(
+        model=settings.GROQ_MODEL,
+        api_key=api_key,
+        temperature=0.1,
+        max_tokens=2500,
+        streaming=True
+    )
+    chain = scheduled(prompt | tiered_llm(llm, "ats"), llm, lane=BACKGROUND, est_output_tokens=2000)
+
+    def finalize(clean_json: Dict[str, Any]) -> Dict[str, Any]:
+        validated_json = validate_education_output(clean_json, education)
+        try:
+            return ATSEducation(**validated_json).model_dump()
+        except ValidationError as e:
+            print(f"Pydantic validation error: {e}")
+            return validated_json
+
+    yield from stream_ats_json(
+        chain,
+        {"raw_education": json.dumps(education, indent=2)},
+        finalize=finalize,
+        fallback_parse=extract_clean_json,
+    )
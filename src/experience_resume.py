@@ -1,12 +1,15 @@
 # src/services/experience_resume.py
 import json
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 
 from pydantic import BaseModel, Field, ValidationError
 from langchain_core.prompts import PromptTemplate
 from langchain_groq import ChatGroq
 from src.config import settings
+from src.json_stream import stream_ats_json
+from src.llm_scheduler import BACKGROUND, scheduled
+from src.model_tiers import tiered_llm
 
 
 # ============================================================
@@ -275,11 +278,6 @@ Extract "skills_highlighted" by combining:
 
 ---
 
-**RAW EXPERIENCE DATA:**
-{raw_experience}
-
----
-
 **YOUR TASK:**
 1. Read raw data carefully - identify ALL technologies, responsibilities, outcomes
 2. Create 4-7 powerful bullet points using X-Y-Z formula
@@ -290,6 +288,9 @@ Extract "skills_highlighted" by combining:
 7. Validate - no invented data, all traceable to raw input
 8. Output ONLY valid JSON (no markdown, no explanations)
 
+**RAW EXPERIENCE DATA:**
+{raw_experience}
+
 **OUTPUT (VALID JSON ONLY):**
 """)
 
@@ -385,7 +386,7 @@ def format_ats_experience_with_llm(experience: Dict[str, Any], api_key: str) ->
         temperature=0.1,
         max_tokens=2500
     )
-    chain = prompt | llm
+    chain = scheduled(prompt | tiered_llm(llm, "ats"), llm, lane=BACKGROUND, est_output_tokens=2000)
 
     # Invoke LLM
     ai_message = chain.invoke({"raw_experience": json.dumps(experience, indent=2)})
@@ -410,4 +411,38 @@ def format_ats_experience_with_llm(experience: Dict[str, Any], api_key: str) ->
 
     print("SUCCESS: ATS-optimized experience JSON generated.")
     print(f"Final output: {json.dumps(final_json, indent=2)}")
-    return final_json
\ No newline at end of file
+    return final_json
+
+
+# ============================================================
+# Streaming Variant – emits fields/bullets as they are generated
+# ============================================================
+def stream_ats_experience_with_llm(experience: Dict[str, Any], api_key: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming version of `format_ats_experience_with_llm`.
+    Yields `field` and `item` events while the LLM is generating, then a
+    `complete` event with the validated ATS JSON.
+    """
+    llm = ChatGroq(
+        model=settings.GROQ_MODEL,
+        api_key=api_key,
+        temperature=0.1,
+        max_tokens=2500,
+        streaming=True
+    )
+    chain = scheduled(prompt | tiered_llm(llm, "ats"), llm, lane=BACKGROUND, est_output_tokens=2000)
+
+    def finalize(clean_json: Dict[str, Any]) -> Dict[str, Any]:
+        validated_json = validate_experience_output(clean_json, experience)
+        try:
+            return ATSExperience(**validated_json).model_dump()
+        except ValidationError as e:
+            print(f"Pydantic validation error: {e}")
+            return validated_json
+
+    yield from stream_ats_json(
+        chain,
+        {"raw_experience": json.dumps(experience, indent=2)},
+        finalize=finalize,
+        fallback_parse=extract_clean_json,
+    )
@@ -0,0 +1,165 @@
+# src/fact_store.py
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+import src.database as db
+from src.config import settings
+
+# ============================================================
+# ✅ PER-USER FACT STORE
+# Confirmed entries feed one `user_facts` document per user_id: the
+# tools, skills and project titles they mention, and the organizations
+# (with timelines) they name. When a section starts, values another
+# section already confirmed are proposed instead of asked again - the
+# skills section gets the tools from projects and experience, and
+# achievements / experience share organization names and timelines.
+# ============================================================
+# Confirmed entry field -> fact list it adds to
+FACT_SOURCES: Dict[str, Dict[str, str]] = {
+    "projects": {"title": "projects", "tools": "tools"},
+    "experiences": {"tools_and_technologies": "tools", "skills_gained": "skills"},
+    "achievements": {"skills_demonstrated": "skills"},
+}
+# Sections whose `organization_name` / `timeline` describe the same places
+ORGANIZATION_SECTIONS = ["experiences", "achievements"]
+# Field proposed at section start <- fact list it is filled from
+PREFILL_FIELDS: Dict[str, Dict[str, str]] = {
+    "skills": {
+        "skills_list": "skills",
+        "tools_or_frameworks": "tools",
+        "projects_using_this_skill": "projects",
+    },
+}
+
+
+def _items(value: Any, split: bool = True) -> List[str]:
+    """Non-empty strings from a list, or from a comma-separated string."""
+    if isinstance(value, list):
+        values = value
+    elif isinstance(value, str):
+        values = re.split(r"[,;]", value) if split else [value]
+    else:
+        return []
+    return [str(v).strip() for v in values if isinstance(v, (str, int, float)) and str(v).strip()]
+
+
+def _unique(items: Iterable[str]) -> List[str]:
+    seen, unique = set(), []
+    for item in items:
+        if item.lower() not in seen:
+            seen.add(item.lower())
+            unique.append(item)
+    return unique
+
+
+def _org_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def _entry_update(section: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Mongo update adding one confirmed entry's facts ({} when it has none)."""
+    add: Dict[str, Any] = {}
+    for field, kind in FACT_SOURCES.get(section, {}).items():
+        items = _items(entry.get(field), split=kind != "projects")
+        if items:
+            add.setdefault(kind, {"$each": []})["$each"].extend(items)
+
+    org: Dict[str, Any] = {}
+    name = entry.get("organization_name")
+    if section in ORGANIZATION_SECTIONS and isinstance(name, str) and _org_key(name):
+        key = f"organizations.{_org_key(name)}"
+        org[f"{key}.name"] = name.strip()
+        if entry.get("timeline"):
+            org[f"{key}.timeline"] = entry["timeline"]
+        add[f"{key}.sections"] = section
+
+    update: Dict[str, Any] = {}
+    if add:
+        update["$addToSet"] = add
+    if org:
+        update["$set"] = org
+    return update
+
+
+def _user_id(chat_id: str) -> Optional[str]:
+    session = db.get_chat_session(chat_id) or {}
+    return session.get("user_id")
+
+
+# ============================================================
+# ✅ BUILD / UPDATE
+# ============================================================
+def load_facts(user_id: str) -> Dict[str, Any]:
+    """The user's facts; built from every saved session the first time."""
+    facts = db.get_user_facts(user_id)
+    if facts is not None:
+        return facts
+
+    print(f"🗂️ Building fact store for user {user_id} from saved sessions")
+    for resume_data in db.get_user_resume_data(user_id):
+        for section in dict.fromkeys([*FACT_SOURCES, *ORGANIZATION_SECTIONS]):
+            for entry in resume_data.get(section) or []:
+                update = _entry_update(section, entry)
+                if update:
+                    db.update_user_facts(user_id, update)
+    db.update_user_facts(user_id, {})  # marks the user as built, even with no facts yet
+    return db.get_user_facts(user_id) or {}
+
+
+def record_entry(chat_id: str, section: str, entry: Dict[str, Any]):
+    """Adds a just-confirmed entry's facts (called after the entry is saved)."""
+    if not settings.FACT_PREFILL_ENABLED:
+        return
+    try:
+        user_id = _user_id(chat_id)
+        if not user_id:
+            return
+        if db.get_user_facts(user_id) is None:
+            load_facts(user_id)  # the saved entry is already in resume_data
+            return
+        update = _entry_update(section, entry)
+        if update:
+            db.update_user_facts(user_id, update)
+    except Exception as e:
+        print(f"⚠️ Fact store update failed for {section}: {e}")
+
+
+# ============================================================
+# ✅ PREFILL
+# ============================================================
+def known_values(chat_id: str, section: str, skip: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Values other sections already confirmed for `section`'s fields, to be
+    proposed when it starts. Fields in `skip` (already given in this chat)
+    are left out.
+    """
+    if not settings.FACT_PREFILL_ENABLED:
+        return {}
+    if section not in PREFILL_FIELDS and section not in ORGANIZATION_SECTIONS:
+        return {}
+    try:
+        user_id = _user_id(chat_id)
+        facts = load_facts(user_id) if user_id else {}
+    except Exception as e:
+        print(f"⚠️ Fact store lookup failed for {section}: {e}")
+        return {}
+
+    skip = set(skip)
+    known: Dict[str, Any] = {}
+    for field, kind in PREFILL_FIELDS.get(section, {}).items():
+        items = _unique(facts.get(kind) or [])[:settings.FACT_PREFILL_MAX_ITEMS]
+        if items and field not in skip:
+            known[field] = items
+
+    if section in ORGANIZATION_SECTIONS and "organization_name" not in skip:
+        # Newest organization (in first-confirmed order) this section has no entry for yet
+        orgs = [o for o in (facts.get("organizations") or {}).values() if section not in o.get("sections", [])]
+        if orgs:
+            org = orgs[-1]
+            known["organization_name"] = org["name"]
+            if org.get("timeline") and "timeline" not in skip:
+                known["timeline"] = org["timeline"]
+
+    if known:
+        print(f"🗂️ Known values for {section}: {list(known)}")
+    return known
@@ -0,0 +1,45 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Header
+from typing import Optional
+
+from src.config import settings
+from src.schemas import ImportResumeRequest
+
+router = APIRouter()
+
+# ============================================================
+# ✅ BULK IMPORT (pasted resume / LinkedIn export)
+# ============================================================
+@router.post("/resume")
+async def import_resume_text(
+    request: ImportResumeRequest,
+    x_api_key: Optional[str] = Header(None, alias="x-api-key")
+):
+    try:
+        if not x_api_key:
+            raise HTTPException(400, "Missing LLM API key in header (x-api-key)")
+        if len(request.text) > settings.IMPORT_MAX_CHARS:
+            raise HTTPException(413, f"Resume text is limited to {settings.IMPORT_MAX_CHARS} characters")
+
+        from src.resume_import import import_resume
+
+        sections = await asyncio.to_thread(import_resume, request.user_id, request.text, x_api_key)
+        imported = sum(len(chats) for chats in sections.values())
+
+        return {
+            "status": True,
+            "message": f"Imported {imported} entries" if imported else "No resume entries found in the text",
+            "data": {
+                "sections": sections,
+                "missing_sections": [name for name, chats in sections.items() if not chats],
+            },
+        }
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        return {
+            "status": False,
+            "message": f"Error importing resume: {str(e)}",
+            "data": None,
+        }
@@ -0,0 +1,106 @@
+# src/intent_cache.py
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import src.database as db
+from src.config import settings
+
+# ============================================================
+# ✅ TWO-LEVEL INTENT CACHE
+# L1: in-process LRU. L2: shared MongoDB collection with a TTL index.
+# Only short, context-independent replies are cached ("idk", "recap
+# please", "what do you mean?"); the key is the cleaned message plus the
+# section and the field being asked. L2 is shared across users, so only
+# replies from a closed vocabulary (yes / no / skip / done ...) go there;
+# anything else a user typed stays in this process's L1.
+# ============================================================
+# Cleaned form (see `clean_user_input`: lower case, no punctuation)
+SHARED_REPLIES = frozenset({
+    "yes", "yeah", "yep", "yup", "sure", "ok", "okay", "correct", "right",
+    "no", "nope", "nah", "not really", "wrong",
+    "skip", "skip it", "skip this", "pass", "next", "none", "nothing", "na",
+    "idk", "i dont know", "dont know", "not sure", "no idea",
+    "done", "thats all", "thats it", "finished", "looks good", "submit",
+    "edit", "change", "change it", "recap", "recap please", "summary", "go back",
+    "what", "what do you mean", "huh", "help", "i dont understand", "explain",
+    "thanks", "thank you",
+})
+_lru: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_lock = threading.Lock()
+_stats = {"lookups": 0, "memory_hits": 0, "db_hits": 0, "misses": 0, "not_cacheable": 0, "stored": 0}
+
+
+def cache_key(section: str, field: Optional[str], clean_message: str) -> Optional[str]:
+    """Key for `clean_user_input(message)`, or None when the message should not be cached."""
+    words = clean_message.split()
+    if not words or len(words) > settings.INTENT_CACHE_MAX_WORDS:
+        return None
+    # Numbers, dates and links are answers, not reusable intents
+    if re.search(r"\d", clean_message) or "http" in clean_message or "www" in clean_message:
+        return None
+    return f"{section}:{field or '-'}:{' '.join(words)}"
+
+
+def _shared(key: str) -> bool:
+    """True when the key's message is in the closed vocabulary kept in L2."""
+    return key.split(":", 2)[2] in SHARED_REPLIES
+
+
+def get_cached_intent(section: str, field: Optional[str], clean_message: str) -> Optional[Dict[str, Any]]:
+    if not settings.INTENT_CACHE_ENABLED:
+        return None
+    key = cache_key(section, field, clean_message)
+    with _lock:
+        _stats["lookups"] += 1
+        if key is None:
+            _stats["not_cacheable"] += 1
+            return None
+        if key in _lru:
+            _lru.move_to_end(key)
+            _stats["memory_hits"] += 1
+            return dict(_lru[key])
+        if not _shared(key):
+            _stats["misses"] += 1
+            return None
+
+    value = db.get_cached_intent(key)
+    with _lock:
+        if value is None:
+            _stats["misses"] += 1
+            return None
+        _stats["db_hits"] += 1
+        _remember(key, value)
+    return dict(value)
+
+
+def store_intent(section: str, field: Optional[str], clean_message: str, classification: Dict[str, Any]) -> None:
+    if not settings.INTENT_CACHE_ENABLED:
+        return
+    key = cache_key(section, field, clean_message)
+    if key is None or classification.get("confidence", 0.0) < settings.INTENT_CACHE_MIN_CONFIDENCE:
+        return
+    with _lock:
+        _remember(key, classification)
+        _stats["stored"] += 1
+    if _shared(key):
+        db.save_cached_intent(key, classification)
+
+
+def _remember(key: str, value: Dict[str, Any]) -> None:
+    _lru[key] = value
+    _lru.move_to_end(key)
+    while len(_lru) > settings.INTENT_CACHE_MAX_ENTRIES:
+        _lru.popitem(last=False)
+
+
+def intent_cache_metrics() -> Dict[str, Any]:
+    with _lock:
+        hits = _stats["memory_hits"] + _stats["db_hits"]
+        lookups = _stats["lookups"]
+        return {
+            **_stats,
+            "entries": len(_lru),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
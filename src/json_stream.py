@@ -0,0 +1,211 @@
+# src/json_stream.py
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+# ============================================================
+# ✅ INCREMENTAL JSON PARSER
+# ============================================================
+class IncrementalJSONParser:
+    """
+    Consumes a JSON object chunk by chunk (e.g. an LLM token stream) and
+    reports pieces of it as soon as they are syntactically complete:
+
+    - ("field", key, value)        a top-level key's value is complete
+    - ("item", key, index, value)  an element of a top-level array is complete
+    - ("delta", key, text)         new characters of a tracked top-level string
+
+    Anything before the first '{' (markdown fences, chatter) is ignored.
+    """
+
+    def __init__(self, track_strings: Iterable[str] = ()):
+        self.track_strings = set(track_strings)
+        self._buf = ""
+        self._pos = 0
+        self._obj_start: Optional[int] = None
+        self._obj_end: Optional[int] = None
+        self._stack: List[Dict[str, Any]] = []
+        self._in_str = False
+        self._escape = False
+        self._str_start = 0
+        self._str_is_key = False
+        self._delta_sent = 0
+
+    @property
+    def done(self) -> bool:
+        return self._obj_end is not None
+
+    def feed(self, chunk: str) -> List[tuple]:
+        """Adds a chunk of text and returns the events it completed."""
+        events: List[tuple] = []
+        if not chunk or self.done:
+            return events
+
+        self._buf += chunk
+        buf = self._buf
+        i = self._pos
+        while i < len(buf) and not self.done:
+            c = buf[i]
+
+            if self._obj_start is None:
+                if c == "{":
+                    self._obj_start = i
+                    self._stack.append(self._new_frame("obj"))
+                i += 1
+                continue
+
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_str = False
+                    self._end_string(i, events)
+                i += 1
+                continue
+
+            top = self._stack[-1]
+            if c == '"':
+                self._in_str = True
+                self._str_start = i + 1
+                self._str_is_key = top["type"] == "obj" and top["expect_key"]
+                if not self._str_is_key:
+                    self._mark_value_start(top, i)
+                    self._delta_sent = 0
+            elif c in "{[":
+                self._mark_value_start(top, i)
+                self._stack.append(self._new_frame("obj" if c == "{" else "arr"))
+            elif c in "}]":
+                self._close_scalar(top, i, events)
+                self._stack.pop()
+                if not self._stack:
+                    self._obj_end = i
+                else:
+                    self._complete_value(self._stack[-1], i + 1, events)
+            elif c == ":":
+                if top["type"] == "obj":
+                    top["expect_key"] = False
+            elif c == ",":
+                self._close_scalar(top, i, events)
+                if top["type"] == "obj":
+                    top["expect_key"] = True
+            elif not c.isspace():
+                self._mark_value_start(top, i)
+            i += 1
+
+        self._pos = i
+        if self._in_str and not self._str_is_key:
+            self._emit_delta(events, len(self._buf))
+        return events
+
+    def result(self) -> Dict[str, Any]:
+        """Returns the fully parsed object once the closing brace was seen."""
+        if not self.done:
+            raise ValueError("JSON object is not complete yet")
+        return json.loads(self._buf[self._obj_start:self._obj_end + 1])
+
+    # ------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------
+    @staticmethod
+    def _new_frame(kind: str) -> Dict[str, Any]:
+        return {"type": kind, "expect_key": kind == "obj", "key": None, "value_start": None, "count": 0}
+
+    def _emitting_key(self) -> Optional[str]:
+        """The top-level key whose value (or array element) is being read."""
+        if len(self._stack) == 1:
+            return self._stack[0]["key"]
+        if len(self._stack) == 2 and self._stack[1]["type"] == "arr":
+            return self._stack[0]["key"]
+        return None
+
+    @staticmethod
+    def _mark_value_start(frame: Dict[str, Any], i: int) -> None:
+        if frame["value_start"] is not None:
+            return
+        if frame["type"] == "arr" or not frame["expect_key"]:
+            frame["value_start"] = i
+
+    def _end_string(self, i: int, events: List[tuple]) -> None:
+        top = self._stack[-1]
+        if self._str_is_key:
+            top["key"] = json.loads(self._buf[self._str_start - 1:i + 1])
+            return
+        self._emit_delta(events, i)
+        self._complete_value(top, i + 1, events)
+
+    def _close_scalar(self, frame: Dict[str, Any], i: int, events: List[tuple]) -> None:
+        if frame["value_start"] is not None:
+            self._complete_value(frame, i, events)
+
+    def _complete_value(self, frame: Dict[str, Any], end: int, events: List[tuple]) -> None:
+        start = frame["value_start"]
+        frame["value_start"] = None
+        if start is None:
+            return
+        key = self._emitting_key()
+        if key is None:
+            return
+        try:
+            value = json.loads(self._buf[start:end].strip())
+        except ValueError:
+            return
+        if len(self._stack) == 1:
+            events.append(("field", key, value))
+        else:
+            events.append(("item", key, frame["count"], value))
+            frame["count"] += 1
+
+    def _emit_delta(self, events: List[tuple], end: int) -> None:
+        if len(self._stack) != 1 or self._stack[0]["key"] not in self.track_strings:
+            return
+        text = _decode_partial(self._buf[self._str_start:end])
+        if len(text) > self._delta_sent:
+            events.append(("delta", self._stack[0]["key"], text[self._delta_sent:]))
+            self._delta_sent = len(text)
+
+
+def _decode_partial(raw: str) -> str:
+    """Decodes a JSON string body that may end in the middle of an escape."""
+    for cut in range(0, 7):
+        candidate = raw[:len(raw) - cut] if cut else raw
+        try:
+            return json.loads(f'"{candidate}"')
+        except ValueError:
+            continue
+    return ""
+
+
+# ============================================================
+# ✅ STREAMING ATS DRIVER
+# ============================================================
+def stream_ats_json(
+    chain,
+    inputs: Dict[str, Any],
+    finalize: Callable[[Dict[str, Any]], Dict[str, Any]],
+    fallback_parse: Callable[[str], Dict[str, Any]],
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streams an ATS formatter chain and yields NDJSON-ready events:
+    `field` / `item` while the LLM is still generating, then a single
+    `complete` event carrying the validated object from `finalize`.
+    """
+    parser = IncrementalJSONParser()
+    raw_output = ""
+
+    for chunk in chain.stream(inputs):
+        text = chunk.content if hasattr(chunk, "content") else str(chunk)
+        raw_output += text
+        for event in parser.feed(text):
+            if event[0] == "field":
+                yield {"event": "field", "field": event[1], "value": event[2]}
+            elif event[0] == "item":
+                yield {"event": "item", "field": event[1], "index": event[2], "value": event[3]}
+
+    try:
+        parsed = parser.result()
+    except ValueError:
+        parsed = fallback_parse(raw_output)
+
+    yield {"event": "complete", "data": finalize(parsed)}
@@ -0,0 +1,155 @@
+# src/llm_hedging.py
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Any, Callable, Dict, Optional
+
+from src.config import settings
+
+# Shared pool for primary + hedge calls; callers block on the futures.
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+
+
+# ============================================================
+# ✅ PER-ROLE LATENCY TRACKING
+# ============================================================
+class _HedgeTracker:
+    def __init__(self, role: str):
+        self.role = role
+        self.lock = threading.Lock()
+        self.samples: deque = deque(maxlen=settings.LLM_HEDGE_WINDOW)
+        self.decisions: deque = deque(maxlen=settings.LLM_HEDGE_WINDOW)
+        self.stats = {"calls": 0, "hedged": 0, "hedge_wins": 0, "skipped_by_cap": 0}
+
+    def observe(self, seconds: float) -> None:
+        with self.lock:
+            self.samples.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Configured percentile of recent latency, or None while warming up."""
+        with self.lock:
+            if len(self.samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self.samples)
+        index = int(settings.LLM_HEDGE_PERCENTILE * (len(ordered) - 1))
+        return max(ordered[index], settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+
+    def allow_hedge(self) -> bool:
+        with self.lock:
+            rate = sum(self.decisions) / len(self.decisions) if self.decisions else 0.0
+            if rate >= settings.LLM_HEDGE_MAX_RATE:
+                self.stats["skipped_by_cap"] += 1
+                return False
+            return True
+
+    def finish(self, hedged: bool, hedge_won: bool = False) -> None:
+        with self.lock:
+            self.decisions.append(hedged)
+            self.stats["calls"] += 1
+            self.stats["hedged"] += int(hedged)
+            self.stats["hedge_wins"] += int(hedge_won)
+
+    def snapshot(self) -> Dict[str, Any]:
+        delay = self.hedge_delay()
+        with self.lock:
+            calls = self.stats["calls"]
+            return {
+                **self.stats,
+                "hedge_rate": round(self.stats["hedged"] / calls, 4) if calls else 0.0,
+                "hedge_delay_seconds": round(delay, 3) if delay is not None else None,
+                "samples": len(self.samples),
+            }
+
+
+_trackers: Dict[str, _HedgeTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def _tracker(role: str) -> _HedgeTracker:
+    with _trackers_lock:
+        if role not in _trackers:
+            _trackers[role] = _HedgeTracker(role)
+        return _trackers[role]
+
+
+def hedge_metrics() -> Dict[str, Any]:
+    with _trackers_lock:
+        trackers = list(_trackers.values())
+    return {t.role: t.snapshot() for t in trackers}
+
+
+# ============================================================
+# ✅ HEDGED RUNNABLE
+# ============================================================
+class HedgedRunnable:
+    """
+    Wraps a short, idempotent agent. When `invoke` has not returned within
+    the role's latency percentile, a duplicate call is fired and whichever
+    succeeds first is returned. `stream` is passed through unchanged.
+
+    The calls are blocking HTTP requests in worker threads, so the losing
+    call cannot be interrupted once started: it is cancelled if still
+    queued, otherwise its result is discarded.
+    """
+
+    def __init__(self, runnable, role: str):
+        self.runnable = runnable
+        self.role = role
+
+    def stream(self, input, config=None, **kwargs):
+        return self.runnable.stream(input, config, **kwargs)
+
+    def invoke(self, input, config=None, **kwargs):
+        if not settings.LLM_HEDGING_ENABLED:
+            return self.runnable.invoke(input, config, **kwargs)
+
+        tracker = _tracker(self.role)
+        call = lambda: self.runnable.invoke(input, config, **kwargs)
+        primary = _submit(call, tracker)
+
+        delay = tracker.hedge_delay()
+        try:
+            result = primary.result(timeout=delay)
+            tracker.finish(hedged=False)
+            return result
+        except FutureTimeout:
+            pass
+
+        if not tracker.allow_hedge():
+            result = primary.result()
+            tracker.finish(hedged=False)
+            return result
+
+        print(f"🪁 Hedging slow {self.role} call after {delay:.2f}s")
+        backup = _submit(call, tracker)
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    tracker.finish(hedged=True, hedge_won=future is backup)
+                    return future.result()
+                error = error or future.exception()
+        tracker.finish(hedged=True)
+        raise error
+
+
+def _submit(call: Callable[[], Any], tracker: _HedgeTracker):
+    context = contextvars.copy_context()
+
+    def timed():
+        started = time.monotonic()
+        result = context.run(call)
+        tracker.observe(time.monotonic() - started)
+        return result
+
+    return _executor.submit(timed)
+
+
+def hedged(runnable, role: str) -> HedgedRunnable:
+    return HedgedRunnable(runnable, role)
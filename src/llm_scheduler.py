@@ -0,0 +1,388 @@
+# src/llm_scheduler.py
+import asyncio
+import hashlib
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.config import settings
+from src.turn_deadline import DeadlineExceeded, call_timeout, remaining
+
+# ============================================================
+# ✅ PRIORITY LANES
+# Lower value = served first when a key is saturated.
+# ============================================================
+INTERACTIVE = 0   # chat turns: intent, extraction, questions, clarifications
+BACKGROUND = 1    # ATS formatting, previews, batch jobs
+
+LANE_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+class RateLimitedError(Exception):
+    """Raised when a call is still rate-limited after the scheduler's retries."""
+
+
+# ============================================================
+# ✅ TOKEN BUCKET
+# ============================================================
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate if self.rate > 0 else 1.0
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount
+
+    def adjust(self, delta: float) -> None:
+        """Charges (positive) or refunds (negative) tokens after the fact."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+# ============================================================
+# ✅ PER-KEY STATE
+# ============================================================
+class _KeyState:
+    def __init__(self):
+        self.requests = TokenBucket(settings.LLM_RPM_LIMIT)
+        self.tokens = TokenBucket(settings.LLM_TPM_LIMIT)
+        self.limit = float(settings.LLM_INITIAL_CONCURRENCY)
+        self.in_flight = 0
+        self.waiting: List[tuple] = []          # heap of (lane, seq)
+        self.paused_until = 0.0
+        self.stats = {
+            "completed": 0,
+            "failed": 0,
+            "rate_limited": 0,
+            "queued_total": 0,
+            "wait_seconds_total": 0.0,
+            "max_queue_depth": 0,
+            "deadline_dropped": 0,
+            "cache_reported_calls": 0,
+            "prompt_tokens_reported": 0,
+            "cached_prompt_tokens": 0,
+        }
+
+
+class _Ticket:
+    def __init__(self, key: str, lane: int, est_tokens: int, waited: float):
+        self.key = key
+        self.lane = lane
+        self.est_tokens = est_tokens
+        self.waited = waited
+        self.started = time.monotonic()
+
+
+# ============================================================
+# ✅ SCHEDULER
+# ============================================================
+class LLMScheduler:
+    """
+    Central gate for every LLM call. Per API key it enforces request and
+    token budgets (token buckets), serves waiting calls by lane priority,
+    and adapts the allowed concurrency AIMD-style: additive increase on
+    fast successes, multiplicative decrease on 429s or slow responses.
+
+    The agents run synchronously in worker threads, so the gate itself is
+    thread-based; `arun` exposes it to async callers.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._keys: Dict[str, _KeyState] = {}
+        self._seq = itertools.count()
+
+    def _state(self, key: str) -> _KeyState:
+        if key not in self._keys:
+            self._keys[key] = _KeyState()
+        return self._keys[key]
+
+    # ------------------------------------------------------------
+    # Acquire / release
+    # ------------------------------------------------------------
+    def acquire(self, key: str, lane: int = INTERACTIVE, est_tokens: int = 0) -> _Ticket:
+        queued_at = time.monotonic()
+        with self._cond:
+            state = self._state(key)
+            entry = (lane, next(self._seq))
+            heapq.heappush(state.waiting, entry)
+            state.stats["queued_total"] += 1
+            state.stats["max_queue_depth"] = max(state.stats["max_queue_depth"], len(state.waiting))
+
+            while True:
+                wait = self._blocked_for(state, entry, est_tokens)
+                if wait == 0.0:
+                    break
+                left = remaining()
+                if left is not None and left <= 0:
+                    # Give up the slot: the turn will answer without this call
+                    state.waiting.remove(entry)
+                    heapq.heapify(state.waiting)
+                    state.stats["deadline_dropped"] += 1
+                    self._cond.notify_all()
+                    raise DeadlineExceeded("Turn deadline exceeded while queued for the LLM")
+                self._cond.wait(timeout=wait if left is None else min(wait, left))
+
+            heapq.heappop(state.waiting)
+            state.in_flight += 1
+            state.requests.take(1)
+            state.tokens.take(est_tokens)
+            waited = time.monotonic() - queued_at
+            state.stats["wait_seconds_total"] += waited
+            # Let the next waiter re-check now that the head has moved
+            self._cond.notify_all()
+            return _Ticket(key, lane, est_tokens, waited)
+
+    def _blocked_for(self, state: _KeyState, entry: tuple, est_tokens: int) -> float:
+        """0.0 when `entry` may start now, else how long to sleep before re-checking."""
+        if state.waiting[0] != entry:
+            return 0.5
+        pause = state.paused_until - time.monotonic()
+        if pause > 0:
+            return pause
+        if state.in_flight >= max(1, int(state.limit)):
+            return 0.5
+        return max(state.requests.wait_time(1), state.tokens.wait_time(est_tokens))
+
+    def release(
+        self,
+        ticket: _Ticket,
+        ok: bool,
+        actual_tokens: Optional[int] = None,
+        rate_limited: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        latency = time.monotonic() - ticket.started
+        with self._cond:
+            state = self._state(ticket.key)
+            state.in_flight -= 1
+            if actual_tokens is not None:
+                state.tokens.adjust(actual_tokens - ticket.est_tokens)
+
+            if rate_limited:
+                state.stats["rate_limited"] += 1
+                state.limit = max(settings.LLM_MIN_CONCURRENCY, state.limit / 2)
+                state.paused_until = time.monotonic() + (retry_after or settings.LLM_RATE_LIMIT_BACKOFF_SECONDS)
+            elif not ok:
+                state.stats["failed"] += 1
+            elif latency > settings.LLM_LATENCY_TARGET_SECONDS:
+                state.stats["completed"] += 1
+                state.limit = max(settings.LLM_MIN_CONCURRENCY, state.limit * 0.8)
+            else:
+                state.stats["completed"] += 1
+                state.limit = min(settings.LLM_MAX_CONCURRENCY, state.limit + 1.0 / max(state.limit, 1.0))
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------
+    # Call helpers
+    # ------------------------------------------------------------
+    def run(self, key: str, fn: Callable[[], Any], lane: int = INTERACTIVE, est_tokens: int = 0) -> Any:
+        """Runs `fn` under the key's budget, retrying provider 429s with backoff."""
+        attempts = settings.LLM_RATE_LIMIT_RETRIES + 1
+        for attempt in range(attempts):
+            ticket = self.acquire(key, lane, est_tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    self.release(ticket, ok=False, rate_limited=True, retry_after=_retry_after(e))
+                    print(f"⏳ LLM rate-limited ({LANE_NAMES.get(lane)}), attempt {attempt + 1}/{attempts}")
+                    if attempt + 1 < attempts:
+                        continue
+                    raise RateLimitedError(str(e)) from e
+                self.release(ticket, ok=False)
+                raise
+            self.release(ticket, ok=True, actual_tokens=usage_tokens(result))
+            self._record_cache_usage(key, result)
+            return result
+
+    def _record_cache_usage(self, key: str, result: Any) -> None:
+        """Prompt-cache hits, for providers that report cached prompt tokens."""
+        usage = cache_usage(result)
+        if usage is None:
+            return
+        prompt_tokens, cached_tokens = usage
+        with self._cond:
+            stats = self._state(key).stats
+            stats["cache_reported_calls"] += 1
+            stats["prompt_tokens_reported"] += prompt_tokens
+            stats["cached_prompt_tokens"] += cached_tokens
+
+    async def arun(self, key: str, fn: Callable[[], Any], lane: int = INTERACTIVE, est_tokens: int = 0) -> Any:
+        return await asyncio.to_thread(self.run, key, fn, lane, est_tokens)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                _key_label(key): {
+                    "queue_depth": len(state.waiting),
+                    "queue_depth_by_lane": {
+                        name: sum(1 for lane, _ in state.waiting if lane == value)
+                        for value, name in LANE_NAMES.items()
+                    },
+                    "in_flight": state.in_flight,
+                    "concurrency_limit": round(state.limit, 2),
+                    "requests_available": round(state.requests.tokens, 1),
+                    "tokens_available": round(state.tokens.tokens, 1),
+                    "paused_for_seconds": round(max(0.0, state.paused_until - time.monotonic()), 2),
+                    "prompt_cache_hit_ratio": (
+                        round(state.stats["cached_prompt_tokens"] / state.stats["prompt_tokens_reported"], 3)
+                        if state.stats["prompt_tokens_reported"] else None
+                    ),
+                    **state.stats,
+                }
+                for key, state in self._keys.items()
+            }
+
+
+# ============================================================
+# ✅ RUNNABLE WRAPPER
+# ============================================================
+class ScheduledRunnable:
+    """
+    Wraps a LangChain runnable (a bound agent or a prompt | llm chain) so
+    that `invoke` and `stream` go through the scheduler.
+    """
+
+    def __init__(self, runnable, key: str, lane: int = INTERACTIVE, est_output_tokens: int = 300):
+        self.runnable = runnable
+        self.key = key
+        self.lane = lane
+        self.est_output_tokens = est_output_tokens
+
+    def invoke(self, input, config=None, **kwargs):
+        def call():
+            return self.runnable.invoke(input, config, **_with_deadline(kwargs))
+
+        return get_scheduler().run(
+            self.key,
+            call,
+            lane=self.lane,
+            est_tokens=estimate_tokens(input) + self.est_output_tokens,
+        )
+
+    def stream(self, input, config=None, **kwargs) -> Iterator[Any]:
+        scheduler = get_scheduler()
+        ticket = scheduler.acquire(self.key, self.lane, estimate_tokens(input) + self.est_output_tokens)
+        ok, rate_limited, retry_after = False, False, None
+        try:
+            yield from self.runnable.stream(input, config, **_with_deadline(kwargs))
+            ok = True
+        except Exception as e:
+            rate_limited = is_rate_limit_error(e)
+            retry_after = _retry_after(e)
+            raise
+        finally:
+            scheduler.release(ticket, ok=ok, rate_limited=rate_limited, retry_after=retry_after)
+
+
+def scheduled(runnable, llm, lane: int = INTERACTIVE, est_output_tokens: int = 300) -> ScheduledRunnable:
+    """Wraps `runnable`, keyed by the API key `llm` was built with."""
+    return ScheduledRunnable(runnable, api_key_of(llm), lane=lane, est_output_tokens=est_output_tokens)
+
+
+# ============================================================
+# ✅ HELPERS
+# ============================================================
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+    return _scheduler
+
+
+def api_key_of(llm) -> str:
+    secret = getattr(llm, "groq_api_key", None)
+    if secret is None:
+        return "default"
+    return secret.get_secret_value() if hasattr(secret, "get_secret_value") else str(secret)
+
+
+def _key_label(key: str) -> str:
+    """Metrics never expose raw API keys."""
+    return "key-" + hashlib.sha256(key.encode()).hexdigest()[:10]
+
+
+def _with_deadline(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Caps the provider request timeout at what is left of the turn."""
+    timeout = call_timeout()
+    if timeout is None:
+        return kwargs
+    return {**kwargs, "timeout": min(timeout, kwargs.get("timeout") or timeout)}
+
+
+def estimate_tokens(input: Any) -> int:
+    """Rough prompt size (≈4 characters per token) used for budgeting."""
+    if isinstance(input, str):
+        return len(input) // 4
+    if isinstance(input, dict):
+        return sum(len(str(v)) for v in input.values()) // 4
+    if isinstance(input, (list, tuple)):
+        return sum(len(str(getattr(m, "content", m))) for m in input) // 4
+    return len(str(input)) // 4
+
+
+def usage_tokens(result: Any) -> Optional[int]:
+    usage = getattr(result, "usage_metadata", None)
+    if usage and usage.get("total_tokens"):
+        return usage["total_tokens"]
+    token_usage = (getattr(result, "response_metadata", None) or {}).get("token_usage") or {}
+    return token_usage.get("total_tokens")
+
+
+def cache_usage(result: Any) -> Optional[Tuple[int, int]]:
+    """
+    `(prompt_tokens, cached_prompt_tokens)` when the provider reports cached
+    tokens (LangChain's `input_token_details.cache_read` or the OpenAI-style
+    `prompt_tokens_details.cached_tokens`), else None.
+    """
+    usage = getattr(result, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    if "cache_read" in details:
+        return usage.get("input_tokens") or 0, details["cache_read"] or 0
+    token_usage = (getattr(result, "response_metadata", None) or {}).get("token_usage") or {}
+    details = token_usage.get("prompt_tokens_details") or {}
+    if "cached_tokens" in details:
+        return token_usage.get("prompt_tokens") or 0, details["cached_tokens"] or 0
+    return None
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    if getattr(e, "status_code", None) == 429:
+        return True
+    text = str(e).lower()
+    return "429" in text or "rate limit" in text or "rate_limit" in text
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -1,12 +1,25 @@
-from fastapi import FastAPI
+import asyncio
+import threading
+from fastapi import FastAPI, WebSocket
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 import src.database as db
+from src.config import settings
 from src.project_route import router as project_router 
 from src.experience_route import router as experience_router 
 from src.education_route import router as education_router 
 from src.achievements_route import router as achievements_router 
 from src.skills_route import router as skills_router 
+from src.import_route import router as import_router
+from src.chat_route import router as chat_router
+from src.ws_chat import serve_chat_socket
+from src.llm_scheduler import get_scheduler
+from src.llm_hedging import hedge_metrics
+from src.circuit_breaker import breaker_metrics
+from src.intent_cache import intent_cache_metrics
+from src.clarification_library import clarification_library_metrics
+from src.warmup import dependencies, is_ready, run_warmup, skip_warmup, stop_warmup, warmup_state
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -14,9 +27,15 @@ from fastapi.middleware.cors import CORSMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # initialize DB connection at startup and close at shutdown
-    db.connect_to_db()
+    # Importing the app connects nothing; the warm-up connects the DB and
+    # compiles the section graphs in the background while /readyz says 503
+    if settings.WARMUP_ENABLED:
+        threading.Thread(target=run_warmup, name="warmup", daemon=True).start()
+    else:
+        db.ensure_connected()
+        skip_warmup()
     yield
+    stop_warmup()
     db.disconnect_db()
 
 app = FastAPI(
@@ -27,7 +46,7 @@ app = FastAPI(
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5173" ,"https://resume-chatbot-frontend.onrender.com"],
+    allow_origins=settings.CORS_ALLOW_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -40,3 +59,41 @@ app.include_router(experience_router, prefix="/api/v1/chatbot/experience")
 app.include_router(education_router, prefix="/api/v1/chatbot/education")
 app.include_router(achievements_router, prefix="/api/v1/chatbot/achievements")
 app.include_router(skills_router, prefix="/api/v1/chatbot/skills")
+app.include_router(import_router, prefix="/api/v1/chatbot/import")
+# One session across every section, routed by the orchestrator
+app.include_router(chat_router, prefix="/api/v1/chatbot/chat")
+
+
+# Liveness: the process is serving (no dependency is checked live)
+@app.get("/healthz")
+async def healthz():
+    return {"status": "alive", "warmup": warmup_state(), "dependencies": dependencies()}
+
+
+# Readiness: warm-up finished and MongoDB answers a ping; 503 until then
+@app.get("/readyz")
+async def readyz():
+    deps = await asyncio.to_thread(dependencies, True)
+    ready = is_ready(deps)
+    body = {"status": "ready" if ready else "not_ready", "warmup": warmup_state(), "dependencies": deps}
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+# One socket for every section; each client frame names its "section"
+@app.websocket("/api/v1/chatbot/ws/{chat_id}")
+async def chat_socket(websocket: WebSocket, chat_id: str):
+    await serve_chat_socket(websocket, chat_id)
+
+
+# Queue depth, concurrency limit and budget usage per (hashed) API key,
+# hedging statistics per agent role, circuit state per model and the
+# intent-cache / clarification-library hit rates
+@app.get("/api/v1/chatbot/metrics/llm")
+async def llm_metrics():
+    return {
+        "keys": get_scheduler().metrics(),
+        "hedging": hedge_metrics(),
+        "circuits": breaker_metrics(),
+        "intent_cache": intent_cache_metrics(),
+        "clarification_library": clarification_library_metrics(),
+    }
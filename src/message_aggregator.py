@@ -0,0 +1,113 @@
+# src/message_aggregator.py
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.config import settings
+from src.session_guard import chat_turn_lock, remember_response, replay_response, run_serialized_turn
+
+
+# ============================================================
+# ✅ PENDING BATCHES
+# A batch stays open (accepting messages) until its turn actually starts,
+# i.e. through the debounce window and while it waits behind a turn that
+# is already in flight for the same chat. A retry carrying an
+# Idempotency-Key the batch already holds waits for its result instead of
+# adding the same text again, until the batch's turn has answered.
+# ============================================================
+class _Batch:
+    def __init__(self, first_message: str):
+        self.messages: List[str] = [first_message]
+        self.idempotency_keys: Set[str] = set()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def add_key(self, chat_id: str, idempotency_key: Optional[str]):
+        if idempotency_key:
+            self.idempotency_keys.add(idempotency_key)
+            _keyed_batches[(chat_id, idempotency_key)] = self
+
+    def release_keys(self, chat_id: str):
+        for key in self.idempotency_keys:
+            if _keyed_batches.get((chat_id, key)) is self:
+                _keyed_batches.pop((chat_id, key))
+
+
+_open_batches: Dict[str, _Batch] = {}
+# (chat_id, Idempotency-Key) -> batch that has not answered yet (open or running)
+_keyed_batches: Dict[Tuple[str, str], _Batch] = {}
+
+
+def resolve_window_ms(session: Optional[Dict[str, Any]]) -> int:
+    """Per-chat window from the session document, else the deployment default."""
+    window = (session or {}).get("aggregation_window_ms")
+    if window is None:
+        window = settings.MESSAGE_AGGREGATION_WINDOW_MS
+    return max(int(window), 0)
+
+
+async def run_aggregated_turn(
+    chat_id: str,
+    user_message: str,
+    window_ms: int,
+    idempotency_key: Optional[str],
+    handler: Callable[..., dict],
+    app,
+    **handler_kwargs,
+) -> Dict[str, Any]:
+    """
+    Like `run_serialized_turn`, but messages that arrive for the same chat
+    within `window_ms`, or while the previous turn is still running, are
+    merged into one graph input and answered once. Every merged request
+    receives the same result.
+    """
+    if window_ms <= 0:
+        return await run_serialized_turn(
+            chat_id, idempotency_key, handler, chat_id, user_message, app, **handler_kwargs
+        )
+
+    cached = await replay_response(chat_id, idempotency_key)
+    if cached is not None:
+        return cached
+
+    pending = _keyed_batches.get((chat_id, idempotency_key)) if idempotency_key else None
+    if pending is not None:
+        print(f"🔁 Retry of a pending turn for {chat_id}; waiting for its result")
+        return await asyncio.shield(pending.future)
+
+    batch = _open_batches.get(chat_id)
+    if batch is not None:
+        batch.messages.append(user_message)
+        batch.add_key(chat_id, idempotency_key)
+        print(f"🧺 Merged message into pending turn for {chat_id} ({len(batch.messages)} messages)")
+        result = await asyncio.shield(batch.future)
+        await remember_response(chat_id, idempotency_key, result)
+        return result
+
+    batch = _Batch(user_message)
+    batch.add_key(chat_id, idempotency_key)
+    _open_batches[chat_id] = batch
+    try:
+        await asyncio.sleep(window_ms / 1000)
+        async with chat_turn_lock(chat_id):
+            # Close the batch: anything arriving from now on starts the next one
+            if _open_batches.get(chat_id) is batch:
+                _open_batches.pop(chat_id)
+
+            combined = "\n".join(batch.messages)
+            result = await asyncio.to_thread(handler, chat_id, combined, app, **handler_kwargs)
+            result = {**result, "aggregated_messages": len(batch.messages)}
+            await remember_response(chat_id, idempotency_key, result)
+
+        batch.future.set_result(result)
+        return result
+    except BaseException as e:
+        if _open_batches.get(chat_id) is batch:
+            _open_batches.pop(chat_id)
+        if not batch.future.done():
+            if isinstance(e, asyncio.CancelledError):
+                batch.future.cancel()
+            else:
+                batch.future.set_exception(e)
+                batch.future.exception()  # mark as retrieved when nobody merged in
+        raise
+    finally:
+        batch.release_keys(chat_id)
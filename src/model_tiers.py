@@ -0,0 +1,96 @@
+# src/model_tiers.py
+from typing import Dict, List, Optional
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.circuit_breaker import GuardedRunnable, breaker_for
+from src.config import settings
+from src.llm_hedging import hedged
+from src.llm_scheduler import scheduled
+
+# ============================================================
+# ✅ AGENT ROLES
+# ============================================================
+ROLE_MODELS = {
+    "intent": "LLM_MODEL_INTENT",
+    "extraction": "LLM_MODEL_EXTRACTION",
+    "question": "LLM_MODEL_QUESTION",
+    "clarification": "LLM_MODEL_CLARIFICATION",
+    "ats": "LLM_MODEL_ATS",
+}
+
+# Short, idempotent calls that may be hedged (see src/llm_hedging.py)
+HEDGED_ROLES = {"intent", "extraction", "question"}
+
+
+def models_for(role: str, field: Optional[str] = None) -> List[str]:
+    """
+    Model chain for a role: the per-field override (extraction only), the
+    role's model, then GROQ_MODEL and LLM_MODEL_FALLBACKS. Duplicates and
+    unset tiers are skipped.
+    """
+    if role not in ROLE_MODELS:
+        raise KeyError(f"Unknown agent role '{role}'")
+
+    chain = []
+    if field and role == "extraction":
+        chain.append(settings.LLM_MODEL_EXTRACTION_OVERRIDES.get(field))
+    chain.append(getattr(settings, ROLE_MODELS[role]))
+    chain.append(settings.GROQ_MODEL)
+    chain.extend(settings.LLM_MODEL_FALLBACKS)
+
+    models = []
+    for model in chain:
+        if model and model not in models:
+            models.append(model)
+    return models
+
+
+def llm_available(role: str, field: Optional[str] = None) -> bool:
+    """False while every model in the role's chain has an open circuit (offline mode)."""
+    return any(breaker_for(m).available() for m in models_for(role, field))
+
+
+def _with_model(llm, model: str):
+    """Same client/key/temperature, different model."""
+    if getattr(llm, "model_name", None) == model:
+        return llm
+    return llm.model_copy(update={"model_name": model})
+
+
+# ============================================================
+# ✅ TIERED BUILDERS
+# ============================================================
+def tiered_llm(llm, role: str, field: Optional[str] = None):
+    """`llm` switched to the role's model, falling back along its chain on errors."""
+    models = [GuardedRunnable(_with_model(llm, m), m) for m in models_for(role, field)]
+    if len(models) == 1:
+        return models[0]
+    return models[0].with_fallbacks(models[1:])
+
+
+_tool_cache: Dict[type, dict] = {}
+
+
+def tool_schema(schema) -> dict:
+    """`convert_to_openai_tool(schema)`, computed once per schema (the warm-up fills this)."""
+    if schema not in _tool_cache:
+        _tool_cache[schema] = convert_to_openai_tool(schema)
+    return _tool_cache[schema]
+
+
+def build_agent(llm, schema, role: str, field: Optional[str] = None):
+    """
+    Binds `schema` as a forced tool call on the role's model chain (each
+    model behind its circuit breaker) and routes it through the LLM
+    scheduler (and hedging, for short calls).
+    """
+    tool = tool_schema(schema)
+    bound = [
+        GuardedRunnable(_with_model(llm, m).bind_tools([tool], tool_choice=schema.__name__), m)
+        for m in models_for(role, field)
+    ]
+    runnable = bound[0].with_fallbacks(bound[1:]) if len(bound) > 1 else bound[0]
+
+    agent = scheduled(runnable, llm)
+    return hedged(agent, role) if role in HEDGED_ROLES else agent
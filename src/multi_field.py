@@ -0,0 +1,178 @@
+# src/multi_field.py
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, Field
+
+from src.config import settings
+from src.model_tiers import llm_available
+from src.prompt_compiler import current_date
+from src.token_budget import fit_prompt
+
+# ============================================================
+# ✅ DATA MODELS
+# ============================================================
+class ExtractedField(BaseModel):
+    field_name: str = Field(..., description="Name of the field, exactly as listed in <FIELDS>")
+    extracted_value: Any = Field(None, description="Value stated in the message, in the field's format")
+    confidence: float = Field(0.0, ge=0.0, le=1.0, description="1.0 only when the message states it explicitly")
+
+
+class MultiFieldExtractionResult(BaseModel):
+    fields: List[ExtractedField] = Field(
+        default_factory=list,
+        description="Every listed field the user's message clearly answers; empty if none"
+    )
+
+
+# ============================================================
+# ✅ PROMPTS
+# ============================================================
+MULTI_FIELD_SYSTEM_PROMPT = """You read one message from a user who is describing a resume {section} entry and pick out every other field it already answers, so the chatbot does not ask for it again.
+
+<RULES>
+1. Only fields listed in <FIELDS>. Only values the user states explicitly in <USER_MESSAGE> - never guess, infer or fill in defaults.
+2. List fields (marked [list]) are arrays of short strings, e.g. ["React", "Node.js"].
+3. A timeline is {{"start_date": "Month Year", "end_date": "Month Year" | "Present"}} unless the field description says otherwise; resolve relative dates ("last spring") with <CURRENT_DATE>.
+4. Numbers (team sizes, counts) are integers.
+5. If the message only answers the field currently being asked (<CURRENT_FIELD>), return an empty list.
+</RULES>"""
+
+_system_cache: Dict[str, str] = {}
+
+
+def _system_prompt(section: str) -> str:
+    if section not in _system_cache:
+        _system_cache[section] = MULTI_FIELD_SYSTEM_PROMPT.format(section=section)
+    return _system_cache[section]
+
+
+def _fields_block(fields: Iterable[str], descriptions: Dict[str, str], list_fields: Iterable[str]) -> str:
+    return "\n".join(
+        f"- {f}{' [list]' if f in list_fields else ''}: {descriptions.get(f, f.replace('_', ' '))}"
+        for f in fields
+    )
+
+
+# ============================================================
+# ✅ EXTRACTION
+# ============================================================
+def should_try(message: str) -> bool:
+    """Short replies ("React", "yes", "2023") answer one field at most."""
+    return settings.MULTI_FIELD_EXTRACTION_ENABLED and len(message.split()) >= settings.MULTI_FIELD_MIN_WORDS
+
+
+def extract_other_fields(
+    agent,
+    section: str,
+    current_field: str,
+    pending_fields: List[str],
+    descriptions: Dict[str, str],
+    list_fields: Iterable[str],
+    user_message: str,
+) -> Dict[str, Any]:
+    """
+    One call that returns `{field: value}` for the pending fields the
+    message explicitly answers (confidence >= MULTI_FIELD_MIN_CONFIDENCE).
+    Errors are logged and yield an empty dict.
+    """
+    if not pending_fields:
+        return {}
+
+    list_fields = list(list_fields)
+    system = _system_prompt(section)
+    message = fit_prompt("extraction", system, message=user_message)["message"]
+    prompt = f"""<FIELDS>
+{_fields_block(pending_fields, descriptions, list_fields)}
+</FIELDS>
+
+<CURRENT_FIELD>{current_field}</CURRENT_FIELD>
+
+<USER_MESSAGE>
+{message}
+</USER_MESSAGE>
+
+<CURRENT_DATE>{current_date()}</CURRENT_DATE>
+"""
+    try:
+        result = agent.invoke([SystemMessage(content=system), HumanMessage(content=prompt)])
+        if not result.tool_calls:
+            print(f"⚠️ No tool call for multi-field extraction. Response: {result.content}")
+            return {}
+        extraction = MultiFieldExtractionResult(**result.tool_calls[0]["args"])
+    except Exception as e:
+        print(f"❌ Multi-field extraction error: {e}")
+        return {}
+
+    found = {}
+    for item in extraction.fields:
+        if item.field_name not in pending_fields or item.confidence < settings.MULTI_FIELD_MIN_CONFIDENCE:
+            continue
+        value = item.extracted_value
+        if item.field_name in list_fields and isinstance(value, str):
+            value = [value]
+        if value not in (None, "", [], {}):
+            found[item.field_name] = value
+    if found:
+        print(f"🧩 Multi-field extraction filled: {list(found)}")
+    return found
+
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="multi-field")
+
+
+def submit_other_fields(
+    agent,
+    section: str,
+    current_field: str,
+    pending: List[str],
+    descriptions: Dict[str, str],
+    list_fields: Iterable[str],
+    user_message: str,
+) -> Future:
+    """
+    Runs `extract_other_fields` alongside the current-field extraction.
+    The future resolves to `{}` straight away when the message is too short,
+    nothing is pending or the extraction models are unavailable.
+    """
+    if not pending or agent is None or not should_try(user_message) or not llm_available("extraction"):
+        done = Future()
+        done.set_result({})
+        return done
+    ctx = contextvars.copy_context()
+    return _executor.submit(
+        ctx.run, extract_other_fields, agent, section, current_field, pending, descriptions, list_fields, user_message
+    )
+
+
+def filled_note(filled: List[str]) -> str:
+    if not filled:
+        return ""
+    names = [f.replace('_', ' ') for f in filled]
+    listed = names[0] if len(names) == 1 else f"{', '.join(names[:-1])} and {names[-1]}"
+    return f"(I've also noted your {listed} from that.) "
+
+
+def merge_other_fields(
+    data: dict,
+    completion: Dict[str, bool],
+    found: Dict[str, Any],
+    list_fields: Iterable[str],
+) -> List[str]:
+    """Writes `found` into the entry, marks those fields complete and returns their names."""
+    filled = []
+    for field, value in found.items():
+        if field in list_fields and isinstance(value, list):
+            current = data.get(field) or []
+            data[field] = current + [item for item in value if item not in current]
+        else:
+            data[field] = value
+        completion[field] = True
+        filled.append(field)
+    return filled
+
+
+def pending_fields(all_fields: Iterable[str], completion: Dict[str, bool], current_field: Optional[str]) -> List[str]:
+    return [f for f in all_fields if not completion.get(f, False) and f != current_field]
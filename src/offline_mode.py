@@ -0,0 +1,72 @@
+# src/offline_mode.py
+import re
+from typing import Any, Dict, Iterable, Tuple
+
+# ============================================================
+# ✅ DETERMINISTIC FALLBACKS
+# Used while the LLM circuit is open: no provider call, plain rules.
+# ============================================================
+URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+RANGE_PATTERN = re.compile(r"^(?:from\s+)?(.+?)\s*(?:-|–|—|\bto\b|\buntil\b|\btill\b)\s*(.+)$", re.IGNORECASE)
+NUMBER_PATTERN = re.compile(r"\d+")
+LIST_SPLIT_PATTERN = re.compile(r"\s*(?:,|;|\n|\band\b|&)\s*", re.IGNORECASE)
+# Marks an offline capture; the engine re-extracts those fields once the circuit closes
+OFFLINE_REASONING = "Offline deterministic extraction (LLM unavailable)"
+
+OFFLINE_INTENT_KEYWORDS = {
+    "request_summary": ["so far", "recap", "summary", "what do you have"],
+    "request_done": ["thats all", "im done", "i am done", "lets finish", "stop"],
+    "request_clarification": ["what do you mean", "dont understand", "do not understand", "explain", "meaning of", "not sure what"],
+}
+
+
+def offline_intent(clean_message: str) -> Dict[str, Any]:
+    """Keyword intent rules over `clean_user_input(message)`."""
+    for intent, keywords in OFFLINE_INTENT_KEYWORDS.items():
+        if any(k in clean_message for k in keywords):
+            return {
+                "intent": intent,
+                "confidence": 0.6,
+                "reasoning": "Offline keyword rules (LLM unavailable)",
+                "clarification_topic": None,
+            }
+    return {
+        "intent": "answer_question",
+        "confidence": 0.6,
+        "reasoning": "Offline default (LLM unavailable)",
+        "clarification_topic": None,
+    }
+
+
+def offline_extract(field: str, message: str, current: Any, list_fields: Iterable[str]) -> Tuple[Any, bool]:
+    """
+    Best-effort value for `field` from the user's latest message.
+    Returns `(value, is_complete)`; the engine re-extracts the field with
+    the LLM once it is back, and the user can still correct it at the
+    confirmation step.
+    """
+    text = message.strip()
+    if not text:
+        return current, False
+
+    if "link" in field or "url" in field:
+        urls = URL_PATTERN.findall(text)
+        if urls:
+            return (urls if field in list_fields else urls[0]), True
+
+    if field == "timeline":
+        match = RANGE_PATTERN.match(text)
+        if match:
+            return {"start_date": match.group(1).strip(), "end_date": match.group(2).strip()}, True
+        return {"start_date": None, "end_date": text}, True
+
+    if field in list_fields:
+        items = [item.strip(" .") for item in LIST_SPLIT_PATTERN.split(text) if item and item.strip(" .")]
+        return items, bool(items)
+
+    if field.endswith("_size") or field.endswith("_count"):
+        number = NUMBER_PATTERN.search(text)
+        if number:
+            return int(number.group()), True
+
+    return text, True
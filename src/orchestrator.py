@@ -0,0 +1,523 @@
+# src/orchestrator.py
+import re
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict, List, Optional, TypedDict
+
+import src.database as db
+from src.config import settings
+from src.database import MongoDBCustomCheckpointer
+from src.fact_store import known_values
+from src.multi_field import merge_other_fields, pending_fields, should_try, submit_other_fields
+from src.section_engine import CONFIRM_NO, CONFIRM_YES, clean_user_input
+from src.sections import SECTIONS, get_section, initial_section_state
+
+# ============================================================
+# ✅ ORCHESTRATOR
+# One chat session for the whole resume: a router graph over the five
+# section graphs. Each section keeps its own checkpointed state on the
+# same thread id (one checkpointer per section) and every turn goes to
+# the session's one message log. The orchestrator's own state is which
+# section is active, which are done, values a message gave for
+# sections the user has not reached yet ("carried"), and values other
+# sections already confirmed, proposed when a section starts ("prefill").
+# ============================================================
+SECTION_ORDER = list(SECTIONS)
+
+SECTION_NAMES = {
+    "projects": r"projects?",
+    "experiences": r"(?:work )?experiences?|jobs?|internships?|work history",
+    "education": r"education|degrees?|college|university|school",
+    "skills": r"skills?",
+    "achievements": r"achievements?|awards?|certifications?|honou?rs",
+}
+# Whole-message commands only ("skills", "let's do education", "back to my projects"),
+# so an answer that merely mentions a section never switches
+SWITCH_PATTERN = re.compile(
+    r"^\s*(?:(?:ok(?:ay)?|now|so|and)[\s,]+)?"
+    r"(?:let'?s\s+(?:do|add|talk about|move on to|go to|go back to|switch to)|switch to|move on to|go to|go back to|back to|on to|add|start)?\s*"
+    r"(?:my\s+|the\s+)?(?P<name>" + "|".join(f"(?P<{s}>{p})" for s, p in SECTION_NAMES.items()) + r")"
+    r"(?:\s+(?:section|now|next|please))*\s*[.!]*\s*$",
+    re.IGNORECASE,
+)
+NEXT_PATTERN = re.compile(r"^\s*(?:next|next section|continue|move on|what'?s next)\s*[.!?]*\s*$", re.IGNORECASE)
+
+
+class OrchestratorState(TypedDict, total=False):
+    chat_id: str
+    user_message: str
+    requested_section: Optional[str]
+    active_section: Optional[str]
+    completed_sections: List[str]
+    carried: Dict[str, Dict[str, Any]]
+    prefill: Dict[str, Dict[str, Any]]
+    route: str
+    target: Optional[str]
+    result: Dict[str, Any]
+
+
+def _config(chat_id: str) -> dict:
+    return {"configurable": {"thread_id": chat_id}}
+
+
+def section_values(section: str, chat_id: str) -> Dict[str, Any]:
+    state = get_section(section)["engine"].app.get_state(_config(chat_id))
+    return state.values if state and state.values else {}
+
+
+def section_status(values: Dict[str, Any]) -> str:
+    if not values or values.get("is_first_message", True):
+        return "not_started"
+    return "complete" if values.get("is_complete") else "in_progress"
+
+
+def _describe(values: Dict[str, Any]) -> str:
+    lines = []
+    for field, value in values.items():
+        if isinstance(value, list):
+            value = ", ".join(map(str, value))
+        elif isinstance(value, dict):
+            value = f"{value.get('start_date', '')} - {value.get('end_date', 'Present')}"
+        lines.append(f"- {field.replace('_', ' ').title()}: {value}")
+    return "\n".join(lines)
+
+
+def _progress(section: str, completion: Dict[str, bool]) -> int:
+    all_fields = get_section(section)["all_fields"]
+    done = sum(1 for f in all_fields if completion.get(f))
+    return int(done / len(all_fields) * 100) if all_fields else 0
+
+
+class Orchestrator:
+    """
+    Routes each message of a unified chat to one section graph (the active
+    one, or the one the message switches to) and lets the same message
+    fill fields of the other sections (see `_submit_spillover`).
+    """
+
+    def __init__(self):
+        self._api_key: ContextVar[Optional[str]] = ContextVar("orchestrator_api_key", default=None)
+        self._app = None
+        self._lock = Lock()
+
+    @property
+    def app(self):
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    self._app = self.build_graph()
+        return self._app
+
+    def next_section(self, completed: List[str], after: Optional[str] = None) -> Optional[str]:
+        """First unfinished section after `after` (wrapping around to `after` itself), in registry order."""
+        start = SECTION_ORDER.index(after) + 1 if after in SECTION_ORDER else 0
+        for section in SECTION_ORDER[start:] + SECTION_ORDER[:start]:
+            if section not in completed:
+                return section
+        return None
+
+    def _result(self, chat_id: str, section: str, content: str, completion: Dict[str, bool], is_complete: bool = False) -> Dict[str, Any]:
+        return {
+            "chat_id": chat_id,
+            "ai_response": content,
+            "current_section": section,
+            "is_complete": is_complete,
+            "percentage": _progress(section, completion),
+            "status": completion,
+        }
+
+    # ============================================================
+    # ✅ NODES
+    # ============================================================
+    def route_node(self, state: OrchestratorState) -> dict:
+        message = state.get("user_message", "")
+        requested = state.get("requested_section")
+        active = state.get("active_section")
+        completed = state.get("completed_sections", [])
+
+        # A reply to the known-values proposal (anything but a switch / "next")
+        proposed = requested or active
+        if (proposed in state.get("prefill", {}) and message.strip()
+                and not SWITCH_PATTERN.match(message) and not NEXT_PATTERN.match(message)):
+            return {"route": "prefill", "target": proposed}
+
+        if requested:
+            status = section_status(section_values(requested, state["chat_id"]))
+            route = "enter" if status == "not_started" or not message.strip() else "turn"
+            return {"route": route, "target": requested}
+
+        switch = SWITCH_PATTERN.match(message)
+        if switch:
+            target = next(s for s in SECTION_NAMES if switch.group(s))
+            return {"route": "enter", "target": target}
+
+        # Nothing active yet or "next": open the next unfinished section with its
+        # welcome question. A bare (re)start picks the active section back up
+        # where it stopped. Anything else goes to the active section, even once
+        # it is saved (its own edit flow handles "change the title to ...").
+        if active is None:
+            target = self.next_section(completed)
+        elif not message.strip() and active not in completed:
+            target = active
+        elif NEXT_PATTERN.match(message) or not message.strip():
+            target = self.next_section(completed, after=active)
+        else:
+            return {"route": "turn", "target": active}
+        if target is None:
+            return {"route": "finished", "target": active}
+        return {"route": "enter", "target": target}
+
+    def enter_node(self, state: OrchestratorState) -> dict:
+        """Starts the target section, resumes it where it stopped, or shows it if it is already saved."""
+        chat_id, section = state["chat_id"], state["target"]
+        spec = get_section(section)
+        engine = spec["engine"]
+        carried = dict(state.get("carried", {}))
+        prefill = dict(state.get("prefill", {}))
+        values = section_values(section, chat_id)
+        status = section_status(values)
+        print(f"🧭 Orchestrator: entering {section} ({status})")
+        self._log_user(state, section)
+        prefill.pop(section, None)
+        known = known_values(chat_id, section, skip=carried.get(section, {})) if status == "not_started" else {}
+
+        if status == "complete":
+            entry = values.get(engine.entry_key, {})
+            following = self.next_section(state.get("completed_sections", []), after=section)
+            content = f"Your {engine.entry_label} is already saved:\n{engine.summarize(entry)}"
+            if following:
+                content += f"\n\nSay 'next' to continue with your {get_section(following)['entry_label']}."
+            spec["send_message"](chat_id, content)
+            result = self._result(chat_id, section, content, values.get("field_completion_status", {}), is_complete=True)
+
+        elif status == "in_progress":
+            result = self._resume(chat_id, section, values)
+
+        elif known:
+            prefill[section] = known
+            result = self._propose(chat_id, section, known)
+
+        elif carried.get(section):
+            result = self._seed(chat_id, section, carried.pop(section))
+
+        else:
+            result = self._start(chat_id, section)
+
+        return {"active_section": section, "carried": carried, "prefill": prefill, "result": result}
+
+    def _log_user(self, state: OrchestratorState, section: Optional[str]) -> None:
+        """Logs the user's message on routes that do not hand it to a section handler (which logs its own)."""
+        message = state.get("user_message", "")
+        if message.strip():
+            db.append_message(state["chat_id"], "user", message, section)
+
+    def _start(self, chat_id: str, section: str) -> Dict[str, Any]:
+        """Runs the section's start node (its welcome question)."""
+        engine = get_section(section)["engine"]
+        response = engine.app.invoke(initial_section_state(chat_id, section), _config(chat_id))
+        messages = response.get("messages") or []
+        return self._result(chat_id, section, messages[-1].content if messages else engine.welcome,
+                            response.get("field_completion_status", {}))
+
+    def _propose(self, chat_id: str, section: str, known: Dict[str, Any]) -> Dict[str, Any]:
+        engine = get_section(section)["engine"]
+        content = (
+            f"Before we start on your {engine.entry_label}, here's what I already know from your other sections:\n"
+            f"{_describe(known)}"
+            "\n\n**Should I use these?** (Please respond 'yes' or 'no')."
+        )
+        engine.send_message(chat_id, content)
+        return self._result(chat_id, section, content, {})
+
+    def _resume(self, chat_id: str, section: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        engine = get_section(section)["engine"]
+        entry = values.get(engine.entry_key, {})
+        completion = values.get("field_completion_status", {})
+        ask_counts = dict(values.get("field_ask_count", {}))
+        field = values.get("current_field")
+        if not field or completion.get(field):
+            field = engine.next_field(completion)
+
+        if field:
+            ask_counts[field] = ask_counts.get(field, 0) + 1
+            content = f"Back to your {engine.entry_label}. Could you tell me about the {field.replace('_', ' ')}?"
+        else:
+            content = (
+                f"Back to your {engine.entry_label}:\n{engine.summarize(entry)}"
+                "\n\n**Does everything look correct?** (Please respond 'yes' or 'no')."
+            )
+        msg = engine.send_message(chat_id, content)
+        engine.app.update_state(_config(chat_id), {
+            "messages": [msg],
+            "current_field": field,
+            "field_ask_count": ask_counts,
+            "awaiting_confirmation": field is None,
+            "awaiting_field_to_edit": False,
+        }, as_node="process")
+        return self._result(chat_id, section, content, completion)
+
+    def _seed(self, chat_id: str, section: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Starts `section` with the values other sections' answers already gave it."""
+        engine = get_section(section)["engine"]
+        completion = {f: f in entry for f in engine.all_fields}
+        ask_counts = {f: 0 for f in engine.all_fields}
+        field = engine.next_field(completion)
+        intro = f"Let's add your {engine.entry_label}. From what you've told me so far, I have:\n{engine.summarize(entry)}"
+        if field:
+            ask_counts[field] = 1
+            content = f"{intro}\n\nCould you tell me about the {field.replace('_', ' ')}?"
+        else:
+            content = f"{intro}\n\n**Does everything look correct?** (Please respond 'yes' or 'no')."
+        msg = engine.send_message(chat_id, content)
+        engine.app.update_state(_config(chat_id), {
+            **initial_section_state(chat_id, section),
+            "messages": [msg],
+            engine.entry_key: entry,
+            engine.collected_key: [],
+            "field_completion_status": completion,
+            "field_ask_count": ask_counts,
+            "current_field": field,
+            "conversation_context": "Continuing from another section",
+            "is_first_message": False,
+            "awaiting_confirmation": field is None,
+            "awaiting_field_to_edit": False,
+        }, as_node="start")
+        return self._result(chat_id, section, content, completion)
+
+    def prefill_node(self, state: OrchestratorState) -> dict:
+        """Yes: start the section with the proposed values. No: start it empty."""
+        chat_id, section, message = state["chat_id"], state["target"], state["user_message"]
+        engine = get_section(section)["engine"]
+        carried = dict(state.get("carried", {}))
+        prefill = dict(state.get("prefill", {}))
+        self._log_user(state, section)
+        reply = clean_user_input(message)
+
+        if any(w in reply for w in CONFIRM_YES):
+            print(f"🗂️ Prefill accepted for {section}")
+            entry = dict(prefill.pop(section))
+            # Values given in this chat win over the remembered ones
+            merge_other_fields(entry, {}, carried.pop(section, {}), engine.list_fields)
+            result = self._seed(chat_id, section, entry)
+        elif any(w in reply for w in CONFIRM_NO):
+            print(f"🗂️ Prefill declined for {section}")
+            prefill.pop(section)
+            result = self._seed(chat_id, section, carried.pop(section)) if carried.get(section) else self._start(chat_id, section)
+        else:
+            content = f"I didn't quite catch that. Should I use what I already know for your {engine.entry_label}? (Please respond 'yes' or 'no')."
+            engine.send_message(chat_id, content)
+            result = self._result(chat_id, section, content, {})
+
+        return {"active_section": section, "carried": carried, "prefill": prefill, "result": result}
+
+    def turn_node(self, state: OrchestratorState) -> dict:
+        chat_id, section, message = state["chat_id"], state["target"], state["user_message"]
+        spec = get_section(section)
+        api_key = self._api_key.get()
+        carried = {s: dict(v) for s, v in state.get("carried", {}).items()}
+        completed = list(state.get("completed_sections", []))
+        # The per-section routes pin every turn to one section: no other
+        # section is filled and there is no "next" to point at
+        routed = state.get("requested_section") is None
+
+        # Other sections' extractions run while the active section handles the turn
+        spillover = self._submit_spillover(chat_id, section, message, api_key, carried, completed) if routed else {}
+        result = dict(spec["handler"](chat_id, message, api_key=api_key))
+        filled = self._apply_spillover(chat_id, spillover, carried)
+        newly_complete = result.get("is_complete") and section not in completed
+        if newly_complete:
+            completed.append(section)
+        elif not result.get("is_complete") and section in completed:
+            completed.remove(section)  # reopened for an edit; saving it again completes it again
+
+        notes = []
+        if filled:
+            noted = " and ".join(
+                f"{', '.join(f.replace('_', ' ') for f in fields)} for your {get_section(s)['entry_label']}"
+                for s, fields in filled.items()
+            )
+            notes.append(f"(I've also noted your {noted}.)")
+        if newly_complete and routed:
+            following = self.next_section(completed, after=section)
+            if following:
+                notes.append(f"Next up: your {get_section(following)['entry_label']}. Say 'next' when you're ready, or name another section.")
+            else:
+                notes.append("That was the last section - your resume is complete! 🎉")
+        elif routed and result.get("is_complete"):
+            # A message to a section that was already saved (and was not an edit)
+            following = self.next_section(completed, after=section)
+            if following:
+                notes.append(f"Say 'next' to continue with your {get_section(following)['entry_label']}, or name another section.")
+        if notes:
+            result["ai_response"] = self._extend_reply(chat_id, section, result["ai_response"], "\n\n".join(notes))
+        if filled:
+            result["also_updated"] = filled
+        # Later turns of a saved section also report is_complete; only this one saved it
+        result["entry_saved"] = bool(newly_complete)
+
+        return {"active_section": section, "completed_sections": completed, "carried": carried, "result": result}
+
+    def _extend_reply(self, chat_id: str, section: str, reply: str, note: str) -> str:
+        """Appends `note` to the section's reply in place: one AI message in the log and in its graph state."""
+        from langchain_core.messages import AIMessage
+
+        content = f"{reply}\n\n{note}"
+        db.amend_last_message(chat_id, "ai", content)
+        engine = get_section(section)["engine"]
+        messages = section_values(section, chat_id).get("messages") or []
+        last = next((m for m in reversed(messages) if isinstance(m, AIMessage)), None)
+        if last is not None:
+            engine.app.update_state(_config(chat_id), {"messages": [AIMessage(content=content, id=last.id)]}, as_node="process")
+        return content
+
+    def finished_node(self, state: OrchestratorState) -> dict:
+        chat_id = state["chat_id"]
+        self._log_user(state, state.get("active_section"))
+        content = "Every section of your resume is saved. Name a section (e.g. 'skills') to review it."
+        db.append_message(chat_id, "ai", content)
+        section = state.get("active_section") or SECTION_ORDER[-1]
+        values = section_values(section, chat_id)
+        return {"result": self._result(chat_id, section, content, values.get("field_completion_status", {}), is_complete=True)}
+
+    # ============================================================
+    # ✅ CROSS-SECTION FILL ("spillover")
+    # One message can answer fields of other sections ("I built it in
+    # React while interning at Acme" -> skills, experience). Unfinished
+    # sections get one multi-field extraction each, in parallel with the
+    # active section's turn; values land in their graph state if they are
+    # in progress, or are carried until the user reaches them.
+    # ============================================================
+    def _submit_spillover(self, chat_id: str, primary: str, message: str, api_key: str,
+                          carried: Dict[str, Dict[str, Any]], completed: List[str]) -> Dict[str, tuple]:
+        if not settings.ORCHESTRATOR_SPILLOVER_ENABLED or not should_try(message):
+            return {}
+        futures = {}
+        for section in SECTION_ORDER:
+            if section == primary or section in completed:
+                continue
+            spec = get_section(section)
+            engine = spec["engine"]
+            values = section_values(section, chat_id)
+            status = section_status(values)
+            if status == "complete" or values.get("awaiting_confirmation"):
+                continue
+            if status == "in_progress":
+                completion = values.get("field_completion_status", {})
+            else:
+                completion = {f: f in carried.get(section, {}) for f in engine.all_fields}
+            futures[section] = (status, submit_other_fields(
+                engine.multi_field_agent(api_key),
+                section,
+                "",
+                pending_fields(engine.all_fields, completion, None),
+                engine.metadata.get("fields_we_collect", {}),
+                engine.list_fields,
+                message,
+            ))
+        return futures
+
+    def _apply_spillover(self, chat_id: str, futures: Dict[str, tuple], carried: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+        filled = {}
+        for section, (status, future) in futures.items():
+            try:
+                found = future.result()
+            except Exception as e:
+                print(f"⚠️ Spillover extraction failed for {section}: {e}")
+                continue
+            if not found:
+                continue
+            engine = get_section(section)["engine"]
+            if status == "in_progress":
+                values = section_values(section, chat_id)
+                entry = dict(values.get(engine.entry_key) or {})
+                completion = dict(values.get("field_completion_status") or {})
+                names = merge_other_fields(entry, completion, found, engine.list_fields)
+                engine.app.update_state(_config(chat_id), {
+                    engine.entry_key: entry,
+                    "field_completion_status": completion,
+                }, as_node="process")
+            else:
+                names = merge_other_fields(carried.setdefault(section, {}), {}, found, engine.list_fields)
+            print(f"🔀 Spillover into {section}: {names}")
+            filled[section] = names
+        return filled
+
+    # ============================================================
+    # ✅ BUILD GRAPH
+    # ============================================================
+    def build_graph(self):
+        from langgraph.graph import StateGraph, END
+
+        if not db.ensure_connected():
+            raise ConnectionError("❌ MongoDB unavailable; orchestrator graph not compiled.")
+        graph = StateGraph(OrchestratorState)
+        graph.add_node("route", self.route_node)
+        graph.add_node("enter", self.enter_node)
+        graph.add_node("turn", self.turn_node)
+        graph.add_node("prefill", self.prefill_node)
+        graph.add_node("finished", self.finished_node)
+        graph.add_edge("__start__", "route")
+        graph.add_conditional_edges("route", lambda s: s["route"])
+        graph.add_edge("enter", END)
+        graph.add_edge("turn", END)
+        graph.add_edge("prefill", END)
+        graph.add_edge("finished", END)
+        app = graph.compile(checkpointer=MongoDBCustomCheckpointer(db.client))
+        print("✅ ORCHESTRATOR GRAPH COMPILED")
+        return app
+
+    # ============================================================
+    # ✅ ENTRY POINTS
+    # ============================================================
+    def _invoke(self, chat_id: str, user_message: str, api_key: Optional[str], section: Optional[str]) -> Dict[str, Any]:
+        if section is not None:
+            get_section(section)  # unknown names fail before anything is logged
+        token = self._api_key.set(api_key)
+        try:
+            self.app.invoke(
+                {"chat_id": chat_id, "user_message": user_message, "requested_section": section},
+                {**_config(chat_id), "recursion_limit": 5},
+            )
+        finally:
+            self._api_key.reset(token)
+        values = self.app.get_state(_config(chat_id)).values
+        return {**values["result"], "completed_sections": values.get("completed_sections", [])}
+
+    def start(self, chat_id: str, api_key: Optional[str] = None, section: Optional[str] = None) -> Dict[str, Any]:
+        """Opens `section` (default: the first unfinished one) with its welcome question."""
+        return self._invoke(chat_id, "", api_key, section)
+
+    def handle_message(self, chat_id: str, user_message: str, app=None, api_key: Optional[str] = None, section: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One user turn. `section` pins the turn to that section (the
+        per-section routes); without it the orchestrator routes. `app` is
+        accepted for the shared handler signature and not used.
+        """
+        return self._invoke(chat_id, user_message, api_key, section)
+
+    def current_section(self, chat_id: str) -> Optional[str]:
+        state = self.app.get_state(_config(chat_id))
+        return state.values.get("active_section") if state and state.values else None
+
+    def progress(self, chat_id: str) -> Dict[str, Any]:
+        """Per-section status and percentage for one session."""
+        state = self.app.get_state(_config(chat_id))
+        values = state.values if state and state.values else {}
+        sections = {}
+        for section in SECTION_ORDER:
+            section_state = section_values(section, chat_id)
+            sections[section] = {
+                "status": section_status(section_state),
+                "percentage": _progress(section, section_state.get("field_completion_status", {})),
+                "carried_fields": list(values.get("carried", {}).get(section, {})),
+                "proposed_fields": list(values.get("prefill", {}).get(section, {})),
+            }
+        return {
+            "chat_id": chat_id,
+            "active_section": values.get("active_section"),
+            "completed_sections": values.get("completed_sections", []),
+            "sections": sections,
+        }
+
+
+ORCHESTRATOR = Orchestrator()
@@ -2,13 +2,16 @@
 
 import json
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field, ValidationError, validator
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_groq import ChatGroq
 from src.config import settings
+from src.json_stream import stream_ats_json
+from src.llm_scheduler import BACKGROUND, scheduled
+from src.model_tiers import tiered_llm
 
 
 # ============================================================
@@ -114,9 +117,6 @@ Your task: Convert the raw project data into a **fully valid JSON** object follo
 
 ---
 
-**RAW PROJECT DATA:**
-{raw_project}
-
 **INSTRUCTIONS:**
 1. Read the raw data carefully
 2. Identify all technologies in the "tools" field
@@ -129,6 +129,9 @@ Your task: Convert the raw project data into a **fully valid JSON** object follo
 5. Handle links properly (null if empty)
 6. Output ONLY valid JSON (no markdown, no explanations)
 
+**RAW PROJECT DATA:**
+{raw_project}
+
 **OUTPUT:**
 """)
 
@@ -302,7 +305,7 @@ def format_ats_project_with_llm(project: Dict[str, Any], api_key: str) -> Dict[s
         temperature=0.0,  # More deterministic
         max_tokens=2000   # Reduced to encourage concise output
     )
-    chain = prompt | llm
+    chain = scheduled(prompt | tiered_llm(llm, "ats"), llm, lane=BACKGROUND, est_output_tokens=2000)
 
     # 1️⃣ Invoke LLM (returns AIMessage)
     ai_message = chain.invoke({"raw_project": json.dumps(project, indent=2)})
@@ -331,3 +334,37 @@ def format_ats_project_with_llm(project: Dict[str, Any], api_key: str) -> Dict[s
     print("✅ SUCCESS: Valid ATS-optimized JSON generated.")
     print(f"📤 Final output: {json.dumps(final_json, indent=2)}")
     return final_json
+
+
+# ============================================================
+# Streaming Variant – emits fields/bullets as they are generated
+# ============================================================
+def stream_ats_project_with_llm(project: Dict[str, Any], api_key: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming version of `format_ats_project_with_llm`.
+    Yields `field` and `item` events while the LLM is generating, then a
+    `complete` event with the validated ATS JSON.
+    """
+    llm = ChatGroq(
+        model=settings.GROQ_MODEL,
+        api_key=api_key,
+        temperature=0.0,
+        max_tokens=2000,
+        streaming=True
+    )
+    chain = scheduled(prompt | tiered_llm(llm, "ats"), llm, lane=BACKGROUND, est_output_tokens=2000)
+
+    def finalize(clean_json: Dict[str, Any]) -> Dict[str, Any]:
+        validated_json = validate_and_fix_hallucinations(clean_json, project)
+        try:
+            return ATSProject(**validated_json).model_dump()
+        except ValidationError as e:
+            print(f"Pydantic validation error: {e}")
+            return validated_json
+
+    yield from stream_ats_json(
+        chain,
+        {"raw_project": json.dumps(project, indent=2)},
+        finalize=finalize,
+        fallback_parse=extract_clean_json,
+    )
@@ -0,0 +1,183 @@
+# src/prompt_compiler.py
+import json
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+# ============================================================
+# ✅ STATIC PARTS (rendered once per section)
+# ============================================================
+_metadata_cache: Dict[int, str] = {}
+_system_cache: Dict[Tuple[str, int], str] = {}
+_lock = threading.RLock()  # system_prompt -> metadata_json re-enters
+
+
+def metadata_json(metadata: dict) -> str:
+    """`json.dumps(CHATBOT_METADATA, indent=2)`, computed once per section."""
+    key = id(metadata)
+    if key not in _metadata_cache:
+        with _lock:
+            _metadata_cache[key] = json.dumps(metadata, indent=2)
+    return _metadata_cache[key]
+
+
+def system_prompt(template: str, metadata: dict) -> str:
+    """`template.format(metadata=...)` for the intent/clarification prompts, cached."""
+    key = (template, id(metadata))
+    if key not in _system_cache:
+        with _lock:
+            _system_cache[key] = template.format(metadata=metadata_json(metadata))
+    return _system_cache[key]
+
+
+# ============================================================
+# ✅ PER-CALL REQUESTS
+# Static text first, dynamic text last: the system prompt and the opening
+# lines of the human message are byte-identical for every call on a field,
+# so provider-side prefix caching can reuse them. Anything that changes per
+# call (history, known data, the date) goes at the end.
+# ============================================================
+def current_date() -> str:
+    return datetime.now().strftime('%B %d, %Y')
+
+
+def extraction_request(field: str, history: str, current: Any, dated: bool = False) -> str:
+    """Human message for a field extraction call; `dated` appends today's date last."""
+    request = f"""<FIELD_TO_EXTRACT>{field}</FIELD_TO_EXTRACT>
+Based *only* on the user's *latest* message, extract information for the
+field '{field}'. Follow all rules from the system prompt.
+
+<CONVERSATION_HISTORY>
+{history}
+</CONVERSATION_HISTORY>
+
+<CURRENT_VALUE>{json.dumps(current)}</CURRENT_VALUE>
+"""
+    if dated:
+        request += f"<CURRENT_DATE>{current_date()}</CURRENT_DATE>\n"
+    return request
+
+
+def question_request(field: str, history: str, known_tag: str, known: str, count: int) -> str:
+    """Human message for a question generation call (`known_tag` e.g. KNOWN_PROJECT_DATA)."""
+    return f"""<FIELD_TO_ASK_FOR>{field}</FIELD_TO_ASK_FOR>
+Generate a natural, conversational question to collect the '{field}' information.
+Follow all rules from the system prompt.
+
+<RECENT_CONVERSATION>
+{history}
+</RECENT_CONVERSATION>
+
+<{known_tag}>
+{known}
+</{known_tag}>
+
+<TIMES_ASKED>{count}</TIMES_ASKED>
+"""
+
+
+# ============================================================
+# ✅ INCREMENTAL HISTORY
+# `history_lines` in the graph state holds one formatted line per message;
+# each turn only formats the messages added since the last one.
+# ============================================================
+_history: ContextVar[Optional[List[str]]] = ContextVar("history_lines", default=None)
+_summary: ContextVar[str] = ContextVar("conversation_summary", default="")
+
+
+def history_line(message: BaseMessage) -> str:
+    return f"{'User' if isinstance(message, HumanMessage) else 'AI'}: {message.content}"
+
+
+def sync_history(state: Dict[str, Any]) -> List[str]:
+    """Extends the state's `history_lines` to cover its messages and makes them current."""
+    messages = state.get("messages") or []
+    lines = list(state.get("history_lines") or [])
+    if len(lines) > len(messages) or (lines and lines[-1] != history_line(messages[len(lines) - 1])):
+        lines = []
+    lines.extend(history_line(m) for m in messages[len(lines):])
+    state["history_lines"] = lines
+    _history.set(lines)
+    return lines
+
+
+def set_summary(summary: str) -> None:
+    """Rolling summary of the messages already dropped from state (see src/conversation_memory.py)."""
+    _summary.set(summary)
+
+
+def format_history(messages: List[BaseMessage], last_n: int) -> str:
+    """
+    The last `last_n` messages as "User: ..." / "AI: ..." lines, preceded by
+    the rolling summary when the window reaches back past the kept messages.
+    """
+    lines = _history.get()
+    if lines is not None and len(lines) == len(messages) and messages and lines[-1] == history_line(messages[-1]):
+        recent = "\n".join(lines[-last_n:])
+    else:
+        recent = "\n".join(history_line(m) for m in messages[-last_n:])
+    summary = _summary.get()
+    if summary and last_n >= len(messages):
+        return f"[Earlier in this conversation]\n{summary}\n[Recent messages]\n{recent}"
+    return recent
+
+
+# ============================================================
+# ✅ MICRO-BENCHMARK
+# python -m src.prompt_compiler
+# ============================================================
+def benchmark(iterations: int = 2000, turns: int = 40) -> Dict[str, Dict[str, float]]:
+    """Average prompt build time per call type (µs), legacy f-string path vs compiled."""
+    from src.prompts import CHATBOT_METADATA, FIELD_AGENT_PROMPTS
+
+    template = "<CHATBOT_CONTEXT>\n{metadata}\n</CHATBOT_CONTEXT>\nClassify the user's intent."
+    messages: List[BaseMessage] = []
+    for i in range(turns):
+        messages.append(AIMessage(content=f"Question number {i} about your project?"))
+        messages.append(HumanMessage(content=f"Answer number {i} with a few more words in it."))
+    state = {"messages": messages}
+    sync_history(state)
+
+    def legacy_intent():
+        metadata_str = json.dumps(CHATBOT_METADATA, indent=2)
+        history = "\n".join([f"{'User' if isinstance(m, HumanMessage) else 'AI'}: {m.content}" for m in messages[-6:]])
+        return template.format(metadata=metadata_str), history
+
+    def compiled_intent():
+        return system_prompt(template, CHATBOT_METADATA), format_history(messages, 6)
+
+    def legacy_extraction():
+        current_date = datetime.now().strftime('%B %d, %Y')
+        prompt = FIELD_AGENT_PROMPTS["timeline"].replace(
+            "<CURRENT_DATE> is \"November 5, 2025\"", f"<CURRENT_DATE> is \"{current_date}\""
+        )
+        history = "\n".join([f"{'User' if isinstance(m, HumanMessage) else 'AI'}: {m.content}" for m in messages[-10:]])
+        return prompt, history
+
+    def compiled_extraction():
+        return FIELD_AGENT_PROMPTS["timeline"], extraction_request("timeline", format_history(messages, 10), None, dated=True)
+
+    def timeit(fn) -> float:
+        fn()
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        return (time.perf_counter() - started) / iterations * 1e6
+
+    results = {}
+    for call_type, legacy, compiled in [
+        ("intent", legacy_intent, compiled_intent),
+        ("extraction", legacy_extraction, compiled_extraction),
+    ]:
+        before, after = timeit(legacy), timeit(compiled)
+        results[call_type] = {"legacy_us": round(before, 2), "compiled_us": round(after, 2), "speedup": round(before / after, 1)}
+    return results
+
+
+if __name__ == "__main__":
+    for call_type, row in benchmark().items():
+        print(f"⏱️ {call_type:<11} legacy {row['legacy_us']:>8} µs   compiled {row['compiled_us']:>8} µs   x{row['speedup']}")
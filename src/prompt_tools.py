@@ -0,0 +1,313 @@
+# src/prompt_tools.py
+"""
+Prompt size profiler and compact-prompt evaluation harness.
+
+    python -m src.prompt_tools profile
+    python -m src.prompt_tools prefixes
+    python -m src.prompt_tools eval --api-key gsk_... [--cases cases.jsonl]
+
+`eval` calls the real extraction agents, once per prompt variant, on a
+small labeled conversation set (built in, or JSONL lines of
+{"section", "field", "history": [[role, text], ...], "message", "expected",
+"complete"}).
+"""
+import argparse
+import importlib
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+from src.compact_prompts import PROMPT_VARIANTS, select_prompt_set
+from src.token_budget import count_tokens, tokenizer_name
+
+# ============================================================
+# ✅ SECTION REGISTRY
+# ============================================================
+SECTIONS = {
+    "projects": {
+        "prompts": "src.prompts",
+        "agent": "src.graph_builder",
+    },
+    "experiences": {
+        "prompts": "src.experience.experience_prompt",
+        "agent": "src.experience.experience_agent",
+    },
+    "education": {
+        "prompts": "src.education.education_prompt",
+        "agent": "src.education.education_agent",
+    },
+    "skills": {
+        "prompts": "src.skills.skills_prompt",
+        "agent": "src.skills.skills_agent",
+    },
+    "achievements": {
+        "prompts": "src.achievements.achievement_prompt",
+        "agent": "src.achievements.achievements_agent",
+    },
+}
+
+
+def _prompt_dicts(module) -> Dict[str, Any]:
+    """The module's prompt dicts, found by suffix (the modules prefix them per section)."""
+    found = {}
+    for name in dir(module):
+        if name.endswith("FIELD_AGENT_PROMPTS"):
+            found["extraction"] = getattr(module, name)
+        elif name.endswith("QUESTION_GENERATOR_PROMPTS"):
+            found["question"] = getattr(module, name)
+        elif name.endswith("CHATBOT_METADATA"):
+            found["metadata"] = getattr(module, name)
+    return found
+
+
+def prompt_set(section: str, variant: str) -> Dict[str, Any]:
+    module = importlib.import_module(SECTIONS[section]["prompts"])
+    dicts = _prompt_dicts(module)
+    extraction, question = select_prompt_set(
+        dicts["extraction"], module.BASE_EXTRACTION_SYSTEM_PROMPT,
+        dicts["question"], module.BASE_QUESTION_SYSTEM_PROMPT,
+        variant=variant,
+    )
+    return {"extraction": extraction, "question": question, "metadata": dicts.get("metadata", {})}
+
+
+def profile(sections: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """One row per section / call type / field with full and compact token counts."""
+    rows = []
+    for section in sections or SECTIONS:
+        full, compact = prompt_set(section, "full"), prompt_set(section, "compact")
+        for call_type in ("extraction", "question"):
+            for field, text in full[call_type].items():
+                rows.append({
+                    "section": section,
+                    "call_type": call_type,
+                    "field": field,
+                    "full": count_tokens(text),
+                    "compact": count_tokens(compact[call_type][field]),
+                })
+        metadata = count_tokens(json.dumps(full["metadata"], indent=2))
+        rows.append({"section": section, "call_type": "metadata", "field": "-", "full": metadata, "compact": metadata})
+    return rows
+
+
+def print_profile(rows: List[Dict[str, Any]]):
+    print(f"🧮 Token counts ({tokenizer_name()})")
+    print(f"{'section':<13} {'call':<11} {'field':<28} {'full':>7} {'compact':>8} {'saved':>6}")
+    for row in rows:
+        saved = 100 * (1 - row["compact"] / row["full"]) if row["full"] else 0
+        print(f"{row['section']:<13} {row['call_type']:<11} {row['field']:<28} {row['full']:>7} {row['compact']:>8} {saved:>5.0f}%")
+
+    totals: Dict[str, List[int]] = {}
+    for row in rows:
+        t = totals.setdefault(row["call_type"], [0, 0, 0])
+        t[0] += row["full"]
+        t[1] += row["compact"]
+        t[2] += 1
+    print("-" * 78)
+    for call_type, (full, compact, n) in totals.items():
+        print(f"📊 {call_type:<11} avg full {full // n:>6}  avg compact {compact // n:>6}  saved {100 * (1 - compact / full):.0f}%")
+
+
+# ============================================================
+# ✅ PREFIX STABILITY
+# Builds each call's messages twice with different dynamic inputs (history,
+# known data, date) and checks that everything up to the first dynamic
+# slot is byte-identical, so provider-side prefix caching can hit.
+# ============================================================
+FORMATTERS = {
+    "projects": ("src.project_resume", "raw_project"),
+    "experiences": ("src.experience_resume", "raw_experience"),
+    "education": ("src.education_resume", "raw_education"),
+    "skills": ("src.skills_resume", "raw_skills"),
+    "achievements": ("src.achievement_resume", "raw_achievement"),
+}
+
+
+def _common_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    for i in range(n):
+        if a[i] != b[i]:
+            return i
+    return n
+
+
+def check_prefix_stability(include_formatters: bool = True) -> List[Dict[str, Any]]:
+    """
+    One row per section / call type / field with the stable prefix length.
+    Raises AssertionError when a dynamic value leaks ahead of static text.
+    """
+    from src import prompt_compiler
+
+    rows = []
+    real_date = prompt_compiler.current_date
+    try:
+        for section in SECTIONS:
+            prompts = prompt_set(section, "full")
+            for field, system in prompts["extraction"].items():
+                prompt_compiler.current_date = lambda: "January 01, 2025"
+                a = system + prompt_compiler.extraction_request(field, "User: first answer", "a", dated=True)
+                prompt_compiler.current_date = lambda: "December 31, 2030"
+                b = system + prompt_compiler.extraction_request(field, "AI: another\nUser: second", ["b"], dated=True)
+                static = system + prompt_compiler.extraction_request(field, "", None).split("<CONVERSATION_HISTORY>")[0]
+                rows.append(_prefix_row(section, "extraction", field, a, b, static))
+            for field, system in prompts["question"].items():
+                a = system + prompt_compiler.question_request(field, "User: first", "KNOWN_DATA", "{}", 0)
+                b = system + prompt_compiler.question_request(field, "AI: q\nUser: second", "KNOWN_DATA", '{"x": 1}', 2)
+                static = system + prompt_compiler.question_request(field, "", "KNOWN_DATA", "", 0).split("<RECENT_CONVERSATION>")[0]
+                rows.append(_prefix_row(section, "question", field, a, b, static))
+    finally:
+        prompt_compiler.current_date = real_date
+
+    if include_formatters:
+        for section, (module_name, slot) in FORMATTERS.items():
+            template = importlib.import_module(module_name).prompt
+            a = template.format(**{slot: '{"title": "A"}'})
+            b = template.format(**{slot: '{"title": "B", "more": true}'})
+            static = template.template.split("{" + slot + "}")[0]
+            rows.append(_prefix_row(section, "formatter", "-", a, b, static))
+    return rows
+
+
+def _prefix_row(section: str, call_type: str, field: str, a: str, b: str, static: str) -> Dict[str, Any]:
+    stable = _common_prefix(a, b)
+    assert stable >= len(static), (
+        f"{section}.{call_type}.{field}: prompts diverge at char {stable}, before the end of the static part ({len(static)})"
+    )
+    return {
+        "section": section,
+        "call_type": call_type,
+        "field": field,
+        "stable_tokens": count_tokens(a[:stable]),
+        "total_tokens": count_tokens(a),
+    }
+
+
+# ============================================================
+# ✅ EVALUATION HARNESS
+# ============================================================
+BUILTIN_CASES = [
+    {"section": "projects", "field": "title", "history": [["ai", "What's the name of your project?"]],
+     "message": "It's called WeatherNow, a forecast dashboard", "expected": "WeatherNow", "complete": True},
+    {"section": "projects", "field": "tools", "history": [["ai", "Which tools or technologies did you use?"]],
+     "message": "React, FastAPI and PostgreSQL", "expected": ["React", "FastAPI", "PostgreSQL"], "complete": True},
+    {"section": "projects", "field": "team_size", "history": [["ai", "How many people were on the team?"]],
+     "message": "skip", "expected": None, "complete": True},
+    {"section": "projects", "field": "outcome", "history": [["ai", "What was the outcome of the project?"]],
+     "message": "what do you mean?", "expected": None, "complete": False},
+    {"section": "experiences", "field": "organization_name", "history": [["ai", "Which company did you work for?"]],
+     "message": "I was at Infosys for two years", "expected": "Infosys", "complete": True},
+    {"section": "experiences", "field": "tools_and_technologies", "history": [["ai", "What tools did you use there?"]],
+     "message": "mostly Java, Spring Boot and Kafka", "expected": ["Java", "Spring Boot", "Kafka"], "complete": True},
+    {"section": "education", "field": "institution_name", "history": [["ai", "Where did you study?"]],
+     "message": "Anna University, Chennai", "expected": "Anna University", "complete": True},
+    {"section": "skills", "field": "skill_domain", "history": [["ai", "Which area of skills shall we add?"]],
+     "message": "Programming languages", "expected": "Programming languages", "complete": True},
+    {"section": "achievements", "field": "achievement_title", "history": [["ai", "What's the achievement called?"]],
+     "message": "Won first place at the Smart India Hackathon 2023", "expected": "Smart India Hackathon", "complete": True},
+]
+
+
+def load_cases(path: Optional[str]) -> List[Dict[str, Any]]:
+    if not path:
+        return BUILTIN_CASES
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _normalize(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        return {str(v).strip().lower() for v in value.values() if v}
+    if isinstance(value, list):
+        return {str(v).strip().lower() for v in value}
+    return str(value).strip().lower()
+
+
+def score_case(case: Dict[str, Any], extracted: Any, complete: bool) -> bool:
+    """Completion must match; values match by containment (strings) or set equality (lists/dicts)."""
+    if bool(complete) != bool(case.get("complete", True)):
+        return False
+    expected, got = _normalize(case.get("expected")), _normalize(extracted)
+    if expected is None:
+        return got is None or not case.get("complete", True)
+    if isinstance(expected, set):
+        return isinstance(got, set) and expected <= got
+    return isinstance(got, str) and expected in got
+
+
+def evaluate(api_key: str, cases: List[Dict[str, Any]], variants=PROMPT_VARIANTS) -> Dict[str, Dict[str, Any]]:
+    """Runs each case through the section's real extraction agent per prompt variant."""
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    results = {}
+    for variant in variants:
+        passed, failures = 0, []
+        for case in cases:
+            engine = importlib.import_module(SECTIONS[case["section"]]["agent"]).ENGINE
+            original = engine.field_prompts
+            engine.field_prompts = prompt_set(case["section"], variant)["extraction"]
+            try:
+                messages = [
+                    HumanMessage(content=text) if role == "user" else AIMessage(content=text)
+                    for role, text in case.get("history", [])
+                ] + [HumanMessage(content=case["message"])]
+                with engine.bound(engine.agents_for(api_key)):
+                    result = engine.extract_field(case["field"], messages, None)
+            finally:
+                engine.field_prompts = original
+
+            if score_case(case, result.extracted_value, result.is_complete):
+                passed += 1
+            else:
+                failures.append({"case": case, "extracted": result.extracted_value, "complete": result.is_complete})
+        results[variant] = {"passed": passed, "total": len(cases), "accuracy": passed / len(cases) if cases else 0.0, "failures": failures}
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.prompt_tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_profile = sub.add_parser("profile", help="token counts per section, call type and field")
+    p_profile.add_argument("--section", action="append", choices=list(SECTIONS))
+    p_profile.add_argument("--json", action="store_true")
+
+    p_prefix = sub.add_parser("prefixes", help="check that static prompt text forms a stable prefix")
+    p_prefix.add_argument("--no-formatters", action="store_true", help="skip the ATS formatter templates")
+
+    p_eval = sub.add_parser("eval", help="extraction accuracy, full vs compact prompts")
+    p_eval.add_argument("--api-key", required=True)
+    p_eval.add_argument("--cases")
+    p_eval.add_argument("--min-accuracy-delta", type=float, default=0.0,
+                        help="fail if compact accuracy is below full by more than this")
+
+    args = parser.parse_args(argv)
+    if args.command == "profile":
+        rows = profile(args.section)
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            print_profile(rows)
+        return 0
+
+    if args.command == "prefixes":
+        rows = check_prefix_stability(include_formatters=not args.no_formatters)
+        for row in rows:
+            share = row["stable_tokens"] / row["total_tokens"] if row["total_tokens"] else 0
+            print(f"{row['section']:<13} {row['call_type']:<11} {row['field']:<28} {row['stable_tokens']:>6}/{row['total_tokens']:<6} {share:>5.0%}")
+        print(f"✅ {len(rows)} prompt layouts keep a stable prefix")
+        return 0
+
+    results = evaluate(args.api_key, load_cases(args.cases))
+    for variant, row in results.items():
+        print(f"🎯 {variant:<8} {row['passed']}/{row['total']} ({row['accuracy']:.0%})")
+        for failure in row["failures"]:
+            case = failure["case"]
+            print(f"   ❌ {case['section']}.{case['field']}: '{case['message']}' -> {failure['extracted']} (complete={failure['complete']})")
+    drop = results["full"]["accuracy"] - results["compact"]["accuracy"]
+    return 1 if drop > args.min_accuracy_delta else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
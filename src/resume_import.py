@@ -0,0 +1,262 @@
+# src/resume_import.py
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, Field
+
+import src.database as db
+from src.config import settings
+from src.model_tiers import build_agent
+from src.multi_field import ExtractedField
+from src.sections import SECTIONS, get_section
+from src.token_budget import count_tokens, truncate_text
+
+# ============================================================
+# ✅ DATA MODELS
+# ============================================================
+class ImportedEntry(BaseModel):
+    fields: List[ExtractedField] = Field(default_factory=list, description="The fields stated for this one entry")
+
+
+class SectionImportResult(BaseModel):
+    entries: List[ImportedEntry] = Field(
+        default_factory=list,
+        description="One item per distinct entry of this section found in the text; empty if none"
+    )
+
+
+# ============================================================
+# ✅ CHUNKING
+# Headings split the text into section-labelled blocks; blocks are then
+# cut at paragraph boundaries to IMPORT_CHUNK_TOKENS. Unlabelled text
+# (no recognisable heading) is sent to every section's extractor.
+# ============================================================
+SECTION_HEADINGS = {
+    "projects": r"projects?|personal projects|academic projects",
+    "experiences": r"(?:work |professional )?experience|employment(?: history)?|work history|internships?",
+    "education": r"education|academics?|qualifications?",
+    "skills": r"(?:technical |core )?skills|technologies|tech stack|competencies",
+    "achievements": r"achievements?|awards?(?: and honors)?|honors|certifications?|licenses? (?:&|and) certifications",
+}
+HEADING_PATTERN = re.compile(
+    r"^\s*(?:#+\s*)?(?P<heading>" + "|".join(f"(?P<{s}>{p})" for s, p in SECTION_HEADINGS.items()) + r")\s*:?\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def split_by_heading(text: str) -> List[Dict[str, Any]]:
+    blocks, section, start = [], None, 0
+    for match in HEADING_PATTERN.finditer(text):
+        if text[start:match.start()].strip():
+            blocks.append({"section": section, "text": text[start:match.start()].strip()})
+        section = next(name for name in SECTION_HEADINGS if match.group(name))
+        start = match.end()
+    if text[start:].strip():
+        blocks.append({"section": section, "text": text[start:].strip()})
+    return blocks
+
+
+def chunk_text(text: str, max_tokens: Optional[int] = None) -> List[Dict[str, Any]]:
+    """`[{"section": name | None, "text": ...}]`, each chunk within `max_tokens`."""
+    max_tokens = max_tokens or settings.IMPORT_CHUNK_TOKENS
+    chunks = []
+    for block in split_by_heading(text):
+        current: List[str] = []
+        for paragraph in re.split(r"\n\s*\n", block["text"]):
+            if current and count_tokens("\n\n".join(current + [paragraph])) > max_tokens:
+                chunks.append({"section": block["section"], "text": "\n\n".join(current)})
+                current = []
+            current.append(truncate_text(paragraph, max_tokens))
+        if current:
+            chunks.append({"section": block["section"], "text": "\n\n".join(current)})
+    return chunks
+
+
+# ============================================================
+# ✅ EXTRACTION
+# ============================================================
+IMPORT_SYSTEM_PROMPT = """You turn a piece of a pasted resume or LinkedIn profile into structured resume {section} entries.
+
+<FIELDS>
+{fields}
+</FIELDS>
+
+<RULES>
+1. One entry per distinct {label} in the text (e.g. each job, each degree, each project). Ignore content that belongs to other resume sections.
+2. Only values stated in the text - never invent or infer. Leave a field out when the text does not state it.
+3. List fields (marked [list]) are arrays of short strings. A timeline is {{"start_date": "Month Year", "end_date": "Month Year" | "Present"}} unless the field description says otherwise.
+4. confidence is 1.0 for values copied from the text, lower when you had to interpret it.
+</RULES>"""
+
+_system_cache: Dict[str, str] = {}
+
+
+def import_system_prompt(section: str) -> str:
+    if section not in _system_cache:
+        spec = get_section(section)
+        descriptions = spec["engine"].metadata.get("fields_we_collect", {})
+        fields = "\n".join(
+            f"- {f}{' [list]' if f in spec['list_fields'] else ''}: {descriptions.get(f, f.replace('_', ' '))}"
+            for f in spec["all_fields"]
+        )
+        _system_cache[section] = IMPORT_SYSTEM_PROMPT.format(section=section, fields=fields, label=spec["entry_label"])
+    return _system_cache[section]
+
+
+def extract_entries(agent, section: str, text: str, raise_errors: bool = False) -> List[Dict[str, Any]]:
+    """
+    Entries of `section` found in one chunk, as `{field: value}` dicts.
+    Failed calls give [] unless `raise_errors` (callers that must tell
+    "nothing found" from "could not extract").
+    """
+    spec = get_section(section)
+    prompt = f"<RESUME_TEXT>\n{text}\n</RESUME_TEXT>\n\nExtract every {spec['entry_label']} in this text."
+    try:
+        result = agent.invoke([SystemMessage(content=import_system_prompt(section)), HumanMessage(content=prompt)])
+        if not result.tool_calls:
+            raise ValueError(f"No tool call for {section} import. Response: {result.content}")
+        parsed = SectionImportResult(**result.tool_calls[0]["args"])
+    except Exception as e:
+        if raise_errors:
+            raise
+        print(f"❌ Import extraction error ({section}): {e}")
+        return []
+
+    entries = []
+    for entry in parsed.entries:
+        values = {}
+        for item in entry.fields:
+            if item.field_name not in spec["all_fields"] or item.confidence < settings.IMPORT_MIN_CONFIDENCE:
+                continue
+            value = item.extracted_value
+            if item.field_name in spec["list_fields"] and isinstance(value, str):
+                value = [v.strip() for v in value.split(",") if v.strip()]
+            if value not in (None, "", [], {}):
+                values[item.field_name] = value
+        if values:
+            entries.append(values)
+    return entries
+
+
+def _entry_key(section: str, entry: Dict[str, Any]) -> str:
+    """The entry's first collected field (title, institution, domain...), normalised, for de-duplication."""
+    for field in get_section(section)["all_fields"]:
+        if entry.get(field):
+            return re.sub(r"\W+", " ", str(entry[field])).strip().lower()
+    return ""
+
+
+def merge_entries(section: str, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Joins entries of the same item found in different chunks; list fields are unioned."""
+    list_fields = get_section(section)["list_fields"]
+    merged: Dict[str, Dict[str, Any]] = {}
+    for entry in entries:
+        key = _entry_key(section, entry) or str(len(merged))
+        target = merged.setdefault(key, {})
+        for field, value in entry.items():
+            if field in list_fields and isinstance(value, list):
+                current = target.get(field) or []
+                target[field] = current + [v for v in value if v not in current]
+            else:
+                target.setdefault(field, value)
+    return list(merged.values())
+
+
+def extract_resume(text: str, api_key: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Runs every (chunk, section) extraction in parallel and returns the
+    merged entries per section. Labelled chunks go to their own section
+    only; unlabelled ones to all sections.
+    """
+    chunks = chunk_text(text)
+    agents = {
+        section: build_agent(spec["get_llm"](api_key), SectionImportResult, "extraction")
+        for section, spec in SECTIONS.items()
+    }
+    jobs = [
+        (section, chunk["text"])
+        for chunk in chunks
+        for section in ([chunk["section"]] if chunk["section"] else SECTIONS)
+    ]
+    print(f"📥 Import: {len(chunks)} chunks, {len(jobs)} extraction calls")
+
+    with ThreadPoolExecutor(max_workers=settings.IMPORT_MAX_PARALLEL) as pool:
+        futures = [
+            (section, pool.submit(contextvars.copy_context().run, extract_entries, agents[section], section, chunk))
+            for section, chunk in jobs
+        ]
+        found: Dict[str, List[Dict[str, Any]]] = {section: [] for section in SECTIONS}
+        for section, future in futures:
+            found[section].extend(future.result())
+
+    return {section: merge_entries(section, entries) for section, entries in found.items()}
+
+
+# ============================================================
+# ✅ SEEDING SECTION CHATS
+# Each imported entry gets its own chat session (as if the user had
+# started that section's chat), with `resume_data` filled in and the
+# graph state positioned on the first missing field.
+# ============================================================
+def seed_section_chat(user_id: str, section: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    spec = get_section(section)
+    all_fields = spec["all_fields"]
+    chat_id = db.create_chat_session(user_id)
+    db.update_chat_session(chat_id, {f"resume_data.{spec['resume_key']}": [entry]})
+
+    completion = {f: f in entry for f in all_fields}
+    ask_counts = {f: 0 for f in all_fields}
+    next_field = spec["next_field"](completion)
+    label = spec["entry_label"]
+
+    if next_field:
+        ask_counts[next_field] = 1
+        summary = spec["summarize"](entry)
+        content = (
+            f"I've imported this {label} from your resume:\n{summary}\n\n"
+            f"Just a few details are missing. Could you tell me about the {next_field.replace('_', ' ')}?"
+        )
+    else:
+        content = (
+            f"I've imported this {label} from your resume:\n{spec['summarize'](entry)}"
+            "\n\n**Does everything look correct?** (Please respond 'yes' or 'no')."
+        )
+    msg = spec["send_message"](chat_id, content)
+
+    values = {
+        "chat_id": chat_id,
+        "messages": [msg],
+        spec["entry_key"]: entry,
+        spec["collected_key"]: [],
+        "field_completion_status": completion,
+        "field_ask_count": ask_counts,
+        "current_field": next_field,
+        "conversation_context": "Imported from resume",
+        "interaction_count": 0,
+        "is_first_message": False,
+        "awaiting_confirmation": next_field is None,
+        "awaiting_field_to_edit": False,
+    }
+    spec["engine"].app.update_state({"configurable": {"thread_id": chat_id}}, values, as_node="start")
+
+    filled = [f for f in all_fields if completion[f]]
+    return {
+        "chat_id": chat_id,
+        "section": section,
+        "filled_fields": filled,
+        "missing_fields": [f for f in all_fields if not completion[f]],
+        "percentage": int(len(filled) / len(all_fields) * 100) if all_fields else 0,
+        "ai_response": content,
+    }
+
+
+def import_resume(user_id: str, text: str, api_key: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Extracts every section from `text` and seeds one chat per entry; returns them per section."""
+    entries = extract_resume(text, api_key)
+    return {
+        section: [seed_section_chat(user_id, section, entry) for entry in section_entries]
+        for section, section_entries in entries.items()
+    }
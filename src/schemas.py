@@ -49,6 +49,10 @@ class ResumeData(BaseModel):
 
 class StartChatRequest(BaseModel):
     user_id: str
+    aggregation_window_ms: Optional[int] = Field(
+        None, ge=0, le=10000,
+        description="Merge messages sent within this many ms into one turn (opt-in)"
+    )
 
 class StartChatResponse(BaseModel):
     chat_id: str
@@ -61,4 +65,13 @@ class ChatResponse(BaseModel):
     chat_id: str
     ai_response: str
     current_section: str
-    is_complete: bool
\ No newline at end of file
+    is_complete: bool
+class UnifiedStartRequest(StartChatRequest):
+    section: Optional[str] = Field(None, description="Section to open first (default: the first one)")
+
+class UnifiedChatRequest(ChatRequest):
+    section: Optional[str] = Field(None, description="Pin this message to a section; otherwise it is routed")
+
+class ImportResumeRequest(BaseModel):
+    user_id: str
+    text: str = Field(..., min_length=1, description="Pasted resume or LinkedIn-export text")
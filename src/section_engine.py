@@ -0,0 +1,1288 @@
+# src/section_engine.py
+import json
+import random
+import re
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import TypedDict, Annotated, List, Optional, Dict, Any, Literal, Callable, Iterable, Tuple
+from pydantic import BaseModel, Field
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
+
+# Internal imports
+from src.config import settings
+import src.database as db
+from src.database import MongoDBCustomCheckpointer
+from src.chat_stream import invoke_streaming_question, reserved_acknowledgment
+from src.model_tiers import build_agent, llm_available, tool_schema
+from src.turn_deadline import has_budget, turn_deadline
+from src.offline_mode import OFFLINE_REASONING, offline_extract, offline_intent
+from src.intent_cache import get_cached_intent, store_intent
+from src.clarification_library import find_clarification, remember_clarification
+from src.fact_store import record_entry
+from src.compact_prompts import select_prompt_set
+from src.conversation_memory import with_memory
+from src.token_budget import fit_prompt
+from src.multi_field import MultiFieldExtractionResult, filled_note, merge_other_fields, pending_fields, submit_other_fields
+from src.prompt_compiler import extraction_request, format_history, question_request, sync_history, system_prompt
+
+# ============================================================
+# ✅ SECTION ENGINE
+# One field-collection conversation (start node, process node, graph,
+# message handler) parameterized by a section spec: fields, mandatory
+# set, prompts, wording and save strategy. Each section module builds
+# one `SectionEngine` and re-exports its methods under the section's
+# historical names.
+#
+# Nothing heavy happens at import: the prompt tables are loaded, MongoDB
+# is connected and the graph is compiled on first use (or by the app's
+# lifespan), so importing the app stays cheap.
+# ============================================================
+
+# Define skip phrases
+SKIP_PHRASES = [
+    "skip", "i don't know", "don't know", "n/a", "na",
+    "not applicable", "none", "nothing"
+]
+
+# Define positive/negative confirmation phrases
+CONFIRM_YES = ["yes", "ok", "correct", "submit", "looks good", "yep"]
+CONFIRM_NO = ["no", "edit", "change", "wrong", "nope"]
+
+# ============================================================
+# ✅ DATA MODELS
+# ============================================================
+class FieldExtractionResult(BaseModel):
+    field_name: str = Field(..., description="Name of the field")
+    extracted_value: Any = Field(None, description="Extracted value")
+    is_complete: bool = Field(False, description="Has meaningful data?")
+    confidence: float = Field(0.0, ge=0.0, le=1.0, description="Confidence in the extraction (0.0 to 1.0)")
+    reasoning: str = Field(..., description="Chain-of-thought reasoning for the extraction decision")
+    needs_clarification: bool = Field(False, description="True if the user's input was ambiguous for this field")
+    clarification_reason: Optional[str] = Field(None, description="Reason why clarification is needed")
+
+class FieldQuestionGeneration(BaseModel):
+    field_name: str = Field(..., description="Field name")
+    question: str = Field(..., description="Natural question")
+    follow_up_prompts: List[str] = Field(default_factory=list, description="Optional list of example user replies")
+    reasoning: str = Field(..., description="Why this question was generated")
+
+class UserIntentClassification(BaseModel):
+    intent: Literal[
+        "answer_question",
+        "request_summary",
+        "request_clarification",
+        "request_done",
+        "off_topic"
+    ] = Field(..., description="The primary intent of the user's message")
+    confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence in the classification")
+    reasoning: str = Field(..., description="Why this intent was identified")
+    clarification_topic: Optional[str] = Field(None, description="Clarification topic if user is confused")
+
+class ClarificationResponse(BaseModel):
+    explanation: str = Field(..., description="Explanation for the user’s confusion")
+    example: Optional[str] = Field(None, description="Example if helpful")
+    follow_up_question: str = Field(..., description="Re-ask question in simpler form")
+
+# ============================================================
+# ✅ GRAPH STATE
+# ============================================================
+def merge_entry_data(left: dict, right: dict) -> dict:
+    if right is None:
+        return left
+    if left is None:
+        return right
+    merged = {**left, **right}
+    print(f"🔄 MERGE: left={left}, right={right}, result={merged}")
+    return merged
+
+def graph_state_type(name: str, entry_key: str, collected_key: str) -> type:
+    """The section's graph state: the shared keys plus its entry / collected keys."""
+    from langgraph.graph.message import add_messages
+
+    return TypedDict(name, {
+        "chat_id": str,
+        "messages": Annotated[list[BaseMessage], add_messages],
+        entry_key: Annotated[dict, merge_entry_data],
+        collected_key: List[dict],
+        "field_completion_status": Dict[str, bool],
+        "field_ask_count": Dict[str, int],
+        "current_field": Optional[str],
+        "conversation_context": str,
+        "interaction_count": int,
+        "is_first_message": bool,
+        "awaiting_confirmation": Optional[bool],
+        "awaiting_field_to_edit": Optional[bool],
+        "is_complete": bool,
+        "history_lines": List[str],
+        "conversation_summary": str,
+        # field -> the raw answer it was captured from while the LLM was offline
+        "offline_fields": Dict[str, str],
+    })
+
+# ============================================================
+# ✅ DYNAMIC LLM INITIALIZATION
+# One ChatGroq client and one bound agent set per (section, API key),
+# kept in a small LRU and shared by every turn and every section.
+# ============================================================
+_llm_cache: "OrderedDict[str, Any]" = OrderedDict()
+_agent_cache: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+_cache_lock = Lock()
+# Position of the multi-field extractor in the `init_agents` tuple
+MULTI_FIELD_AGENT = 4
+# `reasoning` prefix of an extraction whose LLM call failed
+EXTRACTION_FAILED = "Extraction failed"
+
+
+def _lru_get(cache: OrderedDict, key, build: Callable[[], Any]):
+    with _cache_lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    value = build()
+    with _cache_lock:
+        cache[key] = value
+        while len(cache) > settings.AGENT_CACHE_SIZE:
+            cache.popitem(last=False)
+    return value
+
+
+def get_llm(api_key: str):
+    """Dynamically create ChatGroq using the provided frontend API key."""
+    if not api_key:
+        raise ValueError("Missing LLM API key for this session.")
+    from langchain_groq import ChatGroq
+
+    return _lru_get(_llm_cache, api_key, lambda: ChatGroq(
+        model=settings.GROQ_MODEL,
+        api_key=api_key,
+        temperature=0.1
+    ))
+
+# ============================================================
+# ✅ PROMPT TEMPLATES
+# `{metadata}` is filled per call by `system_prompt`; the section's
+# examples are filled once when the engine is built.
+# ============================================================
+INTENT_CLASSIFIER_PROMPT = """You are an intent classification agent for a conversational resume builder chatbot.
+
+<CHATBOT_CONTEXT>
+{metadata}
+</CHATBOT_CONTEXT>
+
+<YOUR_TASK>
+Analyze the user's message and determine their PRIMARY INTENT from these categories:
+
+1. **answer_question**: User is providing information in response to the bot's question
+   - Examples: {answer_examples}
+
+2. **request_summary**: User wants to know what information has been collected so far
+   - Examples: "what do you have so far?", "can you show me what we've covered?", "recap please"
+   - Note: This is NOT the same as asking about the field being discussed
+
+3. **request_clarification**: User doesn't understand the current question/field/concept
+   - Examples: {clarification_examples}
+   - This includes meta-questions about the process itself
+
+4. **request_done**: User wants to stop or finish the conversation early
+   - Examples: "that's all", "I'm done", "let's finish", "stop"
+
+5. **off_topic**: User is discussing something unrelated to the task
+   - Examples: "how's the weather?", "tell me a joke"
+
+<IMPORTANT>
+- Focus on the PRIMARY intent, not secondary meanings
+- Be confident in common patterns
+- For ambiguous cases, default to "answer_question" if they seem to be providing information
+- Mark confidence < 0.7 if truly ambiguous
+</IMPORTANT>
+</YOUR_TASK>"""
+
+CLARIFICATION_GENERATOR_PROMPT = """You are a helpful clarification agent for a resume builder chatbot.
+
+<CHATBOT_CONTEXT>
+{metadata}
+</CHATBOT_CONTEXT>
+
+<YOUR_TASK>
+The user is confused or asking for clarification. Your job is to:
+
+1. **Explain** the concept, field, or process they're asking about clearly and concisely
+2. **Provide an example** if helpful (especially for abstract concepts)
+3. **Re-ask** the original question in a clearer, more accessible way
+
+<GUIDELINES>
+- Be friendly and encouraging
+- Use simple language
+- Provide concrete examples from {example_domain}
+- Don't be condescending
+- Keep explanations brief (2-3 sentences max)
+- Make the re-asked question easier to understand than the original
+</GUIDELINES>
+</YOUR_TASK>"""
+
+# ============================================================
+# ✅ HELPER FUNCTIONS
+# ============================================================
+def is_field_data_present(value: Any) -> bool:
+    """Check if the extracted value is actually meaningful data."""
+    if value is None: return False
+    if isinstance(value, str): return bool(value.strip())
+    if isinstance(value, (list, dict)): return bool(value)
+    if isinstance(value, (int, float)): return True
+    return False
+
+def clean_user_input(text: str) -> str:
+    """Utility to clean common low-effort phrases for matching."""
+    return re.sub(r'[^\w\s]', '', text).strip().lower()
+
+
+class _PromptTable:
+    """Engine attribute filled from the section's `prompts` loader on first access."""
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, engine, owner=None):
+        if engine is None:
+            return self
+        # Only reached until ensure_prompts stores the value on the instance
+        engine.ensure_prompts()
+        return engine.__dict__[self.name]
+
+
+class SectionEngine:
+    """
+    Field-by-field collection of one resume entry for `section`.
+
+    `all_fields` are asked in order; `mandatory_fields` get two attempts,
+    the rest one. With `upsert_key` the confirmed entry replaces the saved
+    entry with the same value for that field (or is appended); without it
+    the entry replaces the section's list.
+    """
+
+    field_prompts = _PromptTable()
+    question_prompts = _PromptTable()
+    clarifications = _PromptTable()
+    acknowledgments = _PromptTable()
+    re_ask_phrases = _PromptTable()
+    metadata = _PromptTable()
+
+    def __init__(
+        self,
+        section: str,
+        *,
+        all_fields: List[str],
+        mandatory_fields: List[str],
+        list_fields: List[str],
+        prompts: Callable[[], Dict[str, Any]],
+        entry_key: str,
+        collected_key: str,
+        noun: str,
+        entry_label: str,
+        focus: str,
+        welcome: str,
+        title_field: str,
+        untitled: str,
+        summary_header: Callable[[dict], str],
+        header_fields: Iterable[str] = (),
+        edit_examples: str,
+        answer_examples: str,
+        clarification_examples: str,
+        example_domain: str,
+        dated_fields: Iterable[str] = (),
+        upsert_key: Optional[str] = None,
+    ):
+        self.section = section
+        self.all_fields = all_fields
+        self.mandatory_fields = mandatory_fields
+        self.list_fields = list_fields
+        self.load_prompts = prompts
+        self.entry_key = entry_key
+        self.collected_key = collected_key
+        self.noun = noun
+        self.entry_label = entry_label
+        self.focus = focus
+        self.welcome = welcome
+        self.title_field = title_field
+        self.untitled = untitled
+        self.summary_header = summary_header
+        self.header_fields = set(header_fields)
+        self.edit_examples = edit_examples
+        self.dated_fields = set(dated_fields)
+        self.upsert_key = upsert_key
+        self.data_tag = noun.upper().replace(" ", "_")
+        self.submitted_message = f"Perfect! Your {entry_label} has been submitted successfully. Thanks for sharing! 👋"
+
+        self.intent_prompt = INTENT_CLASSIFIER_PROMPT.format(
+            metadata="{metadata}", answer_examples=answer_examples, clarification_examples=clarification_examples
+        )
+        self.clarification_prompt = CLARIFICATION_GENERATOR_PROMPT.format(
+            metadata="{metadata}", example_domain=example_domain
+        )
+
+        # Agents bound for the current turn (set by handle_message, read by the nodes)
+        self._agents: ContextVar[Optional[tuple]] = ContextVar(f"{section}_agents", default=None)
+        self._app = None
+        self._lock = Lock()
+
+    # ============================================================
+    # ✅ LAZY PROMPTS AND GRAPH
+    # ============================================================
+    def ensure_prompts(self):
+        """Loads the section's prompt module (once) and picks the full or compact set."""
+        if self.prompts_loaded:
+            return
+        with self._lock:
+            if self.prompts_loaded:
+                return
+            tables = self.load_prompts()
+            # Full or compact prompt set, per deployment (settings.PROMPT_VARIANT)
+            field_prompts, question_prompts = select_prompt_set(
+                tables["field_prompts"], tables["base_extraction_prompt"],
+                tables["question_prompts"], tables["base_question_prompt"],
+            )
+            self.field_prompts = field_prompts
+            self.question_prompts = question_prompts
+            self.clarifications = tables["clarifications"]
+            self.acknowledgments = tables["acknowledgments"]
+            self.re_ask_phrases = tables["re_ask_phrases"]
+            self.metadata = tables["metadata"]
+            print(f"📚 {self.section} prompts loaded")
+
+    @property
+    def app(self):
+        """The compiled graph, built on first use (MongoDB is connected then if it is not yet)."""
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    self._app = self.build_graph()
+        return self._app
+
+    @property
+    def is_compiled(self) -> bool:
+        return self._app is not None
+
+    @property
+    def prompts_loaded(self) -> bool:
+        return "metadata" in self.__dict__
+
+    def warm_up(self):
+        """Everything the first turn would otherwise pay for, except the per-key agents."""
+        self.ensure_prompts()
+        self.app
+        system_prompt(self.intent_prompt, self.metadata)
+        system_prompt(self.clarification_prompt, self.metadata)
+        for schema in (FieldExtractionResult, FieldQuestionGeneration, UserIntentClassification,
+                       ClarificationResponse, MultiFieldExtractionResult):
+            tool_schema(schema)
+
+    # ============================================================
+    # ✅ AGENTS
+    # ============================================================
+    def init_agents(self, llm) -> tuple:
+        """Bind all field/intent/clarification agents dynamically."""
+        field_extractor_agents = {
+            f: build_agent(llm, FieldExtractionResult, "extraction", field=f)
+            for f in self.all_fields
+        }
+        field_question_agents = {
+            f: build_agent(llm, FieldQuestionGeneration, "question")
+            for f in self.all_fields
+        }
+        intent_classifier = build_agent(llm, UserIntentClassification, "intent")
+        clarification_generator = build_agent(llm, ClarificationResponse, "clarification")
+        multi_field_extractor = build_agent(llm, MultiFieldExtractionResult, "extraction")
+        return field_extractor_agents, field_question_agents, intent_classifier, clarification_generator, multi_field_extractor
+
+    def agents_for(self, api_key: str) -> tuple:
+        """The section's agents for `api_key`, bound once and reused across turns."""
+        return _lru_get(_agent_cache, (self.section, api_key), lambda: self.init_agents(get_llm(api_key)))
+
+    def multi_field_agent(self, api_key: str):
+        """The multi-field extractor for `api_key` (used for other sections' spillover)."""
+        return self.agents_for(api_key)[MULTI_FIELD_AGENT]
+
+    @contextmanager
+    def bound(self, agents: tuple):
+        """Makes `agents` the ones the nodes use for this turn (this context only)."""
+        token = self._agents.set(agents)
+        try:
+            yield agents
+        finally:
+            self._agents.reset(token)
+
+    @property
+    def agents(self) -> tuple:
+        agents = self._agents.get()
+        if agents is None:
+            raise RuntimeError(f"No {self.section} agents bound for this turn.")
+        return agents
+
+    # ============================================================
+    # ✅ INTENT CLASSIFICATION SYSTEM
+    # ============================================================
+    def classify_intent(
+        self,
+        user_message: str,
+        current_field: Optional[str],
+        conversation_history: List[BaseMessage],
+        entry_data: dict
+    ) -> UserIntentClassification:
+        """
+        Uses LLM to classify the user's intent instead of keyword matching.
+        """
+        clean_message = clean_user_input(user_message)
+        if not llm_available("intent"):
+            classification = UserIntentClassification(**offline_intent(clean_message))
+            print(f"📴 OFFLINE INTENT: {classification.intent}")
+            return classification
+
+        cached = get_cached_intent(self.section, current_field, clean_message)
+        if cached:
+            classification = UserIntentClassification(**cached)
+            print(f"🎯 INTENT (cached): {classification.intent} (confidence: {classification.confidence:.2f})")
+            return classification
+
+        # Build context
+        system = system_prompt(self.intent_prompt, self.metadata)
+        budget = fit_prompt(
+            "intent",
+            system,
+            history=format_history(conversation_history, 6),
+            known=entry_data or None,
+            message=user_message
+        )
+        entry_context = budget["known"] if entry_data else "No data collected yet"
+
+        prompt = f"""<CONVERSATION_HISTORY>
+{budget["history"]}
+</CONVERSATION_HISTORY>
+
+<CURRENT_FIELD_BEING_ASKED>
+{current_field or 'None - just starting'}
+</CURRENT_FIELD_BEING_ASKED>
+
+<{self.data_tag}_DATA_SO_FAR>
+{entry_context}
+</{self.data_tag}_DATA_SO_FAR>
+
+<USER_MESSAGE>
+{budget['message']}
+</USER_MESSAGE>
+
+Classify the user's intent based on their message."""
+
+        try:
+            result = self.agents[2].invoke([SystemMessage(content=system), HumanMessage(content=prompt)])
+
+            if not result.tool_calls:
+                print(f"⚠️ No tool call for intent classification. Response: {result.content}")
+                # Default fallback
+                return UserIntentClassification(
+                    intent="answer_question",
+                    confidence=0.5,
+                    reasoning="Fallback due to tool call failure"
+                )
+
+            classification = UserIntentClassification(**result.tool_calls[0]["args"])
+
+            print(f"🎯 INTENT: {classification.intent} (confidence: {classification.confidence:.2f})")
+            print(f"   Reasoning: {classification.reasoning}")
+
+            store_intent(self.section, current_field, clean_message, classification.model_dump())
+            return classification
+
+        except Exception as e:
+            print(f"❌ Intent classification error: {e}")
+            return UserIntentClassification(
+                intent="answer_question",
+                confidence=0.3,
+                reasoning=f"Error during classification: {str(e)}"
+            )
+
+    # ============================================================
+    # ✅ CLARIFICATION GENERATION SYSTEM
+    # ============================================================
+    def generate_clarification(
+        self,
+        user_message: str,
+        current_field: str,
+        clarification_topic: Optional[str],
+        conversation_history: List[BaseMessage],
+        entry_data: dict
+    ) -> ClarificationResponse:
+        """
+        Uses LLM to generate contextual clarification instead of static templates.
+        """
+        field_name = current_field.replace('_', ' ')
+        if not has_budget(settings.TURN_CLARIFICATION_RESERVE_SECONDS) or not llm_available("clarification"):
+            print("⏱️ Turn budget low or LLM unavailable - using static clarification")
+            return ClarificationResponse(
+                explanation=self.clarifications.get(current_field, f"I'm asking about the {field_name} of your {self.noun}."),
+                example=None,
+                follow_up_question=f"Could you tell me about the {field_name}?"
+            )
+
+        topic = clarification_topic or user_message
+        known = find_clarification(
+            self.section,
+            current_field,
+            topic,
+            seed_explanation=self.clarifications.get(current_field),
+            seed_follow_up=f"Could you tell me about the {field_name}?"
+        )
+        if known:
+            return ClarificationResponse(**known)
+
+        field_info = self.metadata["fields_we_collect"].get(
+            current_field,
+            f"Information about your {self.noun}"
+        )
+
+        system = system_prompt(self.clarification_prompt, self.metadata)
+        budget = fit_prompt(
+            "clarification",
+            system,
+            history=format_history(conversation_history, 4),
+            known=entry_data or None,
+            message=user_message
+        )
+
+        prompt = f"""<RECENT_CONVERSATION>
+{budget["history"]}
+</RECENT_CONVERSATION>
+
+<CURRENT_FIELD>
+Field Name: {current_field}
+Field Purpose: {field_info}
+</CURRENT_FIELD>
+
+<USER_CONFUSION>
+User Message: {budget['message']}
+What they're confused about: {clarification_topic or 'The current question/field'}
+</USER_CONFUSION>
+
+<{self.data_tag}_DATA_SO_FAR>
+{budget['known'] if entry_data else 'Just starting'}
+</{self.data_tag}_DATA_SO_FAR>
+
+Generate a helpful clarification that addresses their confusion."""
+
+        try:
+            result = self.agents[3].invoke([SystemMessage(content=system), HumanMessage(content=prompt)])
+
+            if not result.tool_calls:
+                print(f"⚠️ No tool call for clarification. Response: {result.content}")
+                # Fallback
+                return ClarificationResponse(
+                    explanation=f"I'm asking about the {field_name} of your {self.noun}.",
+                    example=None,
+                    follow_up_question=f"Could you tell me about the {field_name}?"
+                )
+
+            clarification = ClarificationResponse(**result.tool_calls[0]["args"])
+
+            print(f"💡 CLARIFICATION GENERATED:")
+            print(f"   Explanation: {clarification.explanation}")
+            print(f"   Example: {clarification.example}")
+
+            remember_clarification(self.section, current_field, topic, clarification.model_dump(), entry_data)
+            return clarification
+
+        except Exception as e:
+            print(f"❌ Clarification generation error: {e}")
+            return ClarificationResponse(
+                explanation=f"I'm trying to understand the {field_name} of your {self.noun} better.",
+                example=None,
+                follow_up_question=f"Can you tell me more about the {field_name}?"
+            )
+
+    # ============================================================
+    # ✅ HELPER FUNCTIONS
+    # ============================================================
+    def next_field(self, completion: Dict[str, bool]) -> Optional[str]:
+        """Get next field in sequential order"""
+        for f in self.all_fields:
+            if not completion.get(f, False):
+                return f
+        return None
+
+    def acknowledge(self, field: str) -> str:
+        """Get a varied acknowledgment phrase for the field"""
+        reserved = reserved_acknowledgment(field)
+        if reserved:
+            return reserved
+        phrases = self.acknowledgments.get(field, ["Thanks!", "Got it."])
+        return random.choice(phrases)
+
+    def re_ask_phrase(self, attempt: int) -> str:
+        """Get a varied re-ask phrase based on attempt number"""
+        return random.choice(self.re_ask_phrases["first" if attempt == 1 else "second"])
+
+    def send_message(self, chat_id: str, content: str) -> AIMessage:
+        """Helper to create an AIMessage and log it to the database."""
+        msg = AIMessage(content=content)
+        try:
+            db.append_message(chat_id, "ai", content, self.section)
+        except Exception as e:
+            print(f"Message log error: {e}")
+        return msg
+
+    def save_entry(self, chat_id: str, entry: dict) -> bool:
+        """Saves the confirmed entry to the chat session in MongoDB."""
+        try:
+            entries = [entry]
+            if self.upsert_key:
+                # Replace the saved entry with the same key, or append
+                chat = db.get_chat_session(chat_id) or {}
+                entries = list(chat.get("resume_data", {}).get(self.section, []))
+                key = entry.get(self.upsert_key)
+                index = next((i for i, e in enumerate(entries) if key and e.get(self.upsert_key) == key), None)
+                if index is None:
+                    entries.append(entry)
+                else:
+                    entries[index] = entry
+            db.update_chat_session(chat_id, {f"resume_data.{self.section}": entries})
+            print(f"✅ {self.noun.capitalize()} saved: {entry.get(self.title_field)}")
+            record_entry(chat_id, self.section, entry)
+            return True
+        except Exception as e:
+            print(f"❌ Save error: {e}")
+            return False
+
+    def summarize(self, entry: dict) -> str:
+        """Formats a single entry into a readable string."""
+        lines = [self.summary_header(entry)]
+        for f in self.all_fields:
+            # Skip fields already in the header
+            if f in self.header_fields:
+                continue
+
+            v = entry.get(f)
+            if is_field_data_present(v):
+                key_name = f.replace('_', ' ').title()
+                if isinstance(v, list):
+                    lines.append(f"- {key_name}: {', '.join(map(str, v))}")
+                elif isinstance(v, dict):
+                    start = v.get('start_date', '')
+                    end = v.get('end_date', 'Present')
+                    lines.append(f"- {key_name}: {start} - {end}")
+                else:
+                    lines.append(f"- {key_name}: {v}")
+        return "\n".join(lines)
+
+    def title_of(self, entry: dict) -> str:
+        return entry.get(self.title_field, self.untitled)
+
+    # ============================================================
+    # ✅ AGENT FUNCTIONS
+    # ============================================================
+    def extract_field(self, field: str, messages: List[BaseMessage], current: Any) -> FieldExtractionResult:
+        """Invokes the appropriate field extraction agent."""
+        if not llm_available("extraction", field):
+            latest = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+            value, complete = offline_extract(field, latest, current, self.list_fields)
+            print(f"📴 [{field}] Offline extraction: {value}, Complete: {complete}")
+            return FieldExtractionResult(
+                field_name=field,
+                extracted_value=value,
+                is_complete=complete,
+                confidence=0.6 if complete else 0.0,
+                reasoning=OFFLINE_REASONING,
+                needs_clarification=False
+            )
+
+        agent = self.agents[0][field]
+        field_prompt = self.field_prompts[field]
+
+        history = fit_prompt("extraction", field_prompt, history=format_history(messages, 10), extra=json.dumps(current))["history"]
+        prompt = extraction_request(field, history, current, dated=field in self.dated_fields)
+
+        try:
+            result = agent.invoke([SystemMessage(content=field_prompt), HumanMessage(content=prompt)])
+
+            if not result.tool_calls:
+                print(f"⚠️ No tool call for {field}. Agent response: {result.content}")
+                raise Exception("No tool call made by agent.")
+
+            args = result.tool_calls[0]["args"]
+            args["field_name"] = field
+            extraction = FieldExtractionResult(**args)
+
+            print(f"📊 [{field}] Extracted: {extraction.extracted_value}, Complete: {extraction.is_complete}, Confidence: {extraction.confidence}")
+            return extraction
+        except Exception as e:
+            print(f"❌ Extract error {field}: {e}")
+            return FieldExtractionResult(
+                field_name=field,
+                extracted_value=current,
+                is_complete=bool(is_field_data_present(current)),
+                confidence=0.0,
+                reasoning=f"{EXTRACTION_FAILED}: {str(e)}",
+                needs_clarification=False
+            )
+
+    def reextract_offline(self, entry: dict, offline_fields: Dict[str, str]) -> List[str]:
+        """
+        Re-runs extraction on fields captured offline (raw text, unparsed
+        timelines) once their model is reachable again. Updates `entry`,
+        unflags the fields that went through and returns those whose value
+        changed; failed calls stay flagged for the next turn.
+        """
+        changed = []
+        for field, answer in list(offline_fields.items()):
+            if not llm_available("extraction", field) or not has_budget(settings.TURN_QUESTION_RESERVE_SECONDS):
+                continue
+            res = self.extract_field(field, [HumanMessage(content=answer)], None)
+            if res.reasoning.startswith(EXTRACTION_FAILED):
+                continue  # try again next turn
+            offline_fields.pop(field)
+            if is_field_data_present(res.extracted_value) and res.extracted_value != entry.get(field):
+                entry[field] = res.extracted_value
+                changed.append(field)
+        if changed:
+            print(f"🔁 Re-extracted offline fields: {changed}")
+        return changed
+
+    def generate_question(self, field: str, messages: List[BaseMessage], entry: dict, count: int) -> FieldQuestionGeneration:
+        """Invokes the appropriate question generation agent."""
+        fallback = f"Could you tell me about the {field.replace('_', ' ')} of your {self.noun}?"
+        if not has_budget(settings.TURN_QUESTION_RESERVE_SECONDS) or not llm_available("question"):
+            print(f"⏱️ Turn budget low or LLM unavailable - using question bank for {field}")
+            return FieldQuestionGeneration(
+                field_name=field,
+                question=fallback,
+                follow_up_prompts=[],
+                reasoning="Question bank (turn deadline)."
+            )
+
+        agent = self.agents[1][field]
+        budget = fit_prompt(
+            "question",
+            self.question_prompts[field],
+            history=format_history(messages, 5),
+            known={k: v for k, v in entry.items() if is_field_data_present(v)}
+        )
+        prompt = question_request(field, budget["history"], f"KNOWN_{self.data_tag}_DATA", budget["known"], count)
+
+        try:
+            result = invoke_streaming_question(agent, [SystemMessage(content=self.question_prompts[field]), HumanMessage(content=prompt)])
+
+            if not result.tool_calls:
+                print(f"⚠️ No tool call for {field} question. Agent response: {result.content}")
+                raise Exception("No tool call made by agent.")
+
+            args = result.tool_calls[0]["args"]
+            args["field_name"] = field
+            return FieldQuestionGeneration(**args)
+        except Exception as e:
+            print(f"❌ Question error {field}: {e}")
+            return FieldQuestionGeneration(
+                field_name=field,
+                question=fallback,
+                follow_up_prompts=[],
+                reasoning="Fallback question due to generation error."
+            )
+
+    # ============================================================
+    # ✅ NODES
+    # ============================================================
+    def start_node(self, state: dict) -> dict:
+        """
+        Called only on the very first interaction.
+        Initializes state and sends the welcome message.
+        """
+        print(f"\n🚀 START NODE ({self.section})")
+        msg = self.send_message(state["chat_id"], self.welcome)
+
+        new_state = {
+            **state,
+            "messages": state.get("messages", []) + [msg],
+            self.entry_key: {},
+            self.collected_key: [],
+            "field_completion_status": {f: False for f in self.all_fields},
+            "field_ask_count": {f: 0 for f in self.all_fields},
+            "is_first_message": False,
+            "interaction_count": 0,
+            "current_field": self.all_fields[0],
+            "awaiting_confirmation": False,
+            "awaiting_field_to_edit": False,
+        }
+        print(f"📦 Initialized state with empty {self.noun}: {new_state[self.entry_key]}")
+        return new_state
+
+    def _confirm(self, state: dict, chat_id: str, entry: dict, completion: Dict[str, bool], intro: str, question: str) -> dict:
+        """Shows the entry's summary (`intro` may use `{title}`) and waits for a yes/no."""
+        msg_content = intro.format(title=self.title_of(entry)) + "\n"
+        msg_content += self.summarize(entry)
+        msg_content += f"\n\n**{question}** (Please respond 'yes' or 'no')."
+        msg = self.send_message(chat_id, msg_content)
+        return {
+            **state,
+            "messages": state["messages"] + [msg],
+            self.entry_key: entry,
+            "field_completion_status": completion,
+            "current_field": None,
+            "awaiting_confirmation": True,
+            "interaction_count": state.get("interaction_count", 0) + 1,
+        }
+
+    def _ask(self, state: dict, chat_id: str, entry: dict, completion: Dict[str, bool], ask_counts: Dict[str, int], field: str, content: str) -> dict:
+        msg = self.send_message(chat_id, content)
+        return {
+            **state,
+            "messages": state["messages"] + [msg],
+            self.entry_key: entry,
+            "field_completion_status": completion,
+            "field_ask_count": ask_counts,
+            "current_field": field,
+            "interaction_count": state.get("interaction_count", 0) + 1,
+        }
+
+    def process_node(self, state: dict) -> dict:
+        """
+        Main processing node with LLM-based intent classification.
+        """
+        print(f"\n🔄 PROCESS INPUT NODE ({self.section}, iteration {state.get('interaction_count', 0) + 1})")
+        sync_history(state)
+
+        latest_msg_content = ""
+        for m in reversed(state["messages"]):
+            if isinstance(m, HumanMessage):
+                latest_msg_content = m.content
+                break
+
+        if not latest_msg_content:
+            print("⚠️ No human message found. Ending.")
+            return state
+
+        latest_msg_clean = clean_user_input(latest_msg_content)
+
+        entry = dict(state.get(self.entry_key) or {})
+        completion = dict(state.get("field_completion_status") or {})
+        ask_counts = dict(state.get("field_ask_count") or {})
+        chat_id = state["chat_id"]
+
+        print(f"📦 Current {self.noun}: {entry}")
+        print(f"📦 Field completion: {completion}")
+        print(f"📦 Current field: {state.get('current_field')}")
+
+        # Fields captured while the LLM was offline get a real extraction once it is back
+        offline_fields = dict(state.get("offline_fields") or {})
+        if offline_fields:
+            changed = self.reextract_offline(entry, offline_fields)
+            state = {**state, "offline_fields": offline_fields, self.entry_key: entry}
+            if changed and state.get("awaiting_confirmation"):
+                # The user has not seen these values yet: confirm the corrected summary instead
+                return self._confirm(state, chat_id, entry, completion,
+                                     "I've re-checked a few details I noted while I was offline. Here's the updated summary for **{title}**:",
+                                     "Does everything look correct now?")
+
+        # ============================================================
+        # STEP 0: Handle Edit Mode
+        # ============================================================
+        if state.get("awaiting_field_to_edit"):
+            print("➡️ Handling edit request...")
+            field_to_edit = None
+            for field in self.all_fields:
+                if field in latest_msg_clean.replace(" ", "_"):
+                    field_to_edit = field
+                    break
+
+            if "submit" in latest_msg_clean or "done" in latest_msg_clean or "looks good" in latest_msg_clean:
+                print("✅ User is done editing. Re-confirming...")
+                return {
+                    **self._confirm(state, chat_id, entry, completion, "Excellent! Here's the updated summary for **{title}**:", "Does everything look correct now?"),
+                    "awaiting_field_to_edit": False,
+                    "interaction_count": state.get("interaction_count", 0),
+                }
+
+            if field_to_edit:
+                print(f"✏️ User wants to edit field: {field_to_edit}")
+                completion[field_to_edit] = False
+                ask_counts[field_to_edit] = 0
+
+                q = self.generate_question(field_to_edit, state["messages"], entry, 1)
+                return {
+                    **self._ask(state, chat_id, entry, completion, ask_counts, field_to_edit,
+                                f"Sure, let's update the **{field_to_edit.replace('_', ' ')}**. {q.question}"),
+                    "awaiting_field_to_edit": False,
+                }
+            else:
+                print("⚠️ Unclear edit request. Re-asking.")
+                msg = self.send_message(chat_id, f"I'm not sure which field you'd like to edit. Could you specify? (e.g., {self.edit_examples}). Or just say 'submit' if everything looks good.")
+                return {
+                    **state,
+                    "messages": state["messages"] + [msg],
+                    self.entry_key: entry,
+                }
+
+        # ============================================================
+        # STEP 1: Handle Confirmation Reply
+        # ============================================================
+        if state.get("awaiting_confirmation"):
+            print("➡️ Handling final confirmation...")
+            if any(w in latest_msg_clean for w in CONFIRM_YES):
+                if self.save_entry(chat_id, entry):
+                    print(f"✅ User confirmed. {self.noun.capitalize()} saved.")
+                    msg = self.send_message(chat_id, self.submitted_message)
+                    return {
+                        **state,
+                        "messages": state["messages"] + [msg],
+                        self.entry_key: entry,
+                        self.collected_key: [entry],
+                        "awaiting_confirmation": False,
+                        "current_field": None,
+                        "is_complete": True,
+                    }
+                msg = self.send_message(chat_id, f"Sorry, I couldn't save your {self.entry_label} just now. Please reply 'yes' to try again.")
+                return {
+                    **state,
+                    "messages": state["messages"] + [msg],
+                    self.entry_key: entry,
+                }
+            elif any(w in latest_msg_clean for w in CONFIRM_NO):
+                print("❌ User rejected summary. Entering edit mode.")
+                msg = self.send_message(chat_id, f"No problem! **Which field would you like to update?** (e.g., {self.edit_examples}).\n\nOnce you're satisfied with the changes, just say 'submit'.")
+                return {
+                    **state,
+                    "messages": state["messages"] + [msg],
+                    self.entry_key: entry,
+                    "awaiting_confirmation": False,
+                    "awaiting_field_to_edit": True,
+                    "current_field": None,
+                    "is_complete": False,
+                }
+            else:
+                print("⚠️ Unclear confirmation. Re-asking.")
+                msg = self.send_message(chat_id, f"I didn't quite catch that. Is the {self.noun} information correct and ready to submit? (Please respond 'yes' or 'no').")
+                return {
+                    **state,
+                    "messages": state["messages"] + [msg],
+                    self.entry_key: entry,
+                }
+
+        # ============================================================
+        # STEP 2: Get CURRENT field
+        # ============================================================
+        current_field_being_asked = state.get("current_field") or self.next_field(completion)
+
+        if not current_field_being_asked:
+            # "change the title", "edit it": reopen the saved entry through the edit flow
+            if any(w in latest_msg_clean for w in CONFIRM_NO) or any(f in latest_msg_clean.replace(" ", "_") for f in self.all_fields):
+                print(f"✏️ Edit requested for the saved {self.noun}")
+                return self.process_node({**state, "awaiting_field_to_edit": True, "is_complete": False})
+            print(f"✅ {self.noun.capitalize()} already completed. No more fields.")
+            msg = self.send_message(chat_id, f"It looks like we've already collected all your {self.noun} information! If you need to make changes, please let me know.")
+            return {
+                **state,
+                "messages": state["messages"] + [msg],
+                self.entry_key: entry,
+            }
+
+        print(f"🎯 CURRENT FIELD TO PROCESS: {current_field_being_asked}")
+
+        # ============================================================
+        # STEP 3: ✨ CLASSIFY USER INTENT (LLM-BASED)
+        # ============================================================
+        intent = self.classify_intent(
+            user_message=latest_msg_content,
+            current_field=current_field_being_asked,
+            conversation_history=state["messages"],
+            entry_data=entry
+        )
+
+        # ============================================================
+        # STEP 4: Handle SUMMARY request (LLM detected)
+        # ============================================================
+        if intent.intent == "request_summary":
+            print("➡️ User requested summary (LLM-detected)")
+            summary = "Of course! Here's what we have so far:"
+            if entry:
+                summary += self.summarize(entry)
+            else:
+                summary = f"We haven't captured any {self.noun} details yet!"
+
+            q = self.generate_question(current_field_being_asked, state["messages"], entry, ask_counts.get(current_field_being_asked, 0))
+            summary += f"\n\nNow, let's continue: {q.question}"
+            return self._ask(state, chat_id, entry, completion, ask_counts, current_field_being_asked, summary)
+
+        # ============================================================
+        # STEP 5: Handle CLARIFICATION request (LLM detected & generated)
+        # ============================================================
+        if intent.intent == "request_clarification":
+            print(f"➡️ User needs clarification (LLM-detected)")
+            print(f"   Topic: {intent.clarification_topic}")
+
+            # Generate contextual clarification using LLM
+            clarification = self.generate_clarification(
+                user_message=latest_msg_content,
+                current_field=current_field_being_asked,
+                clarification_topic=intent.clarification_topic,
+                conversation_history=state["messages"],
+                entry_data=entry
+            )
+
+            # Build response
+            response_parts = [clarification.explanation]
+            if clarification.example:
+                response_parts.append(f"\n\n**For example:** {clarification.example}")
+            response_parts.append(f"\n\n{clarification.follow_up_question}")
+
+            return self._ask(state, chat_id, entry, completion, ask_counts, current_field_being_asked, "".join(response_parts))
+
+        # ============================================================
+        # STEP 6: Handle DONE request (LLM detected)
+        # ============================================================
+        if intent.intent == "request_done":
+            print("➡️ User wants to finish (LLM-detected)")
+            summary_msg = f"Understood. I'll stop collecting information for this {self.entry_label}. "
+            if entry.get(self.title_field):
+                summary_msg += "Since we haven't captured everything, I won't save this one. Feel free to start again anytime!"
+            else:
+                summary_msg = f"Alright, no {self.entry_label} has been captured yet. Let me know if you'd like to start!"
+
+            msg = self.send_message(chat_id, summary_msg)
+            return {
+                **state,
+                "messages": state["messages"] + [msg],
+                self.entry_key: entry,
+                "current_field": None
+            }
+
+        # ============================================================
+        # STEP 7: Handle SKIP (explicit keyword check)
+        # ============================================================
+        if latest_msg_clean in SKIP_PHRASES:
+            print(f"➡️ User explicitly skipped field: {current_field_being_asked}")
+            completion[current_field_being_asked] = True
+
+            next_field = self.next_field(completion)
+            if not next_field:
+                print("✅ All fields complete (last one skipped)! Moving to confirmation.")
+                return self._confirm(state, chat_id, entry, completion,
+                                     "No worries! It looks like we have all the information now. Here's the summary for **{title}**:",
+                                     "Does this look accurate?")
+
+            print(f"⏭️ Skipping to next field: {next_field}")
+            ask_counts[next_field] = 1
+            q = self.generate_question(next_field, state["messages"], entry, 1)
+
+            ack = f"That's fine, we can skip {current_field_being_asked.replace('_', ' ')}. "
+            return self._ask(state, chat_id, entry, completion, ask_counts, next_field, f"{ack}{q.question}")
+
+        # ============================================================
+        # STEP 8: Extract data for CURRENT field (answer_question intent)
+        # ============================================================
+        if intent.intent == "answer_question":
+            print(f"🔬 Extracting {current_field_being_asked}...")
+            others = submit_other_fields(
+                self.agents[MULTI_FIELD_AGENT],
+                self.section,
+                current_field_being_asked,
+                pending_fields(self.all_fields, completion, current_field_being_asked),
+                self.metadata.get("fields_we_collect", {}),
+                self.list_fields,
+                latest_msg_content
+            )
+            res = self.extract_field(current_field_being_asked, state["messages"], entry.get(current_field_being_asked))
+            # Flag offline captures; an answer the LLM extracted replaces an older flag
+            flagged = {f: a for f, a in offline_fields.items() if f != current_field_being_asked}
+            if res.reasoning == OFFLINE_REASONING and is_field_data_present(res.extracted_value):
+                flagged[current_field_being_asked] = latest_msg_content
+            state = {**state, "offline_fields": flagged}
+
+            is_now_complete = False
+
+            if is_field_data_present(res.extracted_value):
+                if current_field_being_asked in self.list_fields and isinstance(res.extracted_value, list):
+                    current_list = entry.get(current_field_being_asked, [])
+                    new_items = [item for item in res.extracted_value if item not in current_list]
+                    entry[current_field_being_asked] = current_list + new_items
+                else:
+                    entry[current_field_being_asked] = res.extracted_value
+                print(f"✅ Saved {current_field_being_asked}: {entry[current_field_being_asked]}")
+
+            # Other fields answered in the same message
+            filled = merge_other_fields(entry, completion, others.result(), self.list_fields)
+
+            if res.is_complete and res.confidence > 0.5:
+                is_now_complete = True
+                if not is_field_data_present(res.extracted_value):
+                    print(f"✅ {current_field_being_asked} marked COMPLETE (user provided no data)")
+            elif is_field_data_present(res.extracted_value):
+                is_now_complete = True
+                print(f"✅ {current_field_being_asked} marked COMPLETE (data extracted)")
+
+            # ============================================================
+            # STEP 9: Decide What's Next
+            # ============================================================
+            if is_now_complete:
+                completion[current_field_being_asked] = True
+                print(f"✅ {current_field_being_asked} marked COMPLETE")
+
+                next_field = self.next_field(completion)
+                if not next_field:
+                    print("✅ All fields complete! Moving to confirmation.")
+                    return self._confirm(state, chat_id, entry, completion,
+                                         "Excellent! I believe I have all the information for **{title}**. Here's a complete summary:",
+                                         "Does everything look correct?")
+
+                print(f"➡️ Moving to next field: {next_field}")
+                ask_counts[next_field] = 1
+                q = self.generate_question(next_field, state["messages"], entry, 1)
+
+                ack = self.acknowledge(current_field_being_asked)
+                ack = f"{ack} {filled_note(filled)}".rstrip()
+                return self._ask(state, chat_id, entry, completion, ask_counts, next_field, f"{ack} {q.question}")
+
+            print(f"⚠️ {current_field_being_asked} is NOT complete.")
+            ask_count = ask_counts.get(current_field_being_asked, 0)
+            max_asks = 2 if current_field_being_asked in self.mandatory_fields else 1
+
+            if ask_count >= max_asks:
+                print(f"⏭️ Skipping {current_field_being_asked} (max asks reached)")
+                completion[current_field_being_asked] = True
+
+                next_field_after_skip = self.next_field(completion)
+                if not next_field_after_skip:
+                    print("✅ All fields complete (last one skipped via max_asks)!")
+                    return self._confirm(state, chat_id, entry, completion,
+                                         "That's alright. I think we have everything for **{title}**. Here's the summary:",
+                                         "Does this look accurate?")
+
+                print(f"➡️ Moving to next field after skip: {next_field_after_skip}")
+                ask_counts[next_field_after_skip] = 1
+                q = self.generate_question(next_field_after_skip, state["messages"], entry, 1)
+
+                ack = f"No problem, let's move on from {current_field_being_asked.replace('_', ' ')}. "
+                return self._ask(state, chat_id, entry, completion, ask_counts, next_field_after_skip, f"{ack}{q.question}")
+
+            new_ask_count = ask_count + 1
+            ask_counts[current_field_being_asked] = new_ask_count
+
+            print(f"💬 Re-asking for {current_field_being_asked} (attempt {new_ask_count}/{max_asks})")
+            q = self.generate_question(current_field_being_asked, state["messages"], entry, new_ask_count)
+            return self._ask(state, chat_id, entry, completion, ask_counts, current_field_being_asked,
+                             f"{self.re_ask_phrase(new_ask_count)} {q.question}")
+
+        # ============================================================
+        # STEP 10: Handle OFF_TOPIC or unclassified intents
+        # ============================================================
+        print(f"⚠️ Intent classified as: {intent.intent}")
+        q = self.generate_question(current_field_being_asked, state["messages"], entry, ask_counts.get(current_field_being_asked, 0))
+
+        response = f"I appreciate you sharing that! However, I'm specifically focused on collecting information about {self.focus} right now. "
+        response += q.question
+        return self._ask(state, chat_id, entry, completion, ask_counts, current_field_being_asked, response)
+
+    # ============================================================
+    # ✅ BUILD GRAPH
+    # ============================================================
+    def build_graph(self):
+        from langgraph.graph import StateGraph, END
+
+        if not db.ensure_connected():
+            raise ConnectionError(f"❌ MongoDB unavailable; {self.section} graph not compiled.")
+        graph = StateGraph(graph_state_type(f"{self.section.title()}GraphState", self.entry_key, self.collected_key))
+        graph.add_node("start", self.start_node)
+        graph.add_node("process", with_memory(self.process_node))
+        graph.add_conditional_edges("__start__", lambda s: "start" if s.get("is_first_message", True) else "process")
+        graph.add_edge("start", END)
+        graph.add_edge("process", END)
+        # One checkpointer per section: a chat can move between sections on the same thread id
+        checkpointer = MongoDBCustomCheckpointer(db.client)
+        app = graph.compile(checkpointer=checkpointer)
+        print(f"✅ {self.section.upper()} GRAPH COMPILED - LLM-BASED INTENT CLASSIFICATION V5.0")
+        return app
+
+    # ============================================================
+    # ✅ MESSAGE HANDLER
+    # ============================================================
+    def _progress(self, status_dict: Dict[str, bool]) -> int:
+        completed_fields = sum(1 for v in status_dict.values() if v is True)
+        total_fields = len(self.all_fields)
+        return int((completed_fields / total_fields) * 100) if total_fields > 0 else 0
+
+    def handle_message(self, chat_id: str, user_message: str, app=None, api_key: str = None, agents: tuple = None) -> dict:
+        """
+        Main entry point for handling a user's message.
+        Agents come from the caller, or from the per-key cache.
+        """
+        app = app or self.app
+        config = {"configurable": {"thread_id": chat_id}, "recursion_limit": 10}
+        db.append_message(chat_id, "user", user_message, self.section)
+
+        print(f"\n{'='*60}")
+        print(f"📨 User message: {user_message} (Thread: {chat_id}, section: {self.section})")
+        print(f"{'='*60}")
+
+        try:
+            input_state = {"messages": [HumanMessage(content=user_message)]}
+            with self.bound(agents if agents is not None else self.agents_for(api_key)), turn_deadline():
+                app.invoke(input_state, config)
+            final_state = app.get_state(config)
+            final_values = final_state.values if final_state and final_state.values else {}
+
+            if final_values:
+                print(f"📦 State AFTER invoke:")
+                print(f"   - {self.entry_key}: {final_values.get(self.entry_key, {})}")
+                print(f"   - current_field: {final_values.get('current_field')}")
+                print(f"   - field_completion_status: {final_values.get('field_completion_status', {})}")
+                print(f"   - is_complete: {final_values.get('is_complete', False)}")
+
+            ai_msgs = [m for m in final_values.get("messages", []) if isinstance(m, AIMessage)]
+            ai_response = ai_msgs[-1].content if ai_msgs else f"I'm not sure what to say. Could you tell me about your {self.noun}?"
+
+            status_dict = final_values.get("field_completion_status", {f: False for f in self.all_fields})
+            percentage = self._progress(status_dict)
+            is_complete = final_values.get("is_complete", False)
+
+            if ai_response == self.submitted_message:
+                status_dict = {f: True for f in self.all_fields}
+                percentage = 100
+                is_complete = True
+
+            return_data = {
+                "chat_id": chat_id,
+                "ai_response": ai_response,
+                "current_section": self.section,
+                "is_complete": is_complete,
+                "percentage": percentage,
+                "status": status_dict
+            }
+
+            print(f"\n🤖 AI Response: {ai_response}")
+            print(f"✅ Returning data: {return_data}")
+            return return_data
+
+        except Exception as e:
+            print(f"❌ Error during graph invocation: {e}")
+            import traceback
+            traceback.print_exc()
+
+            error_msg = "I encountered an error. Could you try again?"
+            db.append_message(chat_id, "ai", error_msg, self.section)
+
+            status_dict = {f: False for f in self.all_fields}
+            percentage = 0
+            is_complete = False
+            try:
+                current_state = app.get_state(config)
+                if current_state and current_state.values:
+                    status_dict = current_state.values.get("field_completion_status", status_dict)
+                    is_complete = current_state.values.get("is_complete", False)
+                    percentage = self._progress(status_dict)
+            except Exception as se:
+                print(f"Could not retrieve state during error: {se}")
+
+            return {
+                "chat_id": chat_id,
+                "ai_response": error_msg,
+                "current_section": self.section,
+                "is_complete": is_complete,
+                "percentage": percentage,
+                "status": status_dict
+            }
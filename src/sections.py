@@ -0,0 +1,73 @@
+# src/sections.py
+import importlib
+from typing import Any, Dict
+
+from src.section_engine import SectionEngine, get_llm
+from src.graph_builder import ENGINE as PROJECTS
+from src.experience.experience_agent import ENGINE as EXPERIENCES
+from src.education.education_agent import ENGINE as EDUCATION
+from src.skills.skills_agent import ENGINE as SKILLS
+from src.achievements.achievements_agent import ENGINE as ACHIEVEMENTS
+
+
+def _lazy(module: str, name: str):
+    """`module.name`, imported on first call (the ATS formatters pull in their LLM stack)."""
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+    call.__name__ = name
+    return call
+
+
+def _entry(engine: SectionEngine, format_ats) -> Dict[str, Any]:
+    return {
+        "engine": engine,
+        "handler": engine.handle_message,
+        "get_llm": get_llm,
+        "init_agents": engine.init_agents,
+        "agents_for": engine.agents_for,
+        "acknowledge": engine.acknowledge,
+        "all_fields": engine.all_fields,
+        "list_fields": engine.list_fields,
+        "entry_key": engine.entry_key,
+        "collected_key": engine.collected_key,
+        "entry_label": engine.entry_label,
+        "next_field": engine.next_field,
+        "summarize": engine.summarize,
+        "send_message": engine.send_message,
+        "resume_key": engine.section,
+        "format_ats": format_ats,
+    }
+
+# ============================================================
+# ✅ SECTION REGISTRY
+# Keys match the `current_section` value each handler returns. Graphs
+# and prompt tables are reached through "engine" (both load lazily).
+# ============================================================
+SECTIONS: Dict[str, Dict[str, Any]] = {
+    "projects": _entry(PROJECTS, _lazy("src.project_resume", "format_ats_project_with_llm")),
+    "experiences": _entry(EXPERIENCES, _lazy("src.experience_resume", "format_ats_experience_with_llm")),
+    "education": _entry(EDUCATION, _lazy("src.education_resume", "format_ats_education_with_llm")),
+    "skills": _entry(SKILLS, _lazy("src.skills_resume", "format_ats_skills_with_llm")),
+    "achievements": _entry(ACHIEVEMENTS, _lazy("src.achievement_resume", "format_ats_achievement_with_llm")),
+}
+
+
+def get_section(name: str) -> Dict[str, Any]:
+    if name not in SECTIONS:
+        raise KeyError(f"Unknown section '{name}'. Expected one of: {', '.join(SECTIONS)}")
+    return SECTIONS[name]
+
+
+def initial_section_state(chat_id: str, section: str) -> Dict[str, Any]:
+    """Minimal state for a section's first invoke; the start node fills in the rest."""
+    all_fields = get_section(section)["all_fields"]
+    return {
+        "chat_id": chat_id,
+        "messages": [],
+        "field_completion_status": {field: False for field in all_fields},
+        "field_ask_count": {field: 0 for field in all_fields},
+        "current_field": None,
+        "conversation_context": "Starting conversation",
+        "interaction_count": 0,
+        "is_first_message": True,
+    }
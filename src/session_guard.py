@@ -0,0 +1,88 @@
+# src/session_guard.py
+import asyncio
+import os
+import socket
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+import src.database as db
+from src.config import settings
+
+# ============================================================
+# ✅ IN-PROCESS LOCKS
+# One asyncio.Lock per chat, dropped once nobody holds or waits for it.
+# ============================================================
+_locks: Dict[str, asyncio.Lock] = {}
+_lock_users: Dict[str, int] = {}
+
+_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+@asynccontextmanager
+async def chat_turn_lock(chat_id: str):
+    """
+    Serializes turns for one chat: an in-process lock for this worker plus a
+    MongoDB lease so that other workers wait as well.
+    """
+    lock = _locks.setdefault(chat_id, asyncio.Lock())
+    _lock_users[chat_id] = _lock_users.get(chat_id, 0) + 1
+    try:
+        async with lock:
+            owner = f"{_WORKER_ID}:{uuid.uuid4().hex}"
+            await _acquire_lease(chat_id, owner)
+            try:
+                yield
+            finally:
+                await asyncio.to_thread(db.release_chat_lease, chat_id, owner)
+    finally:
+        _lock_users[chat_id] -= 1
+        if _lock_users[chat_id] == 0:
+            _lock_users.pop(chat_id, None)
+            _locks.pop(chat_id, None)
+
+
+async def _acquire_lease(chat_id: str, owner: str) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.CHAT_LEASE_WAIT_SECONDS
+    while not await asyncio.to_thread(db.acquire_chat_lease, chat_id, owner, settings.CHAT_LEASE_TTL_SECONDS):
+        if loop.time() >= deadline:
+            raise TimeoutError("Another message for this chat is still being processed. Please retry.")
+        await asyncio.sleep(0.2)
+
+
+# ============================================================
+# ✅ IDEMPOTENT TURNS
+# ============================================================
+async def replay_response(chat_id: str, idempotency_key: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not idempotency_key:
+        return None
+    return await asyncio.to_thread(db.get_idempotent_response, chat_id, idempotency_key)
+
+
+async def remember_response(chat_id: str, idempotency_key: Optional[str], result: Dict[str, Any]) -> None:
+    if idempotency_key:
+        await asyncio.to_thread(db.save_idempotent_response, chat_id, idempotency_key, result)
+
+
+async def run_serialized_turn(
+    chat_id: str,
+    idempotency_key: Optional[str],
+    handler: Callable[..., dict],
+    *args,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    Runs a sync chat handler in a worker thread while holding the chat's turn
+    lock. A repeated `Idempotency-Key` returns the stored result without
+    touching the graph, the LLM or the message log.
+    """
+    async with chat_turn_lock(chat_id):
+        cached = await replay_response(chat_id, idempotency_key)
+        if cached is not None:
+            print(f"♻️ Replaying response for idempotency key {idempotency_key}")
+            return cached
+
+        result = await asyncio.to_thread(handler, *args, **kwargs)
+        await remember_response(chat_id, idempotency_key, result)
+        return result
@@ -1,12 +1,15 @@
 # src/services/skills_resume.py
 import json
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 
 from pydantic import BaseModel, Field, ValidationError
 from langchain_core.prompts import PromptTemplate
 from langchain_groq import ChatGroq
 from src.config import settings
+from src.json_stream import stream_ats_json
+from src.llm_scheduler import BACKGROUND, scheduled
+from src.model_tiers import tiered_llm
 
 
 # ============================================================
@@ -283,11 +286,6 @@ Step 2: ...
 
 ---
 
-**RAW SKILLS DATA:**
-{raw_skills}
-
----
-
 **YOUR TASK:**
 1. Extract "category_name" directly from "skill_domain" field (e.g., "Full Stack Web Development")
 2. Extract ALL possible skills from input data (skills_list, tools_or_frameworks, text fields)
@@ -302,6 +300,9 @@ Step 2: ...
 
 **CRITICAL**: Your response must be ONLY the JSON object. Start with {{ and end with }}. Nothing before, nothing after.
 
+**RAW SKILLS DATA:**
+{raw_skills}
+
 **OUTPUT (VALID JSON ONLY):**
 """)
 
@@ -535,7 +536,7 @@ def format_ats_skills_with_llm(skills_data: Dict[str, Any], api_key: str) -> Dic
         temperature=0.0,  # More deterministic
         max_tokens=2000   # Reduced to encourage concise output
     )
-    chain = prompt | llm
+    chain = scheduled(prompt | tiered_llm(llm, "ats"), llm, lane=BACKGROUND, est_output_tokens=2000)
 
     # Invoke LLM
     ai_message = chain.invoke({"raw_skills": json.dumps(skills_data, indent=2)})
@@ -560,4 +561,38 @@ def format_ats_skills_with_llm(skills_data: Dict[str, Any], api_key: str) -> Dic
 
     print("SUCCESS: ATS-optimized skills section JSON generated.")
     print(f"Final output: {json.dumps(final_json, indent=2)}")
-    return final_json
\ No newline at end of file
+    return final_json
+
+
+# ============================================================
+# Streaming Variant – emits fields/bullets as they are generated
+# ============================================================
+def stream_ats_skills_with_llm(skills_data: Dict[str, Any], api_key: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming version of `format_ats_skills_with_llm`.
+    Yields `field` and `item` events while the LLM is generating, then a
+    `complete` event with the validated ATS JSON.
+    """
+    llm = ChatGroq(
+        model=settings.GROQ_MODEL,
+        api_key=api_key,
+        temperature=0.0,
+        max_tokens=2000,
+        streaming=True
+    )
+    chain = scheduled(prompt | tiered_llm(llm, "ats"), llm, lane=BACKGROUND, est_output_tokens=2000)
+
+    def finalize(clean_json: Dict[str, Any]) -> Dict[str, Any]:
+        validated_json = validate_skills_output(clean_json, skills_data)
+        try:
+            return ATSSkillsSection(**validated_json).model_dump()
+        except ValidationError as e:
+            print(f"Pydantic validation error: {e}")
+            return validated_json
+
+    yield from stream_ats_json(
+        chain,
+        {"raw_skills": json.dumps(skills_data, indent=2)},
+        finalize=finalize,
+        fallback_parse=extract_clean_json,
+    )
@@ -0,0 +1,172 @@
+# src/startup_bench.py
+"""
+Worker startup benchmark and import-time budgets.
+
+    python -m src.startup_bench [--runs 5] [--top 15]
+    python -m src.startup_bench --check [--budget src.main=2500]
+
+Each run imports `src.main` in a fresh interpreter under
+`python -X importtime` and reports the wall time of the import and the
+slowest modules (cumulative). `--check` exits non-zero when a module is
+over its budget, when a module that should load lazily was imported, or
+when importing the app opened a MongoDB connection - so it can gate CI
+the way a test would.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGET = "src.main"
+
+# Cumulative import time budgets (ms, median over runs)
+IMPORT_BUDGETS_MS: Dict[str, float] = {
+    "src.main": 2500.0,
+    "src.sections": 600.0,
+    "src.section_engine": 500.0,
+    "src.database": 400.0,
+}
+
+# Loaded on first use (or in the lifespan), never by importing the app
+DEFERRED_MODULES = [
+    "src.prompts",
+    "src.experience.experience_prompt",
+    "src.education.education_prompt",
+    "src.skills.skills_prompt",
+    "src.achievements.achievement_prompt",
+    "src.project_resume",
+    "src.experience_resume",
+    "src.education_resume",
+    "src.skills_resume",
+    "src.achievement_resume",
+    "src.resume_import",
+    "langchain_groq",
+    "langgraph.graph",
+]
+
+CHILD = f"""
+import json, sys, time
+started = time.perf_counter()
+import {TARGET}
+elapsed = time.perf_counter() - started
+import src.database as db
+print(json.dumps({{"import_ms": elapsed * 1000, "modules": sorted(sys.modules), "db_connected": db.client is not None}}))
+"""
+
+
+# ============================================================
+# ✅ ONE RUN
+# ============================================================
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """`{module: cumulative ms}` from `-X importtime` output."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line[len("import time:"):].split("|", 2)
+        try:
+            cumulative[name.strip()] = int(total) / 1000
+        except ValueError:
+            continue  # header line
+    return cumulative
+
+
+def run_once() -> Dict[str, Any]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    result_line = next((l for l in reversed(proc.stdout.splitlines()) if l.startswith("{")), None)
+    if proc.returncode != 0 or result_line is None:
+        tail = "\n".join(proc.stderr.splitlines()[-15:])
+        raise RuntimeError(f"❌ `import {TARGET}` failed (exit {proc.returncode}):\n{tail}")
+    result = json.loads(result_line)
+    result["cumulative_ms"] = parse_importtime(proc.stderr)
+    return result
+
+
+# ============================================================
+# ✅ BENCHMARK + BUDGETS
+# ============================================================
+def benchmark(runs: int = 5) -> Dict[str, Any]:
+    results = [run_once() for _ in range(runs)]
+    modules = set().union(*(r["cumulative_ms"] for r in results))
+    median_ms = {
+        m: statistics.median(r["cumulative_ms"].get(m, 0.0) for r in results)
+        for m in modules
+    }
+    wall = [r["import_ms"] for r in results]
+    return {
+        "runs": runs,
+        "wall_ms": {"median": statistics.median(wall), "min": min(wall), "max": max(wall)},
+        "cumulative_ms": median_ms,
+        "loaded": sorted(set().union(*(r["modules"] for r in results))),
+        "db_connected": any(r["db_connected"] for r in results),
+    }
+
+
+def check_budgets(report: Dict[str, Any], budgets: Dict[str, float]) -> List[str]:
+    problems = []
+    for module, budget in budgets.items():
+        spent = report["cumulative_ms"].get(module)
+        if spent is not None and spent > budget:
+            problems.append(f"{module} took {spent:.0f} ms to import (budget {budget:.0f} ms)")
+    loaded = set(report["loaded"])
+    for module in DEFERRED_MODULES:
+        if module in loaded:
+            problems.append(f"{module} is imported at startup (should load on first use)")
+    if report["db_connected"]:
+        problems.append(f"importing {TARGET} connected to MongoDB (should happen in the lifespan)")
+    return problems
+
+
+def print_report(report: Dict[str, Any], top: int = 15):
+    wall = report["wall_ms"]
+    print(f"🚀 import {TARGET}: median {wall['median']:.0f} ms (min {wall['min']:.0f}, max {wall['max']:.0f}) over {report['runs']} runs")
+    print(f"{'cumulative ms':>14}  module")
+    slowest = sorted(report["cumulative_ms"].items(), key=lambda kv: kv[1], reverse=True)[:top]
+    for module, ms in slowest:
+        print(f"{ms:>14.1f}  {module}")
+
+
+def _parse_budget(text: str):
+    module, _, ms = text.partition("=")
+    return module, float(ms)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.startup_bench")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--check", action="store_true", help="exit 1 when a budget is exceeded")
+    parser.add_argument("--budget", action="append", type=_parse_budget, default=[], metavar="MODULE=MS",
+                        help="override or add an import budget")
+    parser.add_argument("--json", action="store_true", help="print the raw report")
+    args = parser.parse_args(argv)
+
+    try:
+        report = benchmark(args.runs)
+    except RuntimeError as e:
+        print(e)
+        return 2
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.top)
+
+    if not args.check:
+        return 0
+    problems = check_budgets(report, {**IMPORT_BUDGETS_MS, **dict(args.budget)})
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print("✅ Startup within budget")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
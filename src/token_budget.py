@@ -0,0 +1,178 @@
+# src/token_budget.py
+import json
+import threading
+from typing import Any, Dict, List, Tuple
+
+from src.config import settings
+
+# ============================================================
+# ✅ TOKEN COUNTING
+# tiktoken's cl100k_base is close to Llama's tokenizer for English;
+# without it, ~4 characters per token. The encoding is loaded on the
+# first count (it may download its BPE file), not at import time.
+# ============================================================
+_UNLOADED = object()
+_encoding: Any = _UNLOADED
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is _UNLOADED:
+        with _encoding_lock:
+            if _encoding is _UNLOADED:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    print(f"⚠️ tiktoken unavailable, counting ~4 chars per token: {e}")
+                    _encoding = None
+    return _encoding
+
+
+def tokenizer_name() -> str:
+    return "tiktoken cl100k_base" if _get_encoding() is not None else "approx. chars/4"
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, len(text) // 4)
+
+
+# ============================================================
+# ✅ BUDGET ALLOCATION
+# The system prompt and the request template are fixed; what is left of
+# the role's budget is split across the user's message, the known data
+# and the history. A part that needs less than its share gives the rest
+# to the others, highest priority first. Parts over their allotment are
+# shortened: history drops its oldest lines, known data is re-rendered
+# compactly and long values clipped, the message keeps its head and tail.
+# ============================================================
+PRIORITY = ["message", "known", "history"]
+SHARES = {"message": 0.4, "known": 0.3, "history": 0.3}
+
+# Tags and instructions around the parts in each request template
+TEMPLATE_OVERHEAD_TOKENS = 150
+
+
+def budget_for(role: str) -> int:
+    return settings.PROMPT_TOKEN_BUDGETS.get(role, settings.PROMPT_TOKEN_BUDGET)
+
+
+def render_known(known: Any) -> str:
+    return json.dumps(known, indent=2)
+
+
+def fit_prompt(
+    role: str,
+    system: str,
+    history: str = "",
+    known: Any = None,
+    message: str = "",
+    extra: str = "",
+) -> Dict[str, str]:
+    """
+    Fits one agent call into the role's token budget. Returns the rendered
+    `history`, `known` (JSON) and `message` to put in the request; `extra`
+    is counted but never shortened.
+    """
+    parts = {
+        "message": message or "",
+        "known": render_known(known) if known is not None else "",
+        "history": history or "",
+    }
+    need = {name: count_tokens(text) for name, text in parts.items()}
+    available = budget_for(role) - count_tokens(system) - count_tokens(extra) - TEMPLATE_OVERHEAD_TOKENS
+    if sum(need.values()) <= available:
+        return parts
+
+    allot = _allocate(need, max(available, 0))
+    print(f"📏 [budget:{role}] {sum(need.values())} tokens of request data for {max(available, 0)} available")
+    if need["message"] > allot["message"]:
+        parts["message"] = truncate_text(parts["message"], allot["message"])
+        _log(role, "message", need["message"], parts["message"], "kept head and tail")
+    if need["known"] > allot["known"]:
+        parts["known"], how = shrink_known(known, allot["known"])
+        _log(role, "known", need["known"], parts["known"], how)
+    if need["history"] > allot["history"]:
+        parts["history"], dropped = trim_history(parts["history"], allot["history"])
+        _log(role, "history", need["history"], parts["history"], f"dropped {dropped} oldest lines")
+    return parts
+
+
+def _allocate(need: Dict[str, int], available: int) -> Dict[str, int]:
+    allot = {name: 0 for name in PRIORITY}
+    pending = list(PRIORITY)
+    budget = available
+    # Parts that fit in their share take what they need; the rest is re-shared
+    while pending:
+        total_share = sum(SHARES[name] for name in pending)
+        fitting = [name for name in pending if need[name] <= budget * SHARES[name] / total_share]
+        if not fitting:
+            for name in pending:
+                allot[name] = int(budget * SHARES[name] / total_share)
+            break
+        for name in fitting:
+            allot[name] = need[name]
+            budget -= need[name]
+            pending.remove(name)
+    return allot
+
+
+def _log(role: str, part: str, before: int, text: str, how: str):
+    print(f"✂️ [budget:{role}] {part}: {before} → {count_tokens(text)} tokens ({how})")
+
+
+# ============================================================
+# ✅ SHORTENING
+# ============================================================
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Keeps about two thirds of the budget from the start and one third from the end."""
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    chars = int(len(text) * max_tokens / tokens)
+    head, tail = chars * 2 // 3, chars // 3
+    omitted = len(text) - head - tail
+    return f"{text[:head].rstrip()} …[{omitted} characters omitted]… {text[len(text) - tail:].lstrip()}"
+
+
+def trim_history(history: str, max_tokens: int) -> Tuple[str, int]:
+    """Drops the oldest lines first; the latest line is clipped only as a last resort."""
+    lines: List[str] = history.split("\n")
+    dropped = 0
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+        dropped += 1
+    text = "\n".join(lines)
+    if count_tokens(text) > max_tokens:
+        text = truncate_text(text, max_tokens)
+    return text, dropped
+
+
+def _clip_values(value: Any, max_chars: int) -> Any:
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars].rstrip() + "…"
+    if isinstance(value, dict):
+        return {k: _clip_values(v, max_chars) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clip_values(v, max_chars) for v in value]
+    return value
+
+
+def shrink_known(known: Any, max_tokens: int) -> Tuple[str, str]:
+    """Compact JSON, then clipped values, then plain truncation."""
+    compact = json.dumps(known, separators=(",", ":"))
+    if count_tokens(compact) <= max_tokens:
+        return compact, "compact JSON"
+    for max_chars in (400, 200, 80):
+        clipped = json.dumps(_clip_values(known, max_chars), separators=(",", ":"))
+        if count_tokens(clipped) <= max_tokens:
+            return clipped, f"values clipped to {max_chars} chars"
+    return truncate_text(compact, max_tokens), "truncated"
@@ -0,0 +1,61 @@
+# src/turn_deadline.py
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+import pymongo
+
+from src.config import settings
+
+
+class DeadlineExceeded(TimeoutError):
+    """The current chat turn ran out of its latency budget."""
+
+
+# Monotonic timestamp at which the running turn must have answered
+_deadline: ContextVar[Optional[float]] = ContextVar("turn_deadline", default=None)
+
+
+@contextmanager
+def turn_deadline(seconds: Optional[float] = None):
+    """
+    Gives the enclosed chat turn a latency budget. LLM calls read it through
+    `remaining()`; MongoDB operations get the same budget plus a short grace
+    period so the final checkpoint write still lands after a degraded reply.
+    """
+    seconds = settings.TURN_DEADLINE_SECONDS if seconds is None else seconds
+    if not seconds or seconds <= 0:
+        yield
+        return
+
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        with pymongo.timeout(seconds + settings.TURN_DB_GRACE_SECONDS):
+            yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current turn, or None when no deadline is set."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def has_budget(seconds: float) -> bool:
+    """True when at least `seconds` remain (always True without a deadline)."""
+    left = remaining()
+    return left is None or left >= seconds
+
+
+def call_timeout() -> Optional[float]:
+    """Timeout to hand to the next provider call; raises once the budget is spent."""
+    left = remaining()
+    if left is None:
+        return None
+    if left <= 0:
+        raise DeadlineExceeded("Turn deadline exceeded before the LLM call")
+    return left
@@ -0,0 +1,122 @@
+# src/warmup.py
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import src.database as db
+from src.config import settings
+
+# ============================================================
+# ✅ WARM-UP STEPS
+# Run once per worker from the lifespan, in a background thread, so the
+# first routed request does not pay for them. Required steps are retried
+# every WARMUP_RETRY_SECONDS until they pass; /readyz answers 503 until
+# then. Optional steps only mark the worker "degraded".
+# ============================================================
+def _warm_mongo():
+    if not db.ensure_connected() or not db.ping_db():
+        raise ConnectionError("MongoDB unreachable")
+
+
+def _warm_sections():
+    from src.sections import SECTIONS
+
+    from src.orchestrator import ORCHESTRATOR
+
+    for spec in SECTIONS.values():
+        spec["engine"].warm_up()
+    ORCHESTRATOR.app
+
+
+def _warm_llm():
+    # DNS / TLS to the provider and a loaded model, using the server's own key
+    from src.section_engine import get_llm
+
+    get_llm(settings.GROQ_API_KEY).invoke("ping", max_tokens=1)
+
+
+STEPS: List[Tuple[str, Callable[[], None], bool]] = [
+    # (name, step, required)
+    ("mongo", _warm_mongo, True),
+    ("sections", _warm_sections, True),
+    ("llm", _warm_llm, False),
+]
+
+_state: Dict[str, Any] = {
+    "status": "pending",       # pending -> warming -> ready | degraded
+    "started_at": None,
+    "finished_at": None,
+    "steps": {},
+}
+_stop = threading.Event()
+_started = time.time()
+
+
+def _run_step(name: str, step: Callable[[], None]) -> bool:
+    started = time.monotonic()
+    try:
+        step()
+        _state["steps"][name] = {"ok": True, "ms": round((time.monotonic() - started) * 1000)}
+        print(f"🔥 Warm-up {name}: {_state['steps'][name]['ms']} ms")
+        return True
+    except Exception as e:
+        _state["steps"][name] = {"ok": False, "ms": round((time.monotonic() - started) * 1000), "error": str(e)}
+        print(f"⚠️ Warm-up {name} failed: {e}")
+        return False
+
+
+def run_warmup():
+    """Runs every step; blocks until the required ones have passed (or stop_warmup is called)."""
+    _state["status"] = "warming"
+    _state["started_at"] = time.time()
+    steps = [(n, s, r) for n, s, r in STEPS if n != "llm" or settings.WARMUP_LLM_PING]
+
+    pending = [(n, s) for n, s, r in steps if r]
+    while pending and not _stop.is_set():
+        pending = [(n, s) for n, s in pending if not _run_step(n, s)]
+        if pending:
+            _stop.wait(settings.WARMUP_RETRY_SECONDS)
+    if pending:
+        return
+    optional_ok = all([_run_step(n, s) for n, s, r in steps if not r])
+
+    _state["status"] = "ready" if optional_ok else "degraded"
+    _state["finished_at"] = time.time()
+    print(f"✅ Worker warm ({_state['status']}) in {_state['finished_at'] - _state['started_at']:.1f}s")
+
+
+def skip_warmup():
+    """WARMUP_ENABLED=false: ready immediately, everything loads on first use."""
+    _state["status"] = "ready"
+    _state["finished_at"] = time.time()
+
+
+def stop_warmup():
+    _stop.set()
+
+
+# ============================================================
+# ✅ PROBES
+# ============================================================
+def dependencies(ping: bool = False) -> Dict[str, Any]:
+    """Per-dependency status; `ping` checks MongoDB live instead of trusting the client."""
+    from src.circuit_breaker import breaker_metrics
+    from src.sections import SECTIONS
+
+    return {
+        "mongo": {"connected": db.ping_db() if ping else db.client is not None},
+        "sections": {
+            name: {"prompts": spec["engine"].prompts_loaded, "graph": spec["engine"].is_compiled}
+            for name, spec in SECTIONS.items()
+        },
+        "llm": {"warmed": _state["steps"].get("llm", {}).get("ok"), "circuits": breaker_metrics()},
+    }
+
+
+def warmup_state() -> Dict[str, Any]:
+    return {**_state, "uptime_seconds": round(time.time() - _started, 1)}
+
+
+def is_ready(deps: Optional[Dict[str, Any]] = None) -> bool:
+    deps = deps or dependencies(ping=True)
+    return _state["status"] in ("ready", "degraded") and deps["mongo"]["connected"]
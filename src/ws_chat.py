@@ -0,0 +1,164 @@
+# src/ws_chat.py
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+import src.database as db
+from src.chat_stream import iter_chat_turn
+from src.config import settings
+from src.orchestrator import ORCHESTRATOR
+from src.sections import SECTIONS, get_section
+
+
+# ============================================================
+# ✅ PER-CONNECTION CHAT CONTEXT
+# ============================================================
+class ChatConnection:
+    """
+    State attached to one open WebSocket: the API key and session are checked
+    once at connect time, and the section the chat is in is kept here (read
+    from the orchestrator once, then taken from each reply) so frames do
+    not reload it. Turns go through the orchestrator, which picks the
+    section when the frame does not name one.
+    """
+
+    def __init__(self, websocket: WebSocket, chat_id: str, api_key: str):
+        self.websocket = websocket
+        self.chat_id = chat_id
+        self.api_key = api_key
+        self.current_section: Optional[str] = None
+        self._section_loaded = False
+        self.background: Set[asyncio.Task] = set()
+        self._send_lock = asyncio.Lock()
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        async with self._send_lock:
+            await self.websocket.send_json(payload)
+
+    async def start_section(self, section: Optional[str]) -> None:
+        result = await asyncio.to_thread(ORCHESTRATOR.start, self.chat_id, self.api_key, section)
+        self.current_section, self._section_loaded = result["current_section"], True
+        await self.send({"type": "started", "section": result["current_section"], "data": result})
+
+    async def handle_message(self, section: Optional[str], text: str, idempotency_key: Optional[str] = None) -> None:
+        # The early `ack` comes from the section that will most likely take the turn
+        if not self._section_loaded:
+            self.current_section = await asyncio.to_thread(ORCHESTRATOR.current_section, self.chat_id)
+            self._section_loaded = True
+        likely = section or self.current_section or next(iter(SECTIONS))
+        spec = get_section(likely)
+        async for event, data in iter_chat_turn(
+            self.chat_id,
+            text,
+            spec["engine"].app,
+            handler=ORCHESTRATOR.handle_message,
+            acknowledge=spec["acknowledge"],
+            api_key=self.api_key,
+            idempotency_key=idempotency_key,
+            section=section,
+        ):
+            answered = data.get("current_section", likely) if event == "done" else likely
+            if event == "done":
+                self.current_section = answered
+            await self.send({"type": event, "section": answered, "data": data})
+            if event == "done" and data.get("entry_saved"):
+                self.push_in_background(self.ats_preview(answered))
+
+    def push_in_background(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+
+    async def ats_preview(self, section: str) -> None:
+        """Formats the just-saved entry and pushes it as `ats_preview_ready`."""
+        spec = get_section(section)
+        try:
+            session = await asyncio.to_thread(db.get_chat_session, self.chat_id) or {}
+            entries = session.get("resume_data", {}).get(spec["resume_key"], [])
+            if not entries:
+                return
+            # save_entry appends new entries, so the one this turn saved is last
+            preview = await asyncio.to_thread(spec["format_ats"], entries[-1], self.api_key)
+            await self.send({"type": "ats_preview_ready", "section": section, "data": preview})
+        except Exception as e:
+            print(f"⚠️ ATS preview failed for {section}: {e}")
+
+    def close(self) -> None:
+        for task in list(self.background):
+            task.cancel()
+
+
+# ============================================================
+# ✅ SOCKET LOOP
+# ============================================================
+async def _auth_frame(websocket: WebSocket) -> Optional[str]:
+    """The key from the client's first frame, if it is an `auth` frame that arrives in time."""
+    try:
+        payload = await asyncio.wait_for(websocket.receive_json(), settings.WS_AUTH_TIMEOUT_SECONDS)
+    except (asyncio.TimeoutError, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get("type") != "auth":
+        return None
+    return payload.get("api_key") or None
+
+
+async def serve_chat_socket(websocket: WebSocket, chat_id: str, section: Optional[str] = None) -> None:
+    """
+    Serves one chat over a WebSocket. With `section` set, every message goes
+    to that section; otherwise each client frame may name its own `section`,
+    and frames without one are routed by the orchestrator.
+
+    The LLM API key comes from the `x-api-key` header (non-browser clients)
+    or, since browsers cannot set WebSocket headers, from a first
+    {"type": "auth", "api_key": str} frame sent within
+    WS_AUTH_TIMEOUT_SECONDS. It is never read from the query string, which
+    ends up in proxy and access logs.
+
+    Client frames: {"type": "auth" | "start" | "message", "section"?: str,
+                    "text"?: str, "idempotency_key"?: str, "api_key"?: str}
+    Server frames: {"type": "authenticated" | "started" | "ack" | "token" | "done"
+                    | "error" | "ats_preview_ready", "section": str, "data": {...}}
+    """
+    # Browsers always send Origin; only the CORS allow-list may open the socket
+    origin = websocket.headers.get("origin")
+    if origin is not None and origin not in settings.CORS_ALLOW_ORIGINS:
+        await websocket.close(code=4403, reason="Origin not allowed")
+        return
+
+    if not await asyncio.to_thread(db.get_chat_session, chat_id):
+        await websocket.close(code=4404, reason="Chat session not found")
+        return
+
+    await websocket.accept()
+    try:
+        api_key = websocket.headers.get("x-api-key") or await _auth_frame(websocket)
+    except WebSocketDisconnect:
+        return
+    if not api_key:
+        await websocket.close(code=4401, reason="Missing LLM API key (x-api-key header or auth frame)")
+        return
+    conn = ChatConnection(websocket, chat_id, api_key)
+    await conn.send({"type": "authenticated", "section": None, "data": {"chat_id": chat_id}})
+
+    try:
+        while True:
+            payload = await websocket.receive_json()
+            target = section or payload.get("section")
+            if target is not None and target not in SECTIONS:
+                await conn.send({"type": "error", "section": target, "data": {"message": f"Unknown section '{target}'"}})
+                continue
+
+            try:
+                if payload.get("type") == "start":
+                    await conn.start_section(target)
+                elif payload.get("text"):
+                    await conn.handle_message(target, payload["text"], payload.get("idempotency_key"))
+                else:
+                    await conn.send({"type": "error", "section": target, "data": {"message": "Empty message"}})
+            except Exception as e:
+                await conn.send({"type": "error", "section": target, "data": {"message": str(e)}})
+    except WebSocketDisconnect:
+        print(f"🔌 WebSocket closed for chat {chat_id}")
+    finally:
+        conn.close()
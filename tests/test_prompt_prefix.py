@@ -0,0 +1,29 @@
+# tests/test_prompt_prefix.py
+import os
+
+import pytest
+
+# src.config refuses to load without these; the check makes no calls
+for key in ("MONGO_URI", "GROQ_API_KEY", "GOOGLE_API_KEY"):
+    os.environ.setdefault(key, "test")
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("pydantic_settings")
+
+from src.prompt_tools import check_prefix_stability, main  # noqa: E402
+
+
+def test_field_prompts_keep_a_stable_prefix():
+    rows = check_prefix_stability(include_formatters=False)
+    assert rows
+    for row in rows:
+        assert 0 < row["stable_tokens"] <= row["total_tokens"], row
+
+
+def test_formatter_prompts_keep_a_stable_prefix():
+    pytest.importorskip("langchain_groq")
+    assert check_prefix_stability(include_formatters=True)
+
+
+def test_prefixes_command_passes():
+    assert main(["prefixes", "--no-formatters"]) == 0